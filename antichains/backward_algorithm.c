@@ -44,9 +44,16 @@ winning_regions(graph_p graph) {
         regions[node] = 1;
         curlink = curlink->next;
     }
+    free_antichain_full(fix, (void*)free_tuple_full);
     return regions;
 }
 
+/* Frees the array of winning regions returned by winning_regions */
+void
+free_winning_regions(int *regions) {
+    free(regions);
+}
+
 /** Builds the initial antichain for the fix point computation where player starts **/
 antichain*
 fixpoint(graph_p graph) {
@@ -91,6 +98,8 @@ fixpoint(graph_p graph) {
 
     //change 2 to size of counters
     start_antichain = build_start_antichain(graph, nbr_counters, max_counters);
+    // the tuples of the start antichain hold their own copy of the maximal counters
+    free(max_counters);
     if (print==1 ) {
         printf("Start antichain : ");
         print_antichain(start_antichain, (void *) print_tuple);
@@ -125,6 +134,7 @@ fixpoint(graph_p graph) {
     }
 
     antichain* a2 = compute_antichains_intersection2(a1, temp);
+    free_antichain_full(temp, (void*)free_tuple_full);
 
     if (print) {
         printf("Inter of start and previous Union  ");
@@ -135,6 +145,8 @@ fixpoint(graph_p graph) {
             //Iterate while the fix point isn't reached
     while (!compare_antichains(a1, a2,(void*)compare_tuples)) {
         nb_iter += 1;
+        // a1 is replaced by a2, which shares no tuple with it
+        free_antichain_full(a1, (void*)free_tuple_full);
         a1 = a2;
         pre_1 = pre(a1, a1, 1, graph);
         if(print) {
@@ -155,12 +167,14 @@ fixpoint(graph_p graph) {
             printf("\n");
         }
         a2 = compute_antichains_intersection2(a1, temp);
+        free_antichain_full(temp, (void*)free_tuple_full);
         if( print) {
             printf("ITER %d final set ",nb_iter);
             print_antichain( a2 , (void *) print_tuple);
             printf("\n");
         }
     }
+    free_antichain_full(a2, (void*)free_tuple_full);
 
     return a1;
 }
@@ -287,8 +301,9 @@ pre_1(antichain *a, antichain *prev_a, graph_p graph) {
 
     antichain *cur_antichain = new_antichain();
 
-    antichain *temp1 = new_antichain();
-    antichain *temp2 = new_antichain();
+    antichain *temp1;
+    antichain *temp2;
+    antichain *inter;
 
     tuple *tup;
     tuple *down;
@@ -301,7 +316,8 @@ pre_1(antichain *a, antichain *prev_a, graph_p graph) {
             //printf("Node %d player %d\n",i,graph->players[i] );
             //pour chaque successuer
             adjlist_node_p adjListPtr = graph->succ[i].head;
-            int first_iter = 0;
+            // temp2 is the intersection over the successors seen so far, NULL before the first one
+            temp2 = NULL;
 
             while (adjListPtr) {
                 succ = adjListPtr->vertex;
@@ -348,20 +364,26 @@ pre_1(antichain *a, antichain *prev_a, graph_p graph) {
                     }
                     curlink = curlink->next;
                 }
-                if(first_iter == 0) {
-                    temp2 = clone_antichain(temp1,(void *) clone_tuple);
-                    first_iter = 1;
+                if(temp2 == NULL) {
+                    temp2 = temp1;
                 }
                 else {
                        //seulement si un des sets de l'inter donc un des temp est vide alors le tout est vide
-                    temp2 = compute_antichains_intersection(temp2,   temp1
+                    inter = compute_antichains_intersection(temp2,   temp1
                             ,(void*)compare_tuples,(void*)compute_tuples_intersection, (void*)clone_tuple, (void*)free_tuple_full);
+                    // the intersection is built from copies, both operands can be released
+                    free_antichain_full(temp2, (void*)free_tuple_full);
+                    free_antichain_full(temp1, (void*)free_tuple_full);
+                    temp2 = inter;
                 }
 
                 adjListPtr = adjListPtr->next;
             }
 
-            cur_antichain = compute_antichains_union(cur_antichain, temp2, (void*)compare_tuples, (void*)free_tuple_full);
+            // the union takes the elements of temp2 and frees it
+            if(temp2 != NULL) {
+                cur_antichain = compute_antichains_union(cur_antichain, temp2, (void*)compare_tuples, (void*)free_tuple_full);
+            }
 
         }
 
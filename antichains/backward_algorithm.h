@@ -41,6 +41,7 @@ extern tuple *NOT_DEFINED;
 antichain* build_start_antichain(graph_p, int, int*);
 antichain* fixpoint(graph_p);
 int* winning_regions(graph_p);
+void free_winning_regions(int*);
 antichain* pre(antichain*, antichain*, int, graph_p);
 static antichain* pre_O(antichain*, antichain*, graph_p);
 static antichain* pre_I(antichain*, antichain*, graph_p);
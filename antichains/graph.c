@@ -10,10 +10,26 @@
 *
 **/
 
+#include <ctype.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include "graph.h"
 
+/* Token types returned by readToken*/
+#define TOKEN_EOF 0
+#define TOKEN_INT 1
+#define TOKEN_WORD 2
+#define TOKEN_END 3
+
+/* Growable array of integers used while a file is loaded*/
+typedef struct int_buffer
+{
+    int size;
+    int capacity;
+    int *values;
+}int_buffer_t;
+
 
 /* Exit function to handle fatal errors*/
 __inline void err_exit(char* msg)
@@ -74,9 +90,65 @@ graph_p createGraph(int n, int *priorities, int* players )
         graph->pred[i].num_members = 0;
     }
 
+    graph->pool = NULL;
+    graph->pool_size = 0;
+
     return graph;
 }
 
+/* Function to create a graph with n vertices and its edges in a single call. The successors of vertex i are
+   targets[offsets[i]] to targets[offsets[i+1]-1]. The adjacency list nodes of both directions are taken from one
+   contiguous block instead of being allocated one by one. The lists are the ones obtained by calling addEdge for
+   every edge, in order*/
+graph_p createGraphFromArrays(int n, int *priorities, int *players, int *offsets, int *targets)
+{
+    graph_p graph = createGraph(n, priorities, players);
+    int m = offsets[n];
+    if(m == 0)
+        return graph;
+
+    graph->pool = (adjlist_node_p)malloc(2 * m * sizeof(adjlist_node_t));
+    if(!graph->pool)
+        err_exit("Unable to allocate memory for adjacency list nodes");
+    graph->pool_size = 2 * m;
+
+    adjlist_node_p succ_nodes = graph->pool;
+    adjlist_node_p pred_nodes = graph->pool + m;
+    int src, e;
+    for(src = 0; src < n; src++)
+    {
+        for(e = offsets[src]; e < offsets[src + 1]; e++)
+        {
+            int dest = targets[e];
+
+            succ_nodes[e].vertex = dest;
+            succ_nodes[e].next = graph->succ[src].head;
+            graph->succ[src].head = &succ_nodes[e];
+            graph->succ[src].num_members++;
+
+            pred_nodes[e].vertex = src;
+            pred_nodes[e].next = graph->pred[dest].head;
+            graph->pred[dest].head = &pred_nodes[e];
+            graph->pred[dest].num_members++;
+        }
+    }
+
+    return graph;
+}
+
+/* Frees the nodes of an adjacency list, except the ones belonging to the pool of the graph*/
+static void freeAdjlist(graph_p graph, adjlist_p list)
+{
+    adjlist_node_p adjListPtr = list->head;
+    while (adjListPtr)
+    {
+        adjlist_node_p tmp = adjListPtr;
+        adjListPtr = adjListPtr->next;
+        if(!graph->pool || tmp < graph->pool || tmp >= graph->pool + graph->pool_size)
+            free(tmp);
+    }
+}
+
 int* maximal_counter(graph_t *graph) {
     //printf("MAXIMAL COUNTER\n");
     int maximum = -1;
@@ -122,41 +194,29 @@ void destroyGraph(graph_p graph)
 {
     if(graph)
     {
+        int v;
         if(graph->succ)
         {
-            int v;
             /*Free up the nodes*/
             for (v = 0; v < graph->num_vertices; v++)
-            {
-                adjlist_node_p adjListPtr = graph->succ[v].head;
-                while (adjListPtr)
-                {
-                    adjlist_node_p tmp = adjListPtr;
-                    adjListPtr = adjListPtr->next;
-                    free(tmp);
-                }
-            }
+                freeAdjlist(graph, &graph->succ[v]);
             /*Free the adjacency list array*/
             free(graph->succ);
         }
 
         if(graph->pred)
         {
-            int v;
             /*Free up the nodes*/
             for (v = 0; v < graph->num_vertices; v++)
-            {
-                adjlist_node_p adjListPtr = graph->pred[v].head;
-                while (adjListPtr)
-                {
-                    adjlist_node_p tmp = adjListPtr;
-                    adjListPtr = adjListPtr->next;
-                    free(tmp);
-                }
-            }
+                freeAdjlist(graph, &graph->pred[v]);
             /*Free the adjacency list array*/
             free(graph->pred);
         }
+        /*Free the nodes created by createGraphFromArrays*/
+        free(graph->pool);
+        /*Free the copies of priorities and players*/
+        free(graph->priorities);
+        free(graph->players);
         /*Free the graph*/
         free(graph);
     }
@@ -209,4 +269,162 @@ void displayGraph(graph_p graph)
     {
         printf("node %d, priority %d, player %d\n", i, graph->priorities[i], graph->players[i]);
     }
-}
\ No newline at end of file
+}
+
+/* Appends a value to a growable array of integers*/
+static void pushInt(int_buffer_t *buffer, int value)
+{
+    if(buffer->size == buffer->capacity)
+    {
+        buffer->capacity = buffer->capacity ? 2 * buffer->capacity : 1024;
+        buffer->values = (int*)realloc(buffer->values, buffer->capacity * sizeof(int));
+        if(!buffer->values)
+            err_exit("Unable to allocate memory while loading a graph");
+    }
+    buffer->values[buffer->size++] = value;
+}
+
+/* Reads the next token of a file in PGSolver format. Tokens are separated by whitespace and commas, node names
+   (quoted) are skipped. An integer is stored in value, the first characters of a word (the keywords of the header)
+   are stored in word*/
+static int readToken(FILE *file, long *value, char *word, int size)
+{
+    int c = getc(file);
+    while(c != EOF && (isspace(c) || c == ',' || c == '"'))
+    {
+        if(c == '"')
+        {
+            /* node name, skipped until the closing quote*/
+            do
+                c = getc(file);
+            while(c != EOF && c != '"');
+        }
+        c = getc(file);
+    }
+    if(c == EOF)
+        return TOKEN_EOF;
+    if(c == ';')
+        return TOKEN_END;
+
+    int type;
+    if(isdigit(c))
+    {
+        *value = 0;
+        while(c != EOF && isdigit(c))
+        {
+            *value = 10 * (*value) + (c - '0');
+            c = getc(file);
+        }
+        type = TOKEN_INT;
+    }
+    else
+    {
+        int length = 0;
+        while(c != EOF && !isspace(c) && c != ',' && c != ';' && c != '"')
+        {
+            if(length < size - 1)
+                word[length++] = (char)c;
+            c = getc(file);
+        }
+        word[length] = '\0';
+        type = TOKEN_WORD;
+    }
+    /* the separator is read again by the next call*/
+    if(c != EOF)
+        ungetc(c, file);
+    return type;
+}
+
+/* Loads a graph from a file in PGSolver format, without going through python objects. Node i of the file is vertex
+   i - offset of the graph, vertices must be numbered from 0 to n-1 where n is the number of nodes in the file.
+   Edges are added in the order of the file. Returns NULL if the file cannot be read or is not a valid parity game*/
+graph_p loadGraphFromFile(const char *path, int offset)
+{
+    FILE *file = fopen(path, "r");
+    if(!file)
+        return NULL;
+
+    int_buffer_t nodes = {0, 0, NULL}, priorities = {0, 0, NULL}, players = {0, 0, NULL};
+    int_buffer_t sources = {0, 0, NULL}, targets = {0, 0, NULL};
+    char word[16];
+    long value;
+    int field = 0; /* position of the next token in the current record*/
+    int valid = 1;
+    int token;
+
+    do
+    {
+        token = readToken(file, &value, word, sizeof(word));
+        if(token == TOKEN_WORD)
+        {
+            /* header ("parity N;" or "start N;"), skipped*/
+            if(field != 0)
+                valid = 0;
+            while(token != TOKEN_END && token != TOKEN_EOF)
+                token = readToken(file, &value, word, sizeof(word));
+        }
+        else if(token == TOKEN_INT)
+        {
+            if(field == 0)
+                pushInt(&nodes, (int)value);
+            else if(field == 1)
+                pushInt(&priorities, (int)value);
+            else if(field == 2)
+                pushInt(&players, value == 0 ? 0 : 1);
+            else
+            {
+                pushInt(&sources, nodes.values[nodes.size - 1]);
+                pushInt(&targets, (int)value);
+            }
+            field++;
+        }
+        else if(field != 0)
+        {
+            /* end of a record, which must contain at least the node, its priority and its player*/
+            if(field < 3)
+                valid = 0;
+            field = 0;
+        }
+    }
+    while(token != TOKEN_EOF && valid);
+    fclose(file);
+
+    /* priorities and players by vertex*/
+    int n = nodes.size;
+    int *vertex_priorities = (int*)calloc(n > 0 ? n : 1, sizeof(int));
+    int *vertex_players = (int*)calloc(n > 0 ? n : 1, sizeof(int));
+    int i;
+    for(i = 0; valid && i < n; i++)
+    {
+        int vertex = nodes.values[i] - offset;
+        if(vertex < 0 || vertex >= n)
+            valid = 0;
+        else
+        {
+            vertex_priorities[vertex] = priorities.values[i];
+            vertex_players[vertex] = players.values[i];
+        }
+    }
+    for(i = 0; valid && i < targets.size; i++)
+    {
+        if(targets.values[i] - offset < 0 || targets.values[i] - offset >= n)
+            valid = 0;
+    }
+
+    graph_p graph = NULL;
+    if(valid)
+    {
+        graph = createGraph(n, vertex_priorities, vertex_players);
+        for(i = 0; i < sources.size; i++)
+            addEdge(graph, sources.values[i] - offset, targets.values[i] - offset);
+    }
+
+    free(vertex_priorities);
+    free(vertex_players);
+    free(nodes.values);
+    free(priorities.values);
+    free(players.values);
+    free(sources.values);
+    free(targets.values);
+    return graph;
+}
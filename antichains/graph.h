@@ -35,12 +35,16 @@ typedef struct graph
     int *players;         /*Number of vertices*/
     adjlist_p succ;     /*Adjacency lists' array*/
     adjlist_p pred;     /*Adjacency lists' array*/
+    adjlist_node_p pool;      /*Contiguous block of adjacency list nodes (NULL if every node is allocated separately)*/
+    int pool_size;            /*Number of nodes in the pool*/
     //avoir tableau 0,1 en fct du joieur duy noeuid ou bien une liste des noeuds du j1 et une des noeuds du j2 pour optiomiser ? a voir
 }graph_t, *graph_p;
 
 void err_exit(char*);
 adjlist_node_p createNode(int);
 graph_p createGraph(int, int*,int*);
+graph_p loadGraphFromFile(const char*, int);
+graph_p createGraphFromArrays(int, int*, int*, int*, int*);
 void destroyGraph(graph_p);
 void addEdge(graph_t*, int, int);
 void displayGraph(graph_p);
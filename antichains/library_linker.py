@@ -62,7 +62,9 @@ class Graph(Structure):
                 ("priorities", POINTER(c_int)),
                 ("players", POINTER(c_int)),
                 ("succ", POINTER(Adjlist)),
-                ("pred", POINTER(Adjlist))]
+                ("pred", POINTER(Adjlist)),
+                ("pool", POINTER(Adjlist_node)),
+                ("pool_size", c_int)]
 
 #### Antichain C structure      
 class Antichain(Structure):
@@ -107,6 +109,14 @@ createGraph_c = lib.createGraph
 createGraph_c.argtypes = [c_int, POINTER(c_int), POINTER(c_int)]
 createGraph_c.restype =  POINTER(Graph)
 
+createGraphFromArrays_c = lib.createGraphFromArrays
+createGraphFromArrays_c.argtypes = [c_int, POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)]
+createGraphFromArrays_c.restype =  POINTER(Graph)
+
+loadGraphFromFile_c = lib.loadGraphFromFile
+loadGraphFromFile_c.argtypes = [c_char_p, c_int]
+loadGraphFromFile_c.restype =  POINTER(Graph)
+
 destroyGraph_c = lib.destroyGraph
 destroyGraph_c.argtypes = [POINTER(Graph)]
 destroyGraph_c.restype =  None
@@ -211,4 +221,8 @@ fixpoint_c.restype = POINTER(Antichain)
 
 winning_region_c = lib.winning_regions
 winning_region_c.argtypes = [POINTER(Graph)]
-winning_region_c.restype = POINTER(c_int)
\ No newline at end of file
+winning_region_c.restype = POINTER(c_int)
+
+free_winning_regions_c = lib.free_winning_regions
+free_winning_regions_c.argtypes = [POINTER(c_int)]
+free_winning_regions_c.restype = None
\ No newline at end of file
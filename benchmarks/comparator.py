@@ -1,12 +1,10 @@
-import copy
-
 from tools import timer, generators, optimizations
 import matplotlib.pyplot as plt
 import solvers.strongparity as sp
 import solvers.weakparity as wp
 
 import solvers.generalizedparity as gp
-from tools.operations import transform_graph_into_c_spec, are_lists_equal,transform_graph_into_c
+from tools.operations import transform_graph_into_c_spec, are_lists_equal,transform_graph_into_c, CGraph
 
 """
 This module contains functions used to compare our algorithms
@@ -35,8 +33,8 @@ def compare_algorithms2(algo1, algo2, generator, n, preprocess1=None, preprocess
     # games generated are size 1 to n
     for i in range(5, n, step):
         temp1 = []  # temp list for #iterations recordings of algorithm 1
-        g1 = generator(i) # game generation
-        g2 = copy.deepcopy(g1)
+        g1 = generator(i).freeze() # game generation, frozen so that it can be shared by the algorithms
+        g2 = g1
 
         if preprocess1 is not None:
             g1 = preprocess1(g1)
@@ -107,9 +105,9 @@ def compare_algorithms3(algo1, algo2, algo3, generator, n, preprocess1=None, pre
     # games generated are size 1 to n
     for i in range(5, n, step):
         temp1 = []  # temp list for #iterations recordings of algorithm 1
-        g1 = generator(i) # game generation
-        g2 = copy.deepcopy(g1)
-        g3 = copy.deepcopy(g1)
+        g1 = generator(i).freeze() # game generation, frozen so that it can be shared by the algorithms
+        g2 = g1
+        g3 = g1
 
         if preprocess1 is not None:
             g1 = preprocess1(g1)
@@ -127,15 +125,15 @@ def compare_algorithms3(algo1, algo2, algo3, generator, n, preprocess1=None, pre
         if preprocess2 is not None:
             g2 = preprocess2(g2)
 
-        g2, nbr_nodes = transform_graph_into_c_spec(g2)
-
         temp2 = []
-        # #iterations calls to the solver are timed
-        for j in range(iterations):
-            with chrono:
-                #algo2(u[0],u[1],u[2],u[3])  # solver call
-                solution_symbolic = algo2(g2, nbr_nodes,0)
-            temp2.append(chrono.interval)  # add time recording
+        # the C graph is built once, solved #iterations times and destroyed
+        with CGraph.from_graph(g2, 0) as c_graph:
+            # #iterations calls to the solver are timed
+            for j in range(iterations):
+                with chrono:
+                    #algo2(u[0],u[1],u[2],u[3])  # solver call
+                    solution_symbolic = algo2(c_graph.c_graph, c_graph.nbr_nodes, 0)
+                temp2.append(chrono.interval)  # add time recording
 
         min_recording = min(temp2)
         y2.append(min_recording)  # get the minimum out of #iterations recordings
@@ -198,8 +196,8 @@ def compare_algorithms(algo1, algo2, generator, n, preprocess1=None, preprocess2
     # games generated are size 1 to n
     for i in range(5, n, step):
         temp1 = []  # temp list for #iterations recordings of algorithm 1
-        g1 = generator(i) # game generation
-        g2 = copy.deepcopy(g1)
+        g1 = generator(i).freeze() # game generation, frozen so that it can be shared by the algorithms
+        g2 = g1
 
         if preprocess1 is not None:
             g1 = preprocess1(g1)
@@ -269,8 +267,8 @@ def compare_algorithms4(algo1, algo2, generator, n, preprocess1=None, preprocess
     # games generated are size 1 to n
     for i in range(5, n, step):
         temp1 = []  # temp list for #iterations recordings of algorithm 1
-        g1 = generator(i) # game generation
-        g2 = copy.deepcopy(g1)
+        g1 = generator(i).freeze() # game generation, frozen so that it can be shared by the algorithms
+        g2 = g1
 
         if preprocess1 is not None:
             g1 = preprocess1(g1)
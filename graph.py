@@ -1,4 +1,8 @@
+import hashlib
+import struct
+from array import array
 from collections import defaultdict
+from itertools import izip
 
 
 class Graph(object):
@@ -11,11 +15,60 @@ class Graph(object):
         Graphs are represented by predecessors list (a dictionary whose keys are the nodes and values are a list of
         successors of a nodes). Access in a dictionary is O(1) in average and O(n) in worst case because it uses a
         hash table. Python lists provide O(1) retrieval. The same applies to successors list. Nodes are stored in a
-        dictionary where the key is the node id and the value is a tuple (player, priority).
+        dictionary where the key is the node id and the value is a tuple (player, priority). Nodes are also indexed by
+        priority : for each priority function j, priority_index[j] is a dictionary whose keys are the priorities and
+        values are the sets of nodes having that priority, and max_priorities[j] is the maximum priority. Both are
+        maintained by add_node and remove_node, descriptors must therefore not be modified directly in nodes.
+        Edges are removed in O(1) by swapping the removed element with the last element of the list. To find that
+        element, successor_positions[node] (resp. predecessor_positions[node]) maps each successor (resp. predecessor)
+        of a node to its position in the list. That map is only built the first time an edge of the node is removed.
         """
         self.predecessors = defaultdict(list)
         self.successors = defaultdict(list)
+        self.successor_positions = {}
+        self.predecessor_positions = {}
         self.nodes = defaultdict(tuple)
+        self.priority_index = {}
+        self.max_priorities = {}
+
+    @classmethod
+    def from_edges(cls, sources, targets, players, priorities, nodes=None, deduplicate=False):
+        """
+        Builds a game graph from flat arrays in a single pass over the edges, both successors and predecessors lists
+        are filled at the same time. Edge i goes from sources[i] to targets[i].
+        :param sources: the sources of the edges.
+        :param targets: the targets of the edges.
+        :param players: players[i] is the player to which node nodes[i] belongs.
+        :param priorities: priorities[i] is the priority of node nodes[i], or a tuple (priority_1, ..., priority_k)
+        in case of generalized parity.
+        :param nodes: the node ids (default is 0 to n-1).
+        :param deduplicate: if True, multi-edges are only added once.
+        :return: a Graph containing those nodes and edges.
+        """
+        g = cls()
+        if nodes is None:
+            nodes = xrange(len(players))
+
+        for node, player, priority in izip(nodes, players, priorities):
+            if isinstance(priority, (tuple, list)):
+                g.add_node(node, tuple([player] + list(priority)))
+            else:
+                g.add_node(node, (player, priority))
+
+        successors = g.successors
+        predecessors = g.predecessors
+        if deduplicate:
+            seen = set()
+            for source, target in izip(sources, targets):
+                if (source, target) not in seen:
+                    seen.add((source, target))
+                    successors[source].append(target)
+                    predecessors[target].append(source)
+        else:
+            for source, target in izip(sources, targets):
+                successors[source].append(target)
+                predecessors[target].append(source)
+        return g
 
     def get_nodes_descriptors(self):
         """
@@ -57,11 +110,90 @@ class Graph(object):
         :param node: a node id
         :param info: a tuple (player, priority) or (player, priority_1, ..., priority_k)
         """
+        if node in self.nodes:
+            self._unindex_node(node, self.nodes[node])
         self.nodes[node] = info
+        self._index_node(node, info)
 
     def remove_node(self, node):
+        """
+        Removes a node and every edge incident to that node.
+        :param node: a node id
+        """
+        self._unindex_node(node, self.nodes[node])
         del self.nodes[node]
 
+        successors = self.successors.pop(node, [])
+        predecessors = self.predecessors.pop(node, [])
+        self.successor_positions.pop(node, None)
+        self.predecessor_positions.pop(node, None)
+
+        # self loops are removed with the lists of the node
+        for succ in successors:
+            if succ != node:
+                self.remove_predecessor(succ, node)
+        for pred in predecessors:
+            if pred != node:
+                self.remove_successor(pred, node)
+
+    def _index_node(self, node, info):
+        """
+        Adds a node to the priority buckets and updates the maximum priorities.
+        :param node: a node id
+        :param info: the descriptor of the node
+        """
+        for j in range(1, len(info)):
+            priority = info[j]
+            buckets = self.priority_index.setdefault(j, {})
+            bucket = buckets.get(priority)
+            if bucket is None:
+                bucket = buckets[priority] = set()
+            bucket.add(node)
+            if j not in self.max_priorities or priority > self.max_priorities[j]:
+                self.max_priorities[j] = priority
+
+    def _unindex_node(self, node, info):
+        """
+        Removes a node from the priority buckets and updates the maximum priorities.
+        :param node: a node id
+        :param info: the descriptor of the node
+        """
+        for j in range(1, len(info)):
+            priority = info[j]
+            buckets = self.priority_index[j]
+            bucket = buckets[priority]
+            bucket.discard(node)
+            if not bucket:
+                del buckets[priority]
+                # the maximum only changes when its bucket becomes empty, it is then the largest remaining key
+                if self.max_priorities[j] == priority:
+                    if buckets:
+                        self.max_priorities[j] = max(buckets)
+                    else:
+                        del self.max_priorities[j]
+
+    def get_nodes_with_priority(self, priority, j=1):
+        """
+        :param priority: a priority
+        :param j: the priority function (1 to k)
+        :return: the list of nodes having that priority according to priority function j
+        """
+        return list(self.priority_index.get(j, {}).get(priority, ()))
+
+    def get_priorities(self, j=1):
+        """
+        :param j: the priority function (1 to k)
+        :return: the list of priorities occurring in the game according to priority function j
+        """
+        return self.priority_index.get(j, {}).keys()
+
+    def get_max_priority(self, j=1):
+        """
+        :param j: the priority function (1 to k)
+        :return: the maximum priority occurring in the game according to priority function j (None if there is none)
+        """
+        return self.max_priorities.get(j)
+
     def get_successors(self, node):
         """
         :param node: a node id
@@ -70,10 +202,18 @@ class Graph(object):
         return self.successors[node]
 
     def add_successor(self, node, successor):
+        positions = self.successor_positions.get(node)
+        if positions is not None:
+            positions[successor] = len(self.successors[node])
         self.successors[node].append(successor)
 
     def remove_successor(self, node, successor):
-        self.successors[node].remove(successor)
+        """
+        Removes an edge in O(1). The order of the remaining successors of the node is not preserved.
+        :param node: a node id
+        :param successor: a successor of the node
+        """
+        _swap_remove(self.successors[node], self.successor_positions, node, successor)
 
     def get_predecessors(self, node):
         """
@@ -83,32 +223,849 @@ class Graph(object):
         return self.predecessors[node]
 
     def add_predecessor(self, node, predecessor):
+        positions = self.predecessor_positions.get(node)
+        if positions is not None:
+            positions[predecessor] = len(self.predecessors[node])
         self.predecessors[node].append(predecessor)
 
     def remove_predecessor(self, node, predecessor):
-        self.predecessors[node].remove(predecessor)
+        """
+        Removes an edge in O(1). The order of the remaining predecessors of the node is not preserved.
+        :param node: a node id
+        :param predecessor: a predecessor of the node
+        """
+        _swap_remove(self.predecessors[node], self.predecessor_positions, node, predecessor)
+
+    def get_out_degree(self, node):
+        """
+        :param node: a node id
+        :return: the number of successors of the node
+        """
+        return len(self.successors[node])
+
+    def subgame(self, set):
+        """
+        Creates a sub-game from the current game. The sub-game will contain all nodes in the provided set. The sub-game
+        is a view sharing the adjacency of the current game, no edge is copied.
+        :param set: the list of nodes that the sub-game will contain.
+        :return: a sub-game.
+        """
+        return SubGame(self, set)
+
+    def with_descriptors(self, descriptors):
+        """
+        Creates a game with the same arena as the current game but different node descriptors. The adjacency lists are
+        copied, the game and the new game can then be modified independently.
+        :param descriptors: a dictionary mapping every node id to its new descriptor (player, priority_1, ...).
+        :return: the new game.
+        """
+        g = Graph()
+        for node in self.nodes:
+            g.add_node(node, descriptors[node])
+        for node, successors in self.successors.iteritems():
+            g.successors[node] = list(successors)
+        for node, predecessors in self.predecessors.iteritems():
+            g.predecessors[node] = list(predecessors)
+        return g
+
+    def freeze(self):
+        """
+        :return: an immutable copy of the game.
+        """
+        return FrozenGraph(self)
+
+    def __str__(self):
+        rep = ""
+        for node in self.nodes:
+            rep += str(node) + " " + str(self.nodes[node]) + "\n" + str(node) + " -> "
+            for succ in self.successors[node]:
+                rep += str(succ) + ", "
+            rep += "\n"
+        return rep
+
+
+
+class FrozenGraph(Graph):
+    """
+    Immutable game graph. Adjacency lists are stored as tuples and every method modifying the game raises a TypeError,
+    a frozen graph can thus be shared between threads and processes (it can be pickled) and with several solvers
+    without being copied. Frozen graphs have a content hash computed over the nodes, their descriptors and the edges,
+    which does not depend on the order in which nodes and edges were added. It is computed the first time it is
+    needed and is stable across processes, it can be used to identify games (e.g. as a key in a cache of solutions).
+    """
+
+    def __init__(self, g):
+        """
+        :param g: the game graph to freeze.
+        """
+        Graph.__init__(self)
+        self.nodes = dict(g.get_nodes_descriptors().iteritems())
+        self.successors = dict((node, tuple(g.get_successors(node))) for node in self.nodes)
+        self.predecessors = dict((node, tuple(g.get_predecessors(node))) for node in self.nodes)
+        self._build_index()
+
+    def get_successors(self, node):
+        """
+        :param node: a node id
+        :return: the tuple of successors of the node
+        """
+        return self.successors.get(node, ())
+
+    def get_predecessors(self, node):
+        """
+        :param node: a node id
+        :return: the tuple of predecessors of the node
+        """
+        return self.predecessors.get(node, ())
+
+    def get_out_degree(self, node):
+        """
+        :param node: a node id
+        :return: the number of successors of the node
+        """
+        return len(self.successors.get(node, ()))
+
+    def _immutable(self, *args):
+        raise TypeError("a FrozenGraph cannot be modified")
+
+    add_node = remove_node = add_successor = remove_successor = add_predecessor = remove_predecessor = _immutable
+
+    def with_descriptors(self, descriptors):
+        """
+        Creates a frozen game with the same arena as the current game but different node descriptors. The adjacency of
+        the current game is shared, not copied.
+        :param descriptors: a dictionary mapping every node id to its new descriptor (player, priority_1, ...).
+        :return: the new frozen game.
+        """
+        g = FrozenGraph.__new__(FrozenGraph)
+        Graph.__init__(g)
+        g.nodes = dict((node, descriptors[node]) for node in self.nodes)
+        g.successors = self.successors
+        g.predecessors = self.predecessors
+        g._build_index()
+        return g
+
+    def _build_index(self):
+        """
+        Indexes the nodes by priority. Buckets can no longer change and are stored as tuples.
+        """
+        for node, info in self.nodes.iteritems():
+            self._index_node(node, info)
+        for buckets in self.priority_index.itervalues():
+            for priority in buckets:
+                buckets[priority] = tuple(buckets[priority])
+        self.hash = None
+
+    def freeze(self):
+        """
+        :return: the game itself since it is already immutable.
+        """
+        return self
+
+    def content_hash(self):
+        """
+        Computes (once) a SHA-1 digest of the game. Nodes are considered in increasing order and the successors of each
+        node are sorted, so that two frozen graphs with the same nodes, descriptors and edges have the same hash. Values
+        are encoded canonically (see _canonical), integers having the same encoding whether they are int or long.
+        :return: the hexadecimal digest.
+        """
+        if self.hash is None:
+            digest = hashlib.sha1()
+            for node in sorted(self.nodes):
+                digest.update(_canonical(node))
+                descriptor = self.nodes[node]
+                digest.update(struct.pack('<I', len(descriptor)))
+                for value in descriptor:
+                    digest.update(_canonical(value))
+                successors = sorted(self.successors[node])
+                digest.update(struct.pack('<I', len(successors)))
+                for successor in successors:
+                    digest.update(_canonical(successor))
+            self.hash = digest.hexdigest()
+        return self.hash
+
+    def __hash__(self):
+        return int(self.content_hash()[:16], 16)
+
+    def __eq__(self, other):
+        """
+        Two frozen graphs are equal if they have the same nodes, descriptors and edges (the order of the successors of a
+        node does not matter). The content hashes are compared first, the structures only if they are equal.
+        """
+        if not isinstance(other, FrozenGraph):
+            return False
+        if self is other:
+            return True
+        if self.content_hash() != other.content_hash() or self.nodes != other.nodes:
+            return False
+        for node, successors in self.successors.iteritems():
+            if sorted(successors) != sorted(other.successors.get(node, ())):
+                return False
+        return True
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class CSRGraph(object):
+    """
+    Compact, array-backed representation of a game graph. Nodes are mapped to dense indices 0 to n-1 and the
+    successors (resp. predecessors) of every node are stored contiguously in a single array of targets, delimited by
+    an array of offsets (compressed sparse row format). Players and priorities are stored in parallel arrays indexed by
+    the dense index of the nodes. This representation uses a few bytes per edge instead of the dictionaries of lists
+    used by Graph and exposes the same accessors, so that the solvers can be used on it unchanged. Its structure is
+    fixed once built.
+    """
+
+    def __init__(self, ids, players, priorities, succ_offsets, succ_targets, pred_offsets, pred_targets, start=None):
+        """
+        Builds the graph from its arrays. Targets contain node ids, not dense indices.
+        :param ids: the node ids, node ids[i] has dense index i.
+        :param players: players[i] is the player to which node ids[i] belongs.
+        :param priorities: a list of k arrays, priorities[j][i] is the priority of node ids[i] according to priority
+        function j+1.
+        :param succ_offsets: successors of node ids[i] are succ_targets[succ_offsets[i]:succ_offsets[i+1]].
+        :param succ_targets: the concatenated successors lists.
+        :param pred_offsets: predecessors of node ids[i] are pred_targets[pred_offsets[i]:pred_offsets[i+1]].
+        :param pred_targets: the concatenated predecessors lists.
+        :param start: if the ids are known to be the consecutive integers start, start+1, ..., the first id. They are
+        then not checked.
+        """
+        self.ids = ids
+        self.players = players
+        self.priorities = priorities
+        self.succ_offsets = succ_offsets
+        self.succ_targets = succ_targets
+        self.pred_offsets = pred_offsets
+        self.pred_targets = pred_targets
+        self.nodes = _CSRNodesView(self)
+        self.priority_index = {}  # priority buckets, built on demand for each priority function
+        self.max_priorities = {}
+
+        # when node ids are consecutive integers, the dense index of a node is obtained by subtracting the first id
+        # which avoids storing a dictionary from ids to indices
+        n = len(ids)
+        if start is not None:
+            self.start = start
+            self.index_of = None
+        elif n != 0 and all(isinstance(node, (int, long)) for node in (ids[0], ids[n - 1])) and \
+                ids[n - 1] - ids[0] == n - 1 and all(ids[i] == ids[0] + i for i in xrange(n)):
+            self.start = ids[0]
+            self.index_of = None
+        else:
+            self.start = None
+            self.index_of = dict((node, i) for i, node in enumerate(ids))
+
+    @classmethod
+    def from_graph(cls, g):
+        """
+        Builds the compact representation of a Graph.
+        :param g: a game graph.
+        :return: a CSRGraph containing the same nodes and edges as g.
+        """
+        ids = sorted(g.get_nodes())
+        nbr_functions = len(g.nodes[ids[0]]) - 1 if ids else 1
+
+        players = array('b')
+        priorities = [array('i') for _ in range(nbr_functions)]
+        succ_offsets = array('l', [0])
+        succ_targets = array('i')
+        pred_offsets = array('l', [0])
+        pred_targets = array('i')
+
+        for node in ids:
+            descriptor = g.nodes[node]
+            players.append(descriptor[0])
+            for j in range(nbr_functions):
+                priorities[j].append(descriptor[j + 1])
+            succ_targets.extend(g.get_successors(node))
+            succ_offsets.append(len(succ_targets))
+            pred_targets.extend(g.get_predecessors(node))
+            pred_offsets.append(len(pred_targets))
+
+        return cls(array('i', ids), players, priorities, succ_offsets, succ_targets, pred_offsets, pred_targets)
+
+    @classmethod
+    def from_edges(cls, sources, targets, players, priorities, nodes=None, deduplicate=False):
+        """
+        Builds the compact representation of a game graph from flat arrays. Both directions are built using a counting
+        sort of the edges, the order of the edges of a node is the order in which they are given.
+        :param sources: the sources of the edges.
+        :param targets: the targets of the edges.
+        :param players: players[i] is the player to which node nodes[i] belongs.
+        :param priorities: priorities[i] is the priority of node nodes[i], or a tuple (priority_1, ..., priority_k)
+        in case of generalized parity.
+        :param nodes: the node ids (default is 0 to n-1), their order gives the dense indices.
+        :param deduplicate: if True, multi-edges are only added once.
+        :return: a CSRGraph containing those nodes and edges.
+        """
+        n = len(players)
+        ids = array('i', nodes if nodes is not None else xrange(n))
+
+        if n != 0 and isinstance(priorities[0], (tuple, list)):
+            priority_arrays = [array('i', (priority[j] for priority in priorities))
+                               for j in range(len(priorities[0]))]
+        else:
+            priority_arrays = [array('i', priorities)]
+
+        if deduplicate:
+            seen = set()
+            unique_sources = []
+            unique_targets = []
+            for source, target in izip(sources, targets):
+                if (source, target) not in seen:
+                    seen.add((source, target))
+                    unique_sources.append(source)
+                    unique_targets.append(target)
+            sources, targets = unique_sources, unique_targets
+
+        g = cls(ids, array('b', players), priority_arrays, None, None, None, None)
+        g.succ_offsets, g.succ_targets = _counting_sort(n, map(g.index, sources), targets)
+        g.pred_offsets, g.pred_targets = _counting_sort(n, map(g.index, targets), sources)
+        return g
+
+    def index(self, node):
+        """
+        :param node: a node id
+        :return: the dense index of the node
+        """
+        if self.index_of is None:
+            return node - self.start
+        return self.index_of[node]
+
+    def get_nodes_descriptors(self):
+        """
+        :return: a read-only mapping from node ids to tuples (player, priority_1, ..., priority_k)
+        """
+        return self.nodes
+
+    def get_nodes(self):
+        """
+        :return: returns the list of every node in the games
+        """
+        return list(self.ids)
+
+    def get_node_player(self, node):
+        """
+        :param node: a node id
+        :return: the player to which a node belongs
+        """
+        return self.players[self.index(node)]
+
+    def get_node_priority(self, node):
+        """
+        :param node: a node id
+        :return: the priority of the node (or the first one in case of generalized parity)
+        """
+        return self.priorities[0][self.index(node)]
+
+    def get_node_priority_function_i(self, node, i):
+        """
+        Retrieves the priority of a node according to priority function i.
+        :param node: the node id
+        :param i: the priority function (1 to k)
+        :return: the priority of the node according to priority function i
+        """
+        return self.priorities[i - 1][self.index(node)]
+
+    def get_nodes_with_priority(self, priority, j=1):
+        """
+        :param priority: a priority
+        :param j: the priority function (1 to k)
+        :return: the list of nodes having that priority according to priority function j
+        """
+        return list(self._priority_buckets(j).get(priority, ()))
+
+    def get_priorities(self, j=1):
+        """
+        :param j: the priority function (1 to k)
+        :return: the list of priorities occurring in the game according to priority function j
+        """
+        return self._priority_buckets(j).keys()
+
+    def get_max_priority(self, j=1):
+        """
+        :param j: the priority function (1 to k)
+        :return: the maximum priority occurring in the game according to priority function j (None if there is none)
+        """
+        if j not in self.max_priorities:
+            buckets = self._priority_buckets(j)
+            self.max_priorities[j] = max(buckets) if buckets else None
+        return self.max_priorities[j]
+
+    def _priority_buckets(self, j):
+        """
+        :param j: the priority function (1 to k)
+        :return: the priority buckets of priority function j, built the first time they are requested
+        """
+        buckets = self.priority_index.get(j)
+        if buckets is None:
+            buckets = self.priority_index[j] = _priority_buckets(self.nodes, j)
+        return buckets
+
+    def get_successors(self, node):
+        """
+        :param node: a node id
+        :return: the successors of the node
+        """
+        i = self.index(node)
+        return self.succ_targets[self.succ_offsets[i]:self.succ_offsets[i + 1]]
+
+    def get_predecessors(self, node):
+        """
+        :param node: a node id
+        :return: the predecessors of the node
+        """
+        i = self.index(node)
+        return self.pred_targets[self.pred_offsets[i]:self.pred_offsets[i + 1]]
+
+    def get_out_degree(self, node):
+        """
+        :param node: a node id
+        :return: the number of successors of the node
+        """
+        i = self.index(node)
+        return self.succ_offsets[i + 1] - self.succ_offsets[i]
+
+    def subgame(self, set):
+        """
+        Creates a sub-game from the current game. The sub-game will contain all nodes in the provided set. The sub-game
+        is a view sharing the arrays of the current game, no edge is copied.
+        :param set: the list of nodes that the sub-game will contain.
+        :return: a sub-game.
+        """
+        return SubGame(self, set)
+
+    def with_descriptors(self, descriptors):
+        """
+        Creates a game with the same arena as the current game but different node descriptors. The edge arrays are
+        shared since they are never modified.
+        :param descriptors: a dictionary mapping every node id to its new descriptor (player, priority_1, ...).
+        :return: the new CSRGraph.
+        """
+        nbr_functions = len(descriptors[self.ids[0]]) - 1 if len(self.ids) else 1
+        players = array('b', (descriptors[node][0] for node in self.ids))
+        priorities = [array('i', (descriptors[node][j] for node in self.ids)) for j in range(1, nbr_functions + 1)]
+        return CSRGraph(self.ids, players, priorities, self.succ_offsets, self.succ_targets, self.pred_offsets,
+                        self.pred_targets, self.start)
+
+    def __str__(self):
+        rep = ""
+        for node in self.ids:
+            rep += str(node) + " " + str(self.nodes[node]) + "\n" + str(node) + " -> "
+            for succ in self.get_successors(node):
+                rep += str(succ) + ", "
+            rep += "\n"
+        return rep
+
+
+class SubGame(object):
+    """
+    Sub-game of a game graph, represented as a view over the arena of that graph. Only the nodes of the sub-game are
+    stored, in a dictionary (node id -> descriptor) which is used as a membership mask : the successors and predecessors
+    of a node are those of the node in the original arena which belong to the sub-game, filtered when they are
+    requested. Out-degrees in the sub-game are computed the first time they are needed and kept afterwards. Creating a
+    sub-game thus costs O(|set|) instead of O(m) for a copy of the adjacency lists. Sub-games of a sub-game are views
+    over the original arena as well. The priority buckets of a sub-game are those of the game it was created from,
+    filtered in their order, so that nodes of a given priority are listed in the same order in every nested sub-game.
+    """
+
+    def __init__(self, graph, set):
+        """
+        :param graph: the game graph (or sub-game) whose arena is shared.
+        :param set: the nodes of the sub-game.
+        """
+        parent = graph
+        if isinstance(graph, SubGame):
+            graph = graph.graph
+        self.graph = graph  # the original arena
+        descriptors = graph.get_nodes_descriptors()
+        self.nodes = dict((n, descriptors[n]) for n in set)
+        # the game whose priority buckets are filtered, released once the buckets of every priority function are built
+        self.parent = parent if self.nodes else None
+        self.out = {}  # out-degrees in the sub-game, computed on demand
+        self.priority_index = {}  # priority buckets, built on demand for each priority function
+        self.max_priorities = {}
+
+    def get_nodes_descriptors(self):
+        """
+        :return: the dictionary containing the node information
+        """
+        return self.nodes
+
+    def get_nodes(self):
+        """
+        :return: returns the list of every node in the games
+        """
+        return self.nodes.keys()
+
+    def get_node_player(self, node):
+        """
+        :param node: a node id
+        :return: the player to which a node belongs
+        """
+        return self.nodes[node][0]
+
+    def get_node_priority(self, node):
+        """
+        :param node: a node id
+        :return: the priority of the node (or the first one in case of generalized parity)
+        """
+        return self.nodes[node][1]
+
+    def get_node_priority_function_i(self, node, i):
+        """
+        Retrieves the priority of a node according to priority function i.
+        :param node: the node id
+        :param i: the priority function (1 to k)
+        :return: the priority of the node according to priority function i
+        """
+        return self.nodes[node][i]
+
+    def get_nodes_with_priority(self, priority, j=1):
+        """
+        :param priority: a priority
+        :param j: the priority function (1 to k)
+        :return: the list of nodes having that priority according to priority function j
+        """
+        return list(self._priority_buckets(j).get(priority, ()))
+
+    def get_priorities(self, j=1):
+        """
+        :param j: the priority function (1 to k)
+        :return: the list of priorities occurring in the game according to priority function j
+        """
+        return self._priority_buckets(j).keys()
+
+    def get_max_priority(self, j=1):
+        """
+        :param j: the priority function (1 to k)
+        :return: the maximum priority occurring in the game according to priority function j (None if there is none)
+        """
+        if j not in self.max_priorities:
+            buckets = self._priority_buckets(j)
+            self.max_priorities[j] = max(buckets) if buckets else None
+        return self.max_priorities[j]
+
+    def _priority_buckets(self, j):
+        """
+        :param j: the priority function (1 to k)
+        :return: the priority buckets of priority function j, built the first time they are requested
+        """
+        buckets = self.priority_index.get(j)
+        if buckets is None:
+            buckets = self.priority_index[j] = {}
+            nodes = self.nodes
+            parent = self.parent
+            if parent is not None:
+                for priority in parent.get_priorities(j):
+                    bucket = [node for node in parent.get_nodes_with_priority(priority, j) if node in nodes]
+                    if bucket:
+                        buckets[priority] = bucket
+                if len(self.priority_index) == len(next(nodes.itervalues())) - 1:
+                    self.parent = None
+        return buckets
+
+    def get_successors(self, node):
+        """
+        :param node: a node id
+        :return: the list of successors of the node in the sub-game
+        """
+        nodes = self.nodes
+        if node not in nodes:
+            return []
+        return [succ for succ in self.graph.get_successors(node) if succ in nodes]
+
+    def get_predecessors(self, node):
+        """
+        :param node: a node id
+        :return: the list of predecessors of the node in the sub-game
+        """
+        nodes = self.nodes
+        if node not in nodes:
+            return []
+        return [pred for pred in self.graph.get_predecessors(node) if pred in nodes]
+
+    def get_out_degree(self, node):
+        """
+        :param node: a node id
+        :return: the number of successors of the node in the sub-game
+        """
+        out = self.out.get(node)
+        if out is None:
+            out = len(self.get_successors(node))
+            self.out[node] = out
+        return out
 
     def subgame(self, set):
         """
-        Creates a sub-game from the current game. The sub-game will contain all nodes in the provided set.
+        Creates a sub-game from the current sub-game. The sub-game will contain all nodes in the provided set.
         :param set: the list of nodes that the sub-game will contain.
         :return: a sub-game.
         """
-        sub = self.__class__()
-        for n in set:
-            sub.nodes[n] = self.nodes[n]
-        for n in sub.nodes:
-            for succ in self.successors[n]:
-                if succ in sub.nodes:
-                    sub.successors[n].append(succ)
-                    sub.predecessors[succ].append(n)
-        return sub
+        return SubGame(self, set)
 
     def __str__(self):
         rep = ""
         for node in self.nodes:
+            rep += str(node) + " " + str(self.nodes[node]) + "\n" + str(node) + " -> "
+            for succ in self.get_successors(node):
+                rep += str(succ) + ", "
+            rep += "\n"
+        return rep
+
+
+class LazyGraph(object):
+    """
+    Game graph whose arena is explored on demand. Instead of being stored, the arena is described by two callbacks :
+    one which returns the successors of a node and one which returns its descriptor. Both are called at most once per
+    node, the first time the successors (resp. the player or a priority) of that node are requested, and their result is
+    kept. Nodes can be any hashable value. Only the explored part of the arena is known : get_nodes returns the nodes
+    discovered so far and get_predecessors the predecessors of a node through the edges explored so far. This is meant
+    for local solving (see reachability.local_reachability_solver), where the game is only explored from an initial node
+    and might be much larger than (or even too large to build) its reachable part.
+    """
+
+    def __init__(self, successors, descriptor):
+        """
+        :param successors: a function which maps a node to an iterable of its successors.
+        :param descriptor: a function which maps a node to its descriptor (player, priority_1, ..., priority_k).
+        """
+        self.successors_function = successors
+        self.descriptor_function = descriptor
+        self.successors = {}  # successors of the expanded nodes
+        self.predecessors = defaultdict(list)  # predecessors through the expanded edges
+        self.nodes = {}  # descriptors of the discovered nodes
+
+    def _descriptor(self, node):
+        """
+        :param node: a node id
+        :return: the descriptor of the node, computed by the callback the first time it is needed.
+        """
+        descriptor = self.nodes.get(node)
+        if descriptor is None:
+            descriptor = self.nodes[node] = tuple(self.descriptor_function(node))
+        return descriptor
+
+    def get_nodes_descriptors(self):
+        """
+        :return: the dictionary containing the information of the nodes discovered so far
+        """
+        return self.nodes
+
+    def get_nodes(self):
+        """
+        :return: the list of nodes discovered so far
+        """
+        return self.nodes.keys()
+
+    def get_node_player(self, node):
+        """
+        :param node: a node id
+        :return: the player to which a node belongs
+        """
+        return self._descriptor(node)[0]
+
+    def get_node_priority(self, node):
+        """
+        :param node: a node id
+        :return: the priority of the node (or the first one in case of generalized parity)
+        """
+        return self._descriptor(node)[1]
+
+    def get_node_priority_function_i(self, node, i):
+        """
+        Retrieves the priority of a node according to priority function i.
+        :param node: the node id
+        :param i: the priority function (1 to k)
+        :return: the priority of the node according to priority function i
+        """
+        return self._descriptor(node)[i]
+
+    def get_successors(self, node):
+        """
+        Expands the node if it was not expanded yet : its successors are computed by the callback, they become
+        discovered and the node is added to their predecessors.
+        :param node: a node id
+        :return: the list of successors of the node
+        """
+        successors = self.successors.get(node)
+        if successors is None:
+            self._descriptor(node)
+            successors = self.successors[node] = list(self.successors_function(node))
+            predecessors = self.predecessors
+            for successor in successors:
+                self._descriptor(successor)
+                predecessors[successor].append(node)
+        return successors
+
+    def get_predecessors(self, node):
+        """
+        :param node: a node id
+        :return: the list of predecessors of the node among the expanded nodes
+        """
+        return self.predecessors.get(node, [])
+
+    def get_out_degree(self, node):
+        """
+        :param node: a node id
+        :return: the number of successors of the node
+        """
+        return len(self.get_successors(node))
+
+    def explore(self, node):
+        """
+        Expands every node reachable from a node.
+        :param node: the initial node.
+        :return: the list of nodes reachable from the initial node, in depth-first order.
+        """
+        return reachable(self, node)
+
+    def __str__(self):
+        rep = ""
+        for node in self.successors:
             rep += str(node) + " " + str(self.nodes[node]) + "\n" + str(node) + " -> "
             for succ in self.successors[node]:
                 rep += str(succ) + ", "
             rep += "\n"
         return rep
+
+
+def reachable(g, node):
+    """
+    Computes the nodes reachable from a node, only the successors of those nodes are requested.
+    :param g: a game graph (any graph, including a LazyGraph).
+    :param node: the initial node.
+    :return: the list of nodes reachable from the initial node, in depth-first order.
+    """
+    seen = set([node])
+    order = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        order.append(current)
+        for successor in g.get_successors(current):
+            if successor not in seen:
+                seen.add(successor)
+                stack.append(successor)
+    return order
+
+
+def _canonical(value):
+    """
+    Encodes a node id or a descriptor value for the content hash of a frozen graph. Integers (int or long) are encoded
+    as signed 64-bit integers (or as their decimal representation if they do not fit), other values as their
+    representation. Each encoding starts with a tag so that values of different types cannot be confused.
+    :param value: the value.
+    :return: the encoding, a string.
+    """
+    if isinstance(value, (int, long)):
+        value = int(value)
+        if -(1 << 63) <= value < (1 << 63):
+            return 'q' + struct.pack('<q', value)
+        text = str(value)
+        return 'n' + struct.pack('<I', len(text)) + text
+    text = repr(value)
+    return 'r' + struct.pack('<I', len(text)) + text
+
+
+def _counting_sort(n, keys, values):
+    """
+    Groups values by key, preserving their order.
+    :param n: the number of keys (keys are 0 to n-1).
+    :param keys: keys[i] is the key of values[i].
+    :param values: the values to group.
+    :return: offsets and grouped values, values of key k being grouped[offsets[k]:offsets[k+1]].
+    """
+    offsets = array('l', [0]) * (n + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for k in xrange(n):
+        offsets[k + 1] += offsets[k]
+
+    grouped = array('i', [0]) * len(values)
+    position = array('l', offsets)
+    for key, value in izip(keys, values):
+        grouped[position[key]] = value
+        position[key] += 1
+    return offsets, grouped
+
+
+def _swap_remove(adjacency, positions, node, target):
+    """
+    Removes target from the adjacency list of node by moving the last element of the list to its position.
+    :param adjacency: the adjacency list of the node.
+    :param positions: a dictionary mapping nodes to their position map (element -> position in the adjacency list).
+    :param node: the node whose list is modified.
+    :param target: the element to remove.
+    """
+    node_positions = positions.get(node)
+    if node_positions is None:
+        node_positions = positions[node] = dict((element, i) for i, element in enumerate(adjacency))
+
+    i = node_positions.pop(target, None)
+    # the position can be missing or outdated in case of multi-edges or if the list was replaced, fall back to a search
+    if i is None or i >= len(adjacency) or adjacency[i] != target:
+        i = adjacency.index(target)
+
+    last = adjacency.pop()
+    if i < len(adjacency):
+        adjacency[i] = last
+        node_positions[last] = i
+
+
+def _priority_buckets(descriptors, j):
+    """
+    Groups nodes by priority.
+    :param descriptors: a mapping from node ids to descriptors (player, priority_1, ..., priority_k).
+    :param j: the priority function (1 to k).
+    :return: a dictionary whose keys are the priorities according to function j and values are lists of nodes.
+    """
+    buckets = {}
+    for node, descriptor in descriptors.iteritems():
+        priority = descriptor[j]
+        bucket = buckets.get(priority)
+        if bucket is None:
+            bucket = buckets[priority] = []
+        bucket.append(node)
+    return buckets
+
+
+class _CSRNodesView(object):
+    """
+    Read-only view of the nodes of a CSRGraph behaving like the dictionary Graph.nodes (node id -> descriptor tuple).
+    Descriptors are built on access from the parallel player and priority arrays.
+    """
+
+    def __init__(self, g):
+        self.g = g
+
+    def __len__(self):
+        return len(self.g.ids)
+
+    def __iter__(self):
+        return iter(self.g.ids)
+
+    def __contains__(self, node):
+        g = self.g
+        if g.index_of is None:
+            return isinstance(node, (int, long)) and 0 <= node - g.start < len(g.ids)
+        return node in g.index_of
+
+    def __getitem__(self, node):
+        g = self.g
+        i = g.index(node)
+        return tuple([g.players[i]] + [priorities[i] for priorities in g.priorities])
+
+    def keys(self):
+        return self.g.get_nodes()
+
+    def iterkeys(self):
+        return iter(self.g.ids)
+
+    def iteritems(self):
+        for node in self.g.ids:
+            yield node, self[node]
+
+    def items(self):
+        return list(self.iteritems())
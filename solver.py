@@ -12,6 +12,7 @@ from test import strongparity_test as sp_test
 from test import weakparity_test as wp_test
 from test import reachability_test as r_test
 from test import generalizedparity_test as gp_test
+from test import graph_test as g_test
 
 
 
@@ -40,7 +41,7 @@ def command_line_handler():
     group_solve.add_argument('-s', type=str, action='store', dest='safe', nargs = 1,
                              help='Solve a safety game with SAFE_SET for player 1', metavar=('SAFE_SET'))
     group_solve.add_argument('-wp', action='store_true', help='Solve a weak parity game')
-    group_solve.add_argument('-sp',action='store', choices=['recursive', 'safety', 'antichain'],
+    group_solve.add_argument('-sp',action='store', choices=['recursive', 'bits', 'safety', 'antichain'],
                              dest='parity_algorithm', help='Solve a strong parity game')
     group_solve.add_argument('-gp', action='store_true', help='Solve a generalized parity game')
 
@@ -48,6 +49,21 @@ def command_line_handler():
                               help='Path to the arena of the game to solve')
     parser_solve.add_argument('-o', required=False, type=str, action='store', dest='outputFile',
                               help='Path to the file in which to save the solution')
+    parser_solve.add_argument('-format', required=False, type=str, action='store', dest='outputFormat', default='dot',
+                              choices=['dot', 'pgsolver', 'compact'],
+                              help='Format of the solution file (Graphviz dot, PGSolver solution or one line per node)')
+    group_dot = parser_solve.add_mutually_exclusive_group()
+    group_dot.add_argument('-around', type=str, action='store', dest='around', metavar='NODES',
+                           help='Only write, in dot format, the part of the solution around the given nodes')
+    group_dot.add_argument('-summary', action='store_true',
+                           help='Write, in dot format, a summary of the solution in which each strongly connected '
+                                'component of each winning region is collapsed')
+    parser_solve.add_argument('-budget', required=False, type=int, action='store', dest='budget', default=500,
+                              help='Maximum number of nodes written with -around or -summary')
+    parser_solve.add_argument('-progress', action='store_true',
+                              help='Report the progress while the arena is loaded')
+    parser_solve.add_argument('-j', required=False, type=int, action='store', dest='processes', default=1,
+                              help='Number of processes used to load the arena (0 for one per core)')
 
     # create the parser for the "benchmark" command
     parser_benchmark = subparsers.add_parser('bench', help='Benchmark selected algorithm')
@@ -89,10 +105,15 @@ def solver():
     if args.mode == "solve":
 
         """ ----- Solving mode ----- """
-        if args.gp:
-            g = tools.load_generalized_from_file(args.inputFile)  # we have a generalized parity game arena
-        else:
-            g = tools.load_from_file(args.inputFile)  # loading game from the input file
+        progress = tools.print_progress if args.progress else None  # reports the loading progress if asked
+        # loading game from the input file, in binary or PGSolver format (generalized parity game arena for -gp)
+        # the antichain-based algorithm reads a PGSolver file directly into its C structure when the python game is not
+        # needed to write the solution
+        antichain_from_file = args.parity_algorithm == 'antichain' and args.outputFile is None and \
+                              tools.detect_format(args.inputFile) == "pgsolver"
+        if not antichain_from_file:
+            processes = args.processes if args.processes > 0 else None  # number of processes loading the arena
+            g = tools.load_game(args.inputFile, args.gp, progress, processes=processes)
         player = 0  # default player is 0, so solution comes as (W_0,sigma_0), (W_1,sigma_1) or (W_0, W_1)
 
         # Reachability (target and player is set)
@@ -125,12 +146,18 @@ def solver():
             if (args.parity_algorithm == 'recursive'):
                 solution = strongparity.strong_parity_solver(g)  # calling recursive algorithm for parity games
                 ops.print_solution(solution, player)  # printing the solution (with strategy)
+            elif (args.parity_algorithm == 'bits'):
+                solution = strongparity.strong_parity_solver_bits(g)  # calling recursive algorithm on bitarrays
+                ops.print_solution(solution, player)  # printing the solution (with strategy)
             elif (args.parity_algorithm == 'safety'):
                 solution = strongparity.reduction_to_safety_parity_solver(g)  # calling reduction to safety algorithm
                 ops.print_winning_regions(solution[0], solution[1]) # printing the solution (without strategy)
             elif (args.parity_algorithm == 'antichain'):
                 # calling antichain-based algorithm, assumes indexes start with 1
-                solution = strongparity.strong_parity_antichain_based(g,1)
+                if antichain_from_file:
+                    solution = strongparity.strong_parity_antichain_from_file(args.inputFile, 1)
+                else:
+                    solution = strongparity.strong_parity_antichain_based(g,1)
                 ops.print_winning_regions(solution[0], solution[1]) # printing the solution (without strategy)
             else:
                 # this should not happen
@@ -141,19 +168,25 @@ def solver():
             solution = generalizedparity.generalized_parity_solver(g)  # calling classical algorithm for generalized parity games
             ops.print_winning_regions(solution[0], solution[1])  # printing the solution (without strategy)
 
-        # If output option is chosen and the algorithm is the classical algo for generalized parity games, use special
-        # function dedicated to writing solution of generalized parity games (need to consider several priorities)
-        if (args.outputFile is not None) and args.gp:
-            tools.write_generalized_solution_to_file(g, solution[0], solution[1], args.outputFile)
-
-        # If output option is chosen and the algorithm is the reduction to safety algorithm for parity games or the
-        # antichain-based algorithm for parity games then the output is only the winning regions, not the strategies
-        elif (args.outputFile is not None) and (args.parity_algorithm == 'safety' or args.parity_algorithm == 'antichain'):
-            tools.write_solution_to_file_no_strategies(g, solution[0], solution[1], args.outputFile)
-
-        # Else the regular regions + strategies are output
-        elif args.outputFile is not None:
-            tools.write_solution_to_file(g, solution, player, args.outputFile)
+        # If output option is chosen, the solution is written in the chosen format. The classical algorithm for
+        # generalized parity games, the reduction to safety algorithm and the antichain-based algorithm for parity games
+        # only output the winning regions, not the strategies
+        if args.outputFile is not None:
+            if args.gp or args.parity_algorithm == 'safety' or args.parity_algorithm == 'antichain':
+                (W_0, sigma_0), (W_1, sigma_1) = (solution[0], None), (solution[1], None)
+            elif player == 0:
+                (W_0, sigma_0), (W_1, sigma_1) = solution
+            else:
+                (W_1, sigma_1), (W_0, sigma_0) = solution
+
+            # large games can be written partially (around some nodes) or summarized, in dot format
+            if args.around is not None:
+                around = map(int, args.around.split(","))
+                tools.write_dot_neighbourhood(g, W_0, W_1, args.outputFile, around, args.budget, sigma_0, sigma_1)
+            elif args.summary:
+                tools.write_dot_summary(g, W_0, W_1, args.outputFile, args.budget)
+            else:
+                tools.write_solution(g, W_0, W_1, args.outputFile, sigma_0, sigma_1, fmt=args.outputFormat)
 
     elif args.mode == "bench":
         """ ----- Benchmark mode ----- """
@@ -212,7 +245,8 @@ def solver():
         wp_test_result = wp_test.launch_tests()
         r_test_result = r_test.launch_tests()
         gp_test_result = gp_test.launch_tests()
-        if (sp_test_result and wp_test_result and r_test_result and gp_test_result):
+        g_test_result = g_test.launch_tests()
+        if (sp_test_result and wp_test_result and r_test_result and gp_test_result and g_test_result):
             print "All tests passed with success"
         else:
             print "Some tests failed"
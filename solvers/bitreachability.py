@@ -0,0 +1,140 @@
+# coding=utf-8
+"""
+Attractor engine working on bitarrays. Nodes are mapped to dense indices 0 to n-1 and every set of nodes (targets,
+regions, removed nodes, players, priorities) is a bitarray of length n, so that unions, intersections, complements
+and emptiness tests are word-parallel operations costing O(n/64). The attractor is computed level by level : the
+predecessors of the whole frontier are marked in a bitarray using the predecessors arrays of a CSR structure, then
+the candidates of the next level are selected with set operations.
+"""
+from array import array
+
+from bitarray import bitarray
+
+from graph import CSRGraph
+
+_ONE = bitarray('1')
+
+
+class BitArena(object):
+    """
+    Game arena in which nodes are dense indices and sets of nodes are bitarrays. The successors and predecessors of
+    node i are succ[succ_offsets[i]:succ_offsets[i+1]] and pred[pred_offsets[i]:pred_offsets[i+1]], as dense indices.
+    """
+
+    def __init__(self, g):
+        """
+        :param g: a game graph (Graph, FrozenGraph or CSRGraph).
+        """
+        csr = g if isinstance(g, CSRGraph) else CSRGraph.from_graph(g)
+        self.index = index = csr.index
+        self.ids = csr.ids  # node ids, node ids[i] has dense index i
+        self.n = n = len(csr.ids)
+        self.succ_offsets = csr.succ_offsets
+        self.succ = array('i', (index(node) for node in csr.succ_targets))
+        self.pred_offsets = csr.pred_offsets
+        self.pred = array('i', (index(node) for node in csr.pred_targets))
+
+        # players[j] is the set of nodes belonging to player j
+        player1 = bitarray([player == 1 for player in csr.players])
+        self.players = (~player1, player1)
+
+        # priorities[p] is the set of nodes of priority p, according to the first priority function
+        self.priorities = {}
+        for i, priority in enumerate(csr.priorities[0]):
+            if priority not in self.priorities:
+                self.priorities[priority] = self.empty()
+            self.priorities[priority][i] = True
+        self.sorted_priorities = sorted(self.priorities, reverse=True)
+
+    def empty(self):
+        """
+        :return: a new empty set of nodes.
+        """
+        s = bitarray(self.n)
+        s.setall(False)
+        return s
+
+    def bits(self, nodes):
+        """
+        :param nodes: a list of node ids.
+        :return: the set of those nodes.
+        """
+        s = self.empty()
+        index = self.index
+        for node in nodes:
+            s[index(node)] = True
+        return s
+
+    def nodes(self, s):
+        """
+        :param s: a set of nodes.
+        :return: the list of the ids of the nodes in s.
+        """
+        ids = self.ids
+        return [ids[i] for i in s.search(_ONE)]
+
+    def max_priority(self, live):
+        """
+        :param live: a set of nodes.
+        :return: the maximum priority of the nodes in live (None if live is empty).
+        """
+        for priority in self.sorted_priorities:
+            if (self.priorities[priority] & live).any():
+                return priority
+        return None
+
+    def attractor(self, target, j, removed):
+        """
+        Computes Att_j(target) in the subgame of the nodes which are not removed, along with an attractor strategy.
+        :param target: the target set.
+        :param j: the player for which we compute the attractor.
+        :param removed: the set of removed nodes.
+        :return: the attractor and a dictionary mapping its nodes belonging to j to a successor (dense indices).
+        """
+        n = self.n
+        succ = self.succ
+        succ_offsets = self.succ_offsets
+        pred = self.pred
+        pred_offsets = self.pred_offsets
+        mine = self.players[j]
+
+        region = target & ~removed
+        frontier = bitarray(region)
+        in_region = array('i', [0]) * n  # number of successors (with multiplicity) in the attractor
+        via = array('i', [-1]) * n  # a successor in the attractor, for the nodes of player j
+        live = array('i', [-1]) * n  # number of successors in the subgame, computed when first needed
+        strategy = {}
+
+        # targets belonging to j pick their first successor in the subgame
+        for i in (region & mine).search(_ONE):
+            for k in xrange(succ_offsets[i], succ_offsets[i + 1]):
+                if not removed[succ[k]]:
+                    strategy[i] = succ[k]
+                    break
+
+        while frontier.any():
+            reached = self.empty()
+            for v in frontier.search(_ONE):
+                for k in xrange(pred_offsets[v], pred_offsets[v + 1]):
+                    p = pred[k]
+                    reached[p] = True
+                    in_region[p] += 1
+                    if via[p] == -1:
+                        via[p] = v
+
+            candidates = reached & ~region & ~removed
+            # nodes of player j only need one successor in the attractor
+            new = candidates & mine
+            for i in new.search(_ONE):
+                strategy[i] = via[i]
+            # nodes of the opponent are attracted once all of their successors in the subgame are
+            for i in (candidates & ~mine).search(_ONE):
+                if live[i] == -1:
+                    live[i] = sum(1 for k in xrange(succ_offsets[i], succ_offsets[i + 1]) if not removed[succ[k]])
+                if in_region[i] == live[i]:
+                    new[i] = True
+
+            region |= new
+            frontier = new
+
+        return region, strategy
@@ -12,13 +12,14 @@ def transform_game(g, k):
     :param k:
     :return: the compemented game
     """
-    g_copy = copy.deepcopy(g) # Deep copy of the game g
-    descriptors = g_copy.get_nodes_descriptors() # Descriptors of the nodes (player, priority_1, ..., priority_k)
-    # For each node, get the descriptor and update the descriptor by adding 1 to each priority
-    for node in g_copy.get_nodes():
+    descriptors = g.get_nodes_descriptors() # Descriptors of the nodes (player, priority_1, ..., priority_k)
+    # For each node, get the descriptor and create the new descriptor by adding 1 to each priority
+    complemented = {}
+    for node in g.get_nodes():
         current = descriptors[node]
-        descriptors[node] = tuple([current[0]]+map(lambda x: x+1, current[1:]))
-    return g_copy
+        complemented[node] = tuple([current[0]]+map(lambda x: x+1, current[1:]))
+    # the arena is shared if g is immutable (FrozenGraph, CSRGraph), copied otherwise
+    return g.with_descriptors(complemented)
 
 
 def disj_parity_win2(g, maxValues, k, u):
@@ -120,8 +121,10 @@ def disj_parity_win(g, maxValues, k, u):
 
 
     for i in range(k):
-        attMaxOdd, compl_attMaxOdd = reachability.attractor(g, ops.i_priority_node_function_j(g, maxValues[i],i+1),0)
-        G1 = g.subgame(compl_attMaxOdd)
+        # the attractor is extended by T at each iteration instead of computing T in G1 : removing
+        # Att_0^G1(W1) from G1 = g \ Att_0^g(X) leaves g \ Att_0^g(X u W1)
+        attMaxOdd = reachability.Attractor(g, 0, ops.i_priority_node_function_j(g, maxValues[i],i+1))
+        G1 = g.subgame(attMaxOdd.complement())
         attMaxEven, compl_attMaxEven = reachability.attractor(G1,  ops.i_priority_node_function_j(G1, maxValues[i]-1,i+1),1)
         H1 = G1.subgame(compl_attMaxEven)
         j = 0
@@ -140,8 +143,8 @@ def disj_parity_win(g, maxValues, k, u):
                 B.extend(W2)
                 return W1, B
 
-            T, compl_T = reachability.attractor(G1, W1,0)
-            G1 = G1.subgame(compl_T)
+            attMaxOdd.extend(W1)
+            G1 = g.subgame(attMaxOdd.complement())
             E, compl_E = reachability.attractor(G1, ops.i_priority_node_function_j(g, maxValues[i]-1,i+1),0)
             H1 = G1.subgame(compl_E)
     return g.get_nodes(), []
@@ -162,15 +165,9 @@ def generalized_parity_solver(g):
     # Initializing the max values list
     maxValues = [0]*nbrFunctions
 
-    # Getting the maximum value according to each priority function
-    descriptors = transformed.get_nodes_descriptors()
-
-    # Get the maximal priority in the game according to every priority function.
-    for node in transformed.get_nodes():
-        current = descriptors[node]
-        for i in range(1,nbrFunctions+1):
-            if current[i] > maxValues[i-1]:
-                maxValues[i-1] = current[i]
+    # Get the maximal priority in the game according to every priority function (maintained by the game graph).
+    for i in range(1,nbrFunctions+1):
+        maxValues[i-1] = max(maxValues[i-1], transformed.get_max_priority(i))
 
     # Max values need to be odd, if some are even, add 1
     for i in range(0, nbrFunctions ):
@@ -196,13 +193,8 @@ def generalized_parity_solver_nocall(g):
     maxValues = [0]*nbrFunctions
 
     # Getting the maximum value according to each priority function
-    descriptors = transformed.get_nodes_descriptors()
-
-    for node in transformed.get_nodes():
-        current = descriptors[node]
-        for i in range(1,nbrFunctions+1):
-            if current[i] > maxValues[i-1]:
-                maxValues[i-1] = current[i]
+    for i in range(1,nbrFunctions+1):
+        maxValues[i-1] = max(maxValues[i-1], transformed.get_max_priority(i))
 
     # Max values need to be odd, if some is even, add 1
     for i in range(0, nbrFunctions ):
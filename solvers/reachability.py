@@ -1,4 +1,5 @@
 # coding=utf-8
+from array import array
 from collections import defaultdict, deque
 from tools import operations as op
 
@@ -12,12 +13,185 @@ def init_out(g):
     out = defaultdict(int)
 
     for node in g.get_nodes():
-        out[node] = len(g.get_successors(node))
+        out[node] = g.get_out_degree(node)
 
     return out
 
 
-def reachability_solver(g, U, j):
+# values of the regions scratch buffer of an attractor workspace
+UNVISITED = 0  # the node has not been seen yet
+COUNTED = 1  # the node belongs to the opponent and its out counter is initialized
+ATTRACTED = 2  # the node is in the attractor
+
+# stop conditions of an attractor computation with watched nodes
+ANY_WATCHED = "any"  # stop as soon as one of the watched nodes is attracted
+ALL_WATCHED = "all"  # stop as soon as every watched node is attracted
+
+# workspace of the games whose nodes cannot be used as indexes (see workspace_for), attractors use dictionaries
+NO_WORKSPACE = "dictionaries"
+
+
+def _watch(watched, stop):
+    """
+    Prepares the watched nodes of an attractor computation.
+    :param watched: the watched nodes (or None).
+    :param stop: the stop condition, ANY_WATCHED or ALL_WATCHED.
+    :return: a new set of the watched nodes, from which they are removed once attracted, and the number of them which
+    must be attracted before the computation stops (-1 if it never stops early, i.e. if there is no watched node).
+    """
+    if not watched:
+        return frozenset(), -1
+    if stop not in (ANY_WATCHED, ALL_WATCHED):
+        raise ValueError("unknown stop condition " + repr(stop))
+    watched = set(watched)
+    return watched, 1 if stop == ANY_WATCHED else len(watched)
+
+
+class AttractorWorkspace(object):
+    """
+    Scratch buffers used by the array-based attractor. Nodes are used as indexes in dense arrays, they must therefore
+    be integers between 0 and the size of the workspace. A workspace built for a game can be used for any of its
+    subgames and is left clean after each call, so that repeated attractor computations (e.g. in the recursive
+    algorithm) don't allocate anything but their results. A workspace must not be used by two computations at once.
+    """
+
+    def __init__(self, g):
+        """
+        :param g: the game graph, the players of its nodes are copied in the workspace.
+        """
+        nodes = g.get_nodes()
+        self.size = max(nodes) + 1 if len(nodes) != 0 else 0
+        self.players = bytearray(self.size)  # players[node] is the player to which node belongs
+        for node in nodes:
+            self.players[node] = g.get_node_player(node)
+        self.out = array('i', [0]) * self.size  # number of successors not yet in the attractor
+        self.regions = bytearray(self.size)  # UNVISITED, COUNTED or ATTRACTED
+        self.strategy = array('i', [-1]) * self.size  # successor chosen by the attracting player
+        self.queue = array('i', [0]) * self.size  # nodes of the attractor, in the order they were attracted
+        self.counted = array('i', [0]) * self.size  # nodes whose regions value is COUNTED
+
+
+def workspace_for(g):
+    """
+    Builds a workspace for g if its nodes can be used as indexes, i.e. if they are non-negative integers and the largest
+    one is not much larger than the number of nodes (the size of the buffers is the largest node plus one).
+    :param g: the game graph.
+    :return: an AttractorWorkspace built for g, or NO_WORKSPACE if the attractors of g must use dictionaries.
+    """
+    nodes = g.get_nodes()
+    for node in nodes:
+        if type(node) not in (int, long) or node < 0:
+            return NO_WORKSPACE
+    if len(nodes) != 0 and max(nodes) >= 2 * len(nodes) + 64:
+        return NO_WORKSPACE
+    return AttractorWorkspace(g)
+
+
+def _attract(g, U, j, workspace, watched=frozenset(), needed=-1):
+    """
+    Array-based kernel of the attractor. Computes Att_j^g(U) using the buffers of the workspace. When it returns, the
+    nodes of the attractor are marked ATTRACTED in workspace.regions and the strategy of player j is stored in
+    workspace.strategy. Once the regions have been used, they must be reset by calling _release. The computation stops
+    as soon as needed watched nodes are attracted, the attractor is then only partially computed.
+    :param g: the game graph.
+    :param U: the target set.
+    :param j: the player for which we compute the attractor.
+    :param workspace: the workspace, it must have been built for g or one of its supergames.
+    :param watched: the set of watched nodes which are not attracted yet, it is modified.
+    :param needed: the number of watched nodes to attract before stopping (-1 to compute the whole attractor).
+    :return: the list of nodes of the attractor, the number of nodes marked COUNTED and True if the computation stopped
+    early.
+    """
+    players = workspace.players
+    out = workspace.out
+    regions = workspace.regions
+    strategy = workspace.strategy
+    queue = workspace.queue
+    counted = workspace.counted
+    get_predecessors = g.get_predecessors
+    get_out_degree = g.get_out_degree
+
+    W = []  # the attractor
+    head = 0  # the queue holds queue[head:tail]
+    tail = 0
+    nbr_counted = 0
+
+    # for each node in the target set U
+    for node in U:
+        if regions[node] != ATTRACTED:
+            queue[tail] = node
+            tail += 1
+            regions[node] = ATTRACTED
+            W.append(node)
+            # if node belongs to j, set an arbitrary strategy for that node (we chose to select first successor)
+            if players[node] == j:
+                strategy[node] = g.get_successors(node)[0]
+            if node in watched:
+                watched.remove(node)
+                needed -= 1
+                if needed == 0:
+                    return W, nbr_counted, True
+
+    # while queue is not empty
+    while head < tail:
+        s = queue[head]
+        head += 1
+
+        # iterating over the predecessors of node s
+        for sbis in get_predecessors(s):
+            region = regions[sbis]
+            if region != ATTRACTED:
+                if players[sbis] == j:
+                    # belongs to j, set regions and strategy accordingly
+                    queue[tail] = sbis
+                    tail += 1
+                    regions[sbis] = ATTRACTED
+                    W.append(sbis)
+                    strategy[sbis] = s
+                    if sbis in watched:
+                        watched.remove(sbis)
+                        needed -= 1
+                        if needed == 0:
+                            return W, nbr_counted, True
+
+                else:
+                    # belongs to j bar, decrement out. If out is 0, set the region accordingly
+                    if region == UNVISITED:
+                        out[sbis] = get_out_degree(sbis)
+                        regions[sbis] = COUNTED
+                        counted[nbr_counted] = sbis
+                        nbr_counted += 1
+                    out[sbis] -= 1
+                    if out[sbis] == 0:
+                        queue[tail] = sbis
+                        tail += 1
+                        regions[sbis] = ATTRACTED
+                        W.append(sbis)
+                        if sbis in watched:
+                            watched.remove(sbis)
+                            needed -= 1
+                            if needed == 0:
+                                return W, nbr_counted, True
+
+    return W, nbr_counted, False
+
+
+def _release(workspace, W, nbr_counted):
+    """
+    Resets the regions of the workspace after a call to _attract, in time linear in the number of nodes it touched.
+    :param workspace: the workspace.
+    :param W: the attractor returned by _attract.
+    :param nbr_counted: the number of counted nodes returned by _attract.
+    """
+    regions = workspace.regions
+    counted = workspace.counted
+    for node in W:
+        regions[node] = UNVISITED
+    for i in xrange(nbr_counted):
+        regions[counted[i]] = UNVISITED
+
+
+def reachability_solver(g, U, j, workspace=None, watched=None, stop=ALL_WATCHED):
     """
     Reachability games solver. This function computes Att_j^g(U), the attractor for player j of target set U in the
     game g. That attractor is the winning region of player j who has the reachability objective in the game. The
@@ -27,14 +201,65 @@ def reachability_solver(g, U, j):
     :param g: the game graph.
     :param U: the target set.
     :param j: the player with the reachability objective.
+    :param workspace: an AttractorWorkspace built for g or one of its supergames. If None or NO_WORKSPACE, nodes are
+    stored in dictionaries, which allows nodes that are not integers.
+    :param watched: nodes whose winner is needed. If given, the computation stops as soon as the stop condition holds.
+    :param stop: ANY_WATCHED to stop once one of the watched nodes is attracted, ALL_WATCHED to stop once all of them
+    are (a watched node which is not attracted is only decided when the whole attractor is computed).
     :return: two tuples : (w_j, strat_j), (w_jbar, strat_jbar) where w_j and w_jbar are lists containing nodes of their
-    respective winning regions and where strat_j and strat_jbar are dictionaries containing winning strategies.
+    respective winning regions and where strat_j and strat_jbar are dictionaries containing winning strategies. If the
+    computation stopped early, w_j and strat_j only contain the nodes attracted so far and w_jbar and strat_jbar are
+    None.
+    """
+    watched, needed = _watch(watched, stop)
+    if workspace is None or workspace is NO_WORKSPACE:
+        return _reachability_solver_dict(g, U, j, watched, needed)
+    players = workspace.players
+    regions = workspace.regions
+    strategy = workspace.strategy
+    opponent = op.opponent(j)  # player j's opponent (jbar)
+
+    region_j, nbr_counted, stopped = _attract(g, U, j, workspace, watched, needed)  # winning region of j
+    region_opponent = []  # winning region of j bar
+    strat_j = defaultdict(lambda: -1)  # init strat for player j
+    strat_opponent = defaultdict(lambda: -1)  # init strat for player jbar
+
+    for node in region_j:
+        if players[node] == j:
+            strat_j[node] = strategy[node]
+
+    # the rest of the game is not scanned when the watched nodes are decided
+    if stopped:
+        _release(workspace, region_j, nbr_counted)
+        return (region_j, strat_j), (None, None)
+
+    # for each node that is not marked we set its region to the opponent and find a successor for the strategy
+    for node in g.get_nodes():
+        if regions[node] != ATTRACTED:
+            region_opponent.append(node)
+            if players[node] == opponent:
+                for successor in g.get_successors(node):
+                    if regions[successor] != ATTRACTED:
+                        strat_opponent[node] = successor
+
+    _release(workspace, region_j, nbr_counted)
+    return (region_j, strat_j), (region_opponent, strat_opponent)
+
+
+def _reachability_solver_dict(g, U, j, watched, needed):
     """
-    out = init_out(g)  # init out
+    Reachability games solver storing nodes in dictionaries, used when no workspace is given (e.g. because the nodes of
+    the game cannot be used as indexes of its buffers). See reachability_solver.
+    :param g: the game graph.
+    :param U: the target set.
+    :param j: the player with the reachability objective.
+    :param watched: the set of watched nodes which are not attracted yet, it is modified.
+    :param needed: the number of watched nodes to attract before stopping (-1 to compute the whole attractor).
+    :return: the solution in the format of reachability_solver.
+    """
+    out = {}  # number of successors not yet in the attractor, initialized when a node is first reached
     queue = deque()  # init queue (deque is part of standard library and allows O(1) append() and pop() at either end)
-    # this dictionary is used to know if a node belongs to a winning region without
-    # iterating over both winning regions lists (we can check in O(1) in average)
-    regions = defaultdict(lambda: -1)
+    attracted = set()
     region_j = []  # winning region of j
     region_opponent = []  # winning region of j bar
     strat_j = defaultdict(lambda: -1)  # init strat for player j
@@ -43,48 +268,155 @@ def reachability_solver(g, U, j):
 
     # for each node in the target set U
     for node in U:
-        queue.append(node)  # add node to the end of the queue
-        regions[node] = j  # set its regions to j (node is winning for j because reachability objective is satisfied)
-        region_j.append(node)  # add the node to the winning region list of j
-        # if node belongs to j, set an arbitrary strategy for that node (we chose to select first successor)
-        if g.get_node_player(node) == j:
-            strat_j[node] = g.get_successors(node)[0]
+        if node not in attracted:
+            queue.append(node)
+            attracted.add(node)
+            region_j.append(node)
+            # if node belongs to j, set an arbitrary strategy for that node (we chose to select first successor)
+            if g.get_node_player(node) == j:
+                strat_j[node] = g.get_successors(node)[0]
+            if node in watched:
+                watched.remove(node)
+                needed -= 1
+                if needed == 0:
+                    return (region_j, strat_j), (None, None)
 
     # while queue is not empty
     while queue:
-        s = queue.popleft()  # remove and return node on the left side of the queue (first in, first out)
+        s = queue.popleft()
 
         # iterating over the predecessors of node s
         for sbis in g.get_predecessors(s):
-            if regions[sbis] == -1:  # if sbis is not yet visited, its region is -1 by default
+            if sbis not in attracted:
                 if g.get_node_player(sbis) == j:
                     # belongs to j, set regions and strategy accordingly
                     queue.append(sbis)
-                    regions[sbis] = j
+                    attracted.add(sbis)
                     region_j.append(sbis)
                     strat_j[sbis] = s
-
-                elif g.get_node_player(sbis) == opponent:
+                else:
                     # belongs to j bar, decrement out. If out is 0, set the region accordingly
+                    if sbis not in out:
+                        out[sbis] = g.get_out_degree(sbis)
                     out[sbis] -= 1
-                    if out[sbis] == 0:
-                        queue.append(sbis)
-                        regions[sbis] = j
-                        region_j.append(sbis)
+                    if out[sbis] != 0:
+                        continue
+                    queue.append(sbis)
+                    attracted.add(sbis)
+                    region_j.append(sbis)
+                if sbis in watched:
+                    watched.remove(sbis)
+                    needed -= 1
+                    if needed == 0:
+                        return (region_j, strat_j), (None, None)
 
     # for each node that is not marked we set its region to the opponent and find a successor for the strategy
     for node in g.get_nodes():
-        if regions[node] != j:
-            regions[node] = opponent
+        if node not in attracted:
             region_opponent.append(node)
             if g.get_node_player(node) == opponent:
                 for successor in g.get_successors(node):
-                    if regions[successor] != j:
+                    if successor not in attracted:
                         strat_opponent[node] = successor
 
     return (region_j, strat_j), (region_opponent, strat_opponent)
 
 
+def local_reachability_solver(g, v0, U, j):
+    """
+    Local reachability games solver. Only decides the winner of the initial node v0 : the game is explored from v0 in a
+    depth-first manner and the attractor is computed during the exploration, on the edges explored so far. A node is
+    expanded (its successors are requested) when it is first visited, unless it is a target. The exploration stops as
+    soon as v0 is attracted, in which case player j wins from v0. Otherwise, every node reachable from v0 is explored
+    and player jbar wins from v0. This avoids building the whole game when the part explored from v0 is small compared
+    to it, g can be a LazyGraph.
+    :param g: the game graph.
+    :param v0: the initial node.
+    :param U: the target set (any container supporting the in operator) or a function returning True for the targets.
+    :param j: the player with the reachability objective.
+    :return: the winner of v0 and its winning region and strategy restricted to the explored part, in the following
+    format : winner, (W, strat). The nodes of W are the explored nodes known to be winning for the winner.
+    """
+    is_target = U if callable(U) else U.__contains__
+    opponent = op.opponent(j)
+    get_player = g.get_node_player
+
+    out = {}  # number of successors not yet in the attractor, for the expanded nodes of j bar
+    predecessors = defaultdict(list)  # predecessors through the edges explored so far
+    attracted = set()
+    W = []  # the attractor, in the order nodes are attracted
+    strat_j = defaultdict(lambda: -1)
+    seen = set([v0])
+    stack = [v0]
+
+    while stack and v0 not in attracted:
+        node = stack.pop()
+        if node in attracted:
+            continue
+
+        if is_target(node):
+            queue = [node]
+            attracted.add(node)
+            W.append(node)
+            # if node belongs to j, set an arbitrary strategy for that node (we chose to select first successor)
+            if get_player(node) == j:
+                strat_j[node] = g.get_successors(node)[0]
+        else:
+            # expands the node, it is attracted as soon as one of its successors (all of its successors for j bar) is
+            queue = []
+            successors = g.get_successors(node)
+            player = get_player(node)
+            remaining = len(successors)
+            for successor in successors:
+                predecessors[successor].append(node)
+                if successor in attracted:
+                    remaining -= 1
+                    if player == j or remaining == 0:
+                        queue.append(node)
+                        attracted.add(node)
+                        W.append(node)
+                        if player == j:
+                            strat_j[node] = successor
+                        # the other successors of node are not needed to decide v0
+                        break
+                elif successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+            out[node] = remaining
+
+        # propagates the attraction backwards along the edges explored so far
+        while queue:
+            s = queue.pop()
+            for sbis in predecessors[s]:
+                if sbis not in attracted:
+                    if get_player(sbis) == j:
+                        attracted.add(sbis)
+                        W.append(sbis)
+                        strat_j[sbis] = s
+                        queue.append(sbis)
+                    else:
+                        out[sbis] -= 1
+                        if out[sbis] == 0:
+                            attracted.add(sbis)
+                            W.append(sbis)
+                            queue.append(sbis)
+
+    if v0 in attracted:
+        return j, (W, strat_j)
+
+    # every node reachable from v0 has been expanded, those which are not attracted are winning for j bar
+    region_opponent = []
+    strat_opponent = defaultdict(lambda: -1)
+    for node in seen:
+        if node not in attracted:
+            region_opponent.append(node)
+            if get_player(node) == opponent:
+                for successor in g.get_successors(node):
+                    if successor not in attracted:
+                        strat_opponent[node] = successor
+    return opponent, (region_opponent, strat_opponent)
+
+
 def init_out_non_removed(g, removed):
     """
     Computes the number of outgoing edges for each node that hasn't been removed in the graph g.
@@ -100,88 +432,210 @@ def init_out_non_removed(g, removed):
     return out
 
 
-def reachability_solver_non_removed(g, U, j, removed):
+class RemovedMask(object):
     """
-    Reachability games solver. Uses a list of removed nodes instead of creation of subgames. This function computes
-    Att_j^g(U), the attractor for player j of target set U in the game g. That attractor is the winning region of player
-    j who has the reachability objective in the game. The rest of the nodes are part of the winning region of player
-    jbar (player j's opponent). Winning regions and strategies are computed and returned by the algorithm. The winning
-    regions and strategies are return as two tuples to resemble pseudo-code and facilitate weak and strong parity
-    solvers readability.
-    :param removed: the removed nodes from g.
+    Mask of the removed nodes of a game, used to track sub-games without creating them. Along with the mask, the
+    number of successors of each node which are not removed (its live out-degree) and the number of nodes of each
+    priority which are not removed are maintained as nodes are removed. Removals are recorded in an undo log : the
+    recursive algorithm removes an attractor before a recursive call and restores the mask afterwards, both in time
+    linear in the number of edges of the attractor. Attractors can then start from the live out-degrees instead of
+    recomputing them for the whole game.
+    """
+
+    def __init__(self, g, removed):
+        """
+        :param g: the game graph.
+        :param removed: the removed nodes from g (a bitarray or list indexed by node id), modified in place but
+        restored by restore().
+        """
+        self.g = g
+        self.removed = removed
+        self.live_out = {}  # number of successors which are not removed
+        self.live_priorities = defaultdict(int)  # number of nodes of each priority which are not removed
+        self.nbr_live = 0  # number of nodes which are not removed
+        self.log = []  # removed nodes, in the order in which they were removed
+
+        for node in g.get_nodes():
+            self.live_out[node] = len([succ for succ in g.get_successors(node) if not removed[succ]])
+            if not removed[node]:
+                self.live_priorities[g.get_node_priority(node)] += 1
+                self.nbr_live += 1
+
+    def remove(self, nodes):
+        """
+        Removes nodes from the game.
+        :param nodes: the nodes to remove.
+        """
+        g = self.g
+        removed = self.removed
+        live_out = self.live_out
+        for node in nodes:
+            if not removed[node]:
+                removed[node] = True
+                self.log.append(node)
+                self.live_priorities[g.get_node_priority(node)] -= 1
+                self.nbr_live -= 1
+                for pred in g.get_predecessors(node):
+                    live_out[pred] -= 1
+
+    def mark(self):
+        """
+        :return: the current position in the undo log, to be given to restore().
+        """
+        return len(self.log)
+
+    def restore(self, mark):
+        """
+        Puts back the nodes removed since the mark was taken.
+        :param mark: a position in the undo log returned by mark().
+        """
+        g = self.g
+        removed = self.removed
+        live_out = self.live_out
+        log = self.log
+        while len(log) > mark:
+            node = log.pop()
+            removed[node] = False
+            self.live_priorities[g.get_node_priority(node)] += 1
+            self.nbr_live += 1
+            for pred in g.get_predecessors(node):
+                live_out[pred] += 1
+
+    def max_priority(self):
+        """
+        :return: the maximum priority of the nodes which are not removed.
+        """
+        return max(priority for priority, count in self.live_priorities.iteritems() if count > 0)
+
+    def nodes_with_priority(self, priority):
+        """
+        :param priority: a priority.
+        :return: the list of nodes of that priority which are not removed.
+        """
+        removed = self.removed
+        return [node for node in self.g.get_nodes_with_priority(priority) if not removed[node]]
+
+
+def attractor_non_removed(g, U, j, mask):
+    """
+    Computes Att_j(U) in the sub-game of the nodes which are not removed, along with the attractor strategy of player
+    j. The out counters start from the live out-degrees maintained by the mask, so that only the edges into the
+    attractor are processed and the rest of the game is never visited.
     :param g: the game graph.
     :param U: the target set.
-    :param j: the player with the reachability objective.
-    :return: two tuples : (w_j, strat_j), (w_jbar, strat_jbar) where w_j and w_jbar are lists containing nodes of their
-    respective winning regions and where strat_j and strat_jbar are dictionaries containing winning strategies.
+    :param j: the player for which we compute the attractor.
+    :param mask: the RemovedMask of g.
+    :return: the attractor and the strategy of player j in the attractor (a dictionary).
     """
-    out = init_out_non_removed(g, removed)  # init out
-    queue = deque()  # init queue (deque is part of standard library and allows O(1) append() and pop() at either end)
-    # this dictionary is used to know if a node belongs to a winning region without
-    # iterating over both winning regions lists (we can check in O(1) in average)
-    regions = defaultdict(lambda: -1)
-    region_j = []  # winning region of j
-    region_opponent = []  # winning region of j bar
-    strat_j = defaultdict(lambda: -1)  # init strat for player j
-    strat_opponent = defaultdict(lambda: -1)  # init strat for player jbar
-    opponent = op.opponent(j)  # player j's opponent (jbar)
+    removed = mask.removed
+    live_out = mask.live_out
+    out = {}  # number of successors not yet in the attractor, initialized when a node is first reached
+    queue = deque()
+    attracted = set()
+    W = []  # the attractor
+    strat_j = defaultdict(lambda: -1)
 
     # for each node in the target set U
     for node in U:
-        queue.append(node)  # add node to the end of the queue
-        regions[node] = j  # set its regions to j (node is winning for j because reachability objective is satisfied)
-        region_j.append(node)  # add the node to the winning region list of j
+        queue.append(node)
+        attracted.add(node)
+        W.append(node)
         # if node belongs to j, set an arbitrary strategy for that node (we chose to select first successor)
         if g.get_node_player(node) == j:
-            strat_j[node] = filter(lambda x: not removed[x], g.get_successors(node))[0]
+            for successor in g.get_successors(node):
+                if not removed[successor]:
+                    strat_j[node] = successor
+                    break
 
     # while queue is not empty
     while queue:
-        s = queue.popleft()  # remove and return node on the left side of the queue (first in, first out)
+        s = queue.popleft()
 
         # iterating over the predecessors of node s
         for sbis in g.get_predecessors(s):
-            if not removed[sbis]:
-                if regions[sbis] == -1:  # if sbis is not yet visited, its region is -1 by default
-                    if g.get_node_player(sbis) == j:
-                        # belongs to j, set regions and strategy accordingly
+            if not removed[sbis] and sbis not in attracted:
+                if g.get_node_player(sbis) == j:
+                    # belongs to j, set regions and strategy accordingly
+                    queue.append(sbis)
+                    attracted.add(sbis)
+                    W.append(sbis)
+                    strat_j[sbis] = s
+
+                else:
+                    # belongs to j bar, decrement out. If out is 0, sbis is attracted
+                    if sbis not in out:
+                        out[sbis] = live_out[sbis]
+                    out[sbis] -= 1
+                    if out[sbis] == 0:
                         queue.append(sbis)
-                        regions[sbis] = j
-                        region_j.append(sbis)
-                        strat_j[sbis] = s
+                        attracted.add(sbis)
+                        W.append(sbis)
+
+    return W, strat_j
 
-                    elif g.get_node_player(sbis) == opponent:
-                        # belongs to j bar, decrement out. If out is 0, set the region accordingly
-                        out[sbis] -= 1
-                        if out[sbis] == 0:
-                            queue.append(sbis)
-                            regions[sbis] = j
-                            region_j.append(sbis)
+
+def reachability_solver_non_removed(g, U, j, removed, mask=None):
+    """
+    Reachability games solver. Uses a list of removed nodes instead of creation of subgames. This function computes
+    Att_j^g(U), the attractor for player j of target set U in the game g. That attractor is the winning region of player
+    j who has the reachability objective in the game. The rest of the nodes are part of the winning region of player
+    jbar (player j's opponent). Winning regions and strategies are computed and returned by the algorithm. The winning
+    regions and strategies are return as two tuples to resemble pseudo-code and facilitate weak and strong parity
+    solvers readability.
+    :param removed: the removed nodes from g.
+    :param g: the game graph.
+    :param U: the target set.
+    :param j: the player with the reachability objective.
+    :param mask: the RemovedMask of g and removed (built if None).
+    :return: two tuples : (w_j, strat_j), (w_jbar, strat_jbar) where w_j and w_jbar are lists containing nodes of their
+    respective winning regions and where strat_j and strat_jbar are dictionaries containing winning strategies.
+    """
+    if mask is None:
+        mask = RemovedMask(g, removed)
+    region_j, strat_j = attractor_non_removed(g, U, j, mask)
+    attracted = set(region_j)
+    region_opponent = []  # winning region of j bar
+    strat_opponent = defaultdict(lambda: -1)  # init strat for player jbar
+    opponent = op.opponent(j)  # player j's opponent (jbar)
 
     # for each node that is not marked we set its region to the opponent and find a successor for the strategy
     for node in g.get_nodes():
         if not removed[node]:
-            if regions[node] != j:
-                regions[node] = opponent
+            if node not in attracted:
                 region_opponent.append(node)
                 if g.get_node_player(node) == opponent:
                     for successor in g.get_successors(node):
-                        if regions[successor] != j and not removed[successor]:
+                        if successor not in attracted and not removed[successor]:
                             strat_opponent[node] = successor
 
     return (region_j, strat_j), (region_opponent, strat_opponent)
 
 
-def attractor(g, U, j):
+def attractor(g, U, j, workspace=None, watched=None, stop=ALL_WATCHED):
     """
     Computes the attractor for player j of the set U in g. Does not create any strategy and only returns the set that
     corresponds to the attractor.
     :param g: the game graph.
     :param U: the target set.
     :param j: the player for which we compute the attractor.
-    :return: W the set of nodes corresponding to the attractor.
+    :param workspace: an AttractorWorkspace built for g or one of its supergames. If None or NO_WORKSPACE, nodes are
+    stored in dictionaries, which allows nodes that are not integers.
+    :param watched: nodes whose membership is needed. If given, the computation stops as soon as the stop condition
+    holds.
+    :param stop: ANY_WATCHED to stop once one of the watched nodes is attracted, ALL_WATCHED to stop once all of them
+    are.
+    :return: W the set of nodes corresponding to the attractor and Wbis its complement in g. If the computation stopped
+    early, W only contains the nodes attracted so far and Wbis is None.
     """
-    out = init_out(g)  # init out
+    watched, needed = _watch(watched, stop)
+    if workspace is not None and workspace is not NO_WORKSPACE:
+        W, nbr_counted, stopped = _attract(g, U, j, workspace, watched, needed)
+        regions = workspace.regions
+        Wbis = None if stopped else [node for node in g.get_nodes() if regions[node] != ATTRACTED]
+        _release(workspace, W, nbr_counted)
+        return W, Wbis
+
+    out = {}  # number of successors not yet in the attractor, initialized when a node is first reached
     queue = deque()  # init queue (deque is part of standard library and allows O(1) append() and pop() at either end)
     # this dictionary is used to know if a node belongs to a winning region without
     # iterating over both winning regions lists (we can check in O(1) in average)
@@ -194,6 +648,11 @@ def attractor(g, U, j):
         queue.append(node)  # add node to the end of the queue
         regions[node] = j  # set its regions to j (node is winning for j because reachability objective is satisfied)
         W.append(node)  # add the node to the winning region list of j
+        if node in watched:
+            watched.remove(node)
+            needed -= 1
+            if needed == 0:
+                return W, None
 
     # while queue is not empty
     while queue:
@@ -207,17 +666,177 @@ def attractor(g, U, j):
                     queue.append(sbis)
                     regions[sbis] = j
                     W.append(sbis)
+                    if sbis in watched:
+                        watched.remove(sbis)
+                        needed -= 1
+                        if needed == 0:
+                            return W, None
 
                 elif g.get_node_player(sbis) == opponent:
                     # belongs to j bar, decrement out. If out is 0, set the region accordingly
+                    if sbis not in out:
+                        out[sbis] = g.get_out_degree(sbis)
                     out[sbis] -= 1
                     if out[sbis] == 0:
                         queue.append(sbis)
                         regions[sbis] = j
                         W.append(sbis)
+                        if sbis in watched:
+                            watched.remove(sbis)
+                            needed -= 1
+                            if needed == 0:
+                                return W, None
 
     Wbis = []
     for node in g.get_nodes():
             if regions[node] != j:
                 Wbis.append(node)
     return W, Wbis
+
+
+class Attractor(object):
+    """
+    Attractor for player j in a game g which can be extended with new target nodes. The queue, the out counters of the
+    opponent's nodes and the attracted nodes are kept between extensions, so that each edge of g is processed at most
+    once in total, whatever the number of extensions. As the complement of an attractor for player j is a trap for
+    player j, Att_j^g(X u Y) = Att_j^g(X) u Att_j^(g \ Att_j^g(X))(Y) : extending the attractor of X with Y yields the
+    same nodes as computing the attractor of Y in the subgame g \ Att_j^g(X), without recomputing Att_j^g(X).
+    """
+
+    def __init__(self, g, j, U=()):
+        """
+        :param g: the game graph.
+        :param j: the player for which we compute the attractor.
+        :param U: the initial target set.
+        """
+        self.g = g
+        self.j = j
+        self.out = {}  # number of successors not yet in the attractor, initialized when a node is first reached
+        self.queue = deque()
+        self.attracted = set()
+        self.nodes = []  # the attractor, in the order in which nodes were attracted
+        self.extend(U)
+
+    def _attract(self, node):
+        """
+        Adds a node to the attractor.
+        :param node: a node which is not yet in the attractor.
+        """
+        self.attracted.add(node)
+        self.nodes.append(node)
+        self.queue.append(node)
+
+    def extend(self, U):
+        """
+        Extends the attractor with the target set U, i.e. computes Att_j^g(X u U) where X is the current target set.
+        :param U: the new target nodes.
+        :return: the list of nodes added to the attractor.
+        """
+        g = self.g
+        j = self.j
+        out = self.out
+        queue = self.queue
+        attracted = self.attracted
+        first = len(self.nodes)
+
+        for node in U:
+            if node not in attracted:
+                self._attract(node)
+
+        # while queue is not empty
+        while queue:
+            s = queue.popleft()
+
+            # iterating over the predecessors of node s, each node is popped only once
+            for sbis in g.get_predecessors(s):
+                if sbis not in attracted:
+                    if g.get_node_player(sbis) == j:
+                        self._attract(sbis)
+                    else:
+                        # belongs to j bar, decrement out. If out is 0, sbis is attracted
+                        if sbis not in out:
+                            out[sbis] = g.get_out_degree(sbis)
+                        out[sbis] -= 1
+                        if out[sbis] == 0:
+                            self._attract(sbis)
+
+        return self.nodes[first:]
+
+    def __contains__(self, node):
+        return node in self.attracted
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def complement(self):
+        """
+        :return: the list of nodes of g which are not in the attractor.
+        """
+        attracted = self.attracted
+        return [node for node in self.g.get_nodes() if node not in attracted]
+
+
+def layered_attractors(g, requests):
+    """
+    Computes a sequence of attractors over the same arena in a single pass. Request k is a pair (U_k, j_k) and the k-th
+    attractor is Att_j_k^h_k(U_k), where h_k is the subgame of g obtained by removing the attractors of the previous
+    requests (nodes of U_k which were already removed are ignored). This is the sequence computed by the weak parity
+    solver. Instead of building every h_k, each node keeps a single counter of its successors which are not yet in an
+    attractor, shared by all requests : a node is attracted by the current player as soon as one of its successors
+    is, and by his opponent once that counter reaches 0. Each edge is thus processed once for the whole sequence,
+    which costs O(n + m) plus the size of the target sets.
+    :param g: the game graph.
+    :param requests: an ordered list of pairs (U, j) where U is a target set and j the player for which we compute
+    the attractor.
+    :return: the list of tuples (A_k, strat_k) where A_k is the k-th attractor and strat_k the strategy of player j_k
+    in it (a dictionary), and the list of nodes which belong to none of the attractors.
+    """
+    layer = {}  # index of the attractor to which a node belongs
+    live = {}  # number of successors not yet in an attractor, initialized when a node is first reached
+    queue = deque()
+    layers = []
+
+    for k, (U, j) in enumerate(requests):
+        A = []  # the k-th attractor
+        strat = defaultdict(lambda: -1)  # strategy of player j in A
+
+        for node in U:
+            if node not in layer:
+                layer[node] = k
+                A.append(node)
+                queue.append(node)
+                # if node belongs to j, select its first successor in h_k as strategy
+                if g.get_node_player(node) == j:
+                    for successor in g.get_successors(node):
+                        if layer.get(successor, k) == k:
+                            strat[node] = successor
+                            break
+
+        # while queue is not empty
+        while queue:
+            s = queue.popleft()
+
+            # iterating over the predecessors of node s which are still in h_k
+            for sbis in g.get_predecessors(s):
+                if sbis not in layer:
+                    if g.get_node_player(sbis) == j:
+                        # belongs to j, set layer and strategy accordingly
+                        layer[sbis] = k
+                        A.append(sbis)
+                        queue.append(sbis)
+                        strat[sbis] = s
+
+                    else:
+                        # belongs to j bar, decrement its counter. If it is 0, every successor in h_k is in A
+                        if sbis not in live:
+                            live[sbis] = g.get_out_degree(sbis)
+                        live[sbis] -= 1
+                        if live[sbis] == 0:
+                            layer[sbis] = k
+                            A.append(sbis)
+                            queue.append(sbis)
+
+        layers.append((A, strat))
+
+    leftover = [node for node in g.get_nodes() if node not in layer]
+    return layers, leftover
@@ -0,0 +1,175 @@
+# coding=utf-8
+"""
+Level-synchronous attractor computed with NumPy. Instead of popping nodes one by one from a queue, the whole frontier
+(the nodes attracted at the previous level) is processed at once : the predecessors edges of the frontier are gathered
+from a CSR structure, the out counters of the opponent's nodes are decremented with a single vectorised operation and
+the nodes of the next level are selected with boolean masks. This is well suited to dense or high degree arenas, where
+the per-edge loop of reachability.reachability_solver dominates. The order in which nodes are attracted is the order
+of the queue-based solver, which yields the same regions and strategies.
+"""
+from collections import defaultdict
+
+from graph import CSRGraph
+from tools import operations as op
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _numpy():
+    """
+    :return: the numpy module, an ImportError is raised if it is not available.
+    """
+    if np is None:
+        raise ImportError("numpy is required by the vectorised attractor")
+    return np
+
+
+class SparseArena(object):
+    """
+    Game arena stored as NumPy arrays over the dense indices of the nodes. The successors (resp. predecessors) of node
+    i are succ[succ_offsets[i]:succ_offsets[i+1]] (resp. pred[pred_offsets[i]:pred_offsets[i+1]]), as dense indices.
+    """
+
+    def __init__(self, g):
+        """
+        :param g: a game graph (Graph, FrozenGraph or CSRGraph).
+        """
+        np = _numpy()
+        csr = g if isinstance(g, CSRGraph) else CSRGraph.from_graph(g)
+        self.csr = csr
+        self.ids = np.array(csr.ids)  # node ids, node ids[i] has dense index i
+        self.n = len(self.ids)
+        self.players = np.array(csr.players, dtype=np.int8)
+        self.succ_offsets = np.array(csr.succ_offsets, dtype=np.intp)
+        self.succ = self.indices(csr.succ_targets)
+        self.pred_offsets = np.array(csr.pred_offsets, dtype=np.intp)
+        self.pred = self.indices(csr.pred_targets)
+        self.out_degree = np.diff(self.succ_offsets)
+        # source of each successor edge, the edges of a node are contiguous
+        self.succ_sources = np.repeat(np.arange(self.n, dtype=np.intp), self.out_degree)
+
+    def indices(self, nodes):
+        """
+        :param nodes: a sequence of node ids.
+        :return: the array of their dense indices.
+        """
+        csr = self.csr
+        if csr.index_of is None:
+            return np.array(nodes, dtype=np.intp) - csr.start
+        return np.array([csr.index_of[node] for node in nodes], dtype=np.intp)
+
+    def attractor(self, U, j):
+        """
+        Computes Att_j(U) level by level.
+        :param U: the target set (node ids).
+        :param j: the player for which we compute the attractor.
+        :return: the attractor (dense indices, in the order in which nodes are attracted), a boolean mask of the
+        attractor and the successor chosen by player j for each node (-1 for the other nodes).
+        """
+        n = self.n
+        pred = self.pred
+        pred_offsets = self.pred_offsets
+        mine = self.players == j
+
+        # targets, duplicates are only considered once
+        frontier = self.indices(U)
+        _, first = np.unique(frontier, return_index=True)
+        frontier = frontier[np.sort(first)]
+
+        in_region = np.zeros(n, dtype=bool)
+        in_region[frontier] = True
+        out = self.out_degree.copy()  # number of successors not yet in the attractor
+        strategy = np.full(n, -1, dtype=np.intp)
+        # targets belonging to j pick their first successor
+        targets_j = frontier[mine[frontier]]
+        strategy[targets_j] = self.succ[self.succ_offsets[targets_j]]
+        levels = [frontier]
+
+        while frontier.size:
+            # predecessors edges of the frontier, in the order in which the queue-based solver visits them
+            starts = pred_offsets[frontier]
+            lengths = pred_offsets[frontier + 1] - starts
+            total = lengths.sum()
+            if total == 0:
+                break
+            edges = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+            preds = pred[edges]
+            owners = np.repeat(frontier, lengths)  # the node of the frontier from which each edge is visited
+            positions = np.arange(total)
+            outside = ~in_region[preds]
+            preds, owners, positions = preds[outside], owners[outside], positions[outside]
+            player_j = mine[preds]
+
+            # nodes of player j are attracted by the first edge visited
+            nodes_j, first = np.unique(preds[player_j], return_index=True)
+            strategy[nodes_j] = owners[player_j][first]
+            found_j = positions[player_j][first]
+
+            # nodes of the opponent are attracted by the edge which brings their counter to 0
+            preds_o = preds[~player_j]
+            positions_o = positions[~player_j]
+            order = np.argsort(preds_o, kind='mergesort')
+            sorted_o = preds_o[order]
+            nodes_o, group, counts = np.unique(sorted_o, return_index=True, return_counts=True)
+            attracted = counts >= out[nodes_o]
+            out[nodes_o] -= counts
+            last = order[group[attracted] + out[nodes_o[attracted]] + counts[attracted] - 1]
+            nodes_o = nodes_o[attracted]
+            found_o = positions_o[last]
+
+            # the next level, in the order in which nodes were found
+            new = np.concatenate((nodes_j, nodes_o))
+            frontier = new[np.argsort(np.concatenate((found_j, found_o)), kind='mergesort')]
+            in_region[frontier] = True
+            levels.append(frontier)
+
+        return np.concatenate(levels), in_region, strategy
+
+    def opponent_strategy(self, in_region, j):
+        """
+        :param in_region: a boolean mask of an attractor for player j.
+        :param j: the player of the attractor.
+        :return: for each node of the opponent outside the attractor, its last successor outside the attractor
+        (-1 for the other nodes).
+        """
+        sources = self.succ_sources
+        targets = self.succ
+        keep = ~in_region[sources] & (self.players[sources] != j) & ~in_region[targets]
+        sources, targets = sources[keep], targets[keep]
+        strategy = np.full(self.n, -1, dtype=np.intp)
+        # the last edge of a node is written last
+        strategy[sources] = targets
+        return strategy
+
+
+def reachability_solver(g, U, j, arena=None):
+    """
+    Reachability games solver using the level-synchronous attractor. Returns the same regions and strategies as
+    reachability.reachability_solver, in the same format.
+    :param g: the game graph.
+    :param U: the target set.
+    :param j: the player with the reachability objective.
+    :param arena: the SparseArena of g (built from g if None).
+    :return: two tuples : (w_j, strat_j), (w_jbar, strat_jbar) where w_j and w_jbar are lists containing nodes of their
+    respective winning regions and where strat_j and strat_jbar are dictionaries containing winning strategies.
+    """
+    if arena is None:
+        arena = SparseArena(g)
+    ids = arena.ids
+    opponent = op.opponent(j)
+
+    region, in_region, strategy = arena.attractor(U, j)
+    region_j = ids[region].tolist()
+    attracted_j = region[arena.players[region] == j]
+    strat_j = defaultdict(lambda: -1, zip(ids[attracted_j].tolist(), ids[strategy[attracted_j]].tolist()))
+
+    outside = np.flatnonzero(~in_region)
+    region_opponent = ids[outside].tolist()
+    strategy = arena.opponent_strategy(in_region, j)
+    defined = outside[(arena.players[outside] == opponent) & (strategy[outside] != -1)]
+    strat_opponent = defaultdict(lambda: -1, zip(ids[defined].tolist(), ids[strategy[defined]].tolist()))
+
+    return (region_j, strat_j), (region_opponent, strat_opponent)
@@ -1,18 +1,19 @@
+# coding=utf-8
 from collections import defaultdict, deque
 
-from bitarray import bitarray
-
+import bitreachability
 import reachability
-from antichains.library_linker import winning_region_c
 from graph import Graph
 from tools import operations as ops
-from tools.operations import transform_graph_into_c_spec, transform_graph_into_c
+from tools.operations import CGraph
 import ast
 
-def strong_parity_solver(g):
+def strong_parity_solver(g, workspace=None):
     """
     Strong parity games solver. This is an implementation of the recursive algorithm used to solve parity games.
     :param g: the game to solve.
+    :param workspace: the AttractorWorkspace shared by the recursive calls (built from g if None) or
+    reachability.NO_WORKSPACE if the nodes of g are stored in dictionaries.
     :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
     """
     W1 = []  # Winning region of player 0
@@ -25,6 +26,9 @@ def strong_parity_solver(g):
         return (W1, strat1), (W2, strat2)
 
     else:
+        if workspace is None:
+            # scratch buffers reused by every attractor computation (NO_WORKSPACE if nodes are stored in dictionaries)
+            workspace = reachability.workspace_for(g)
         i = ops.max_priority(g)  # get max priority occurring in g
 
         # determining which player we are considering, if i is even : player 0 and else player 1
@@ -38,13 +42,13 @@ def strong_parity_solver(g):
         U = ops.i_priority_node(g, i)  # target set for the attractor : nodes of priority i
 
         # getting the attractor A and the attractor strategy tau and discarding the region and strategy for the opponent
-        (A, tau1), (discard1, discard2) = reachability.reachability_solver(g, U, j)
+        (A, tau1), (discard1, discard2) = reachability.reachability_solver(g, U, j, workspace)
 
         # The subgame G\A is composed of the nodes not in the attractor, thus the nodes of the opposite player's region
         G_A = g.subgame(discard1)
 
         # Recursively solving the subgame G\A, solution comes as (W_0, sigma_0), (W_1, sigma_1)
-        sol_player1, sol_player2 = strong_parity_solver(G_A)
+        sol_player1, sol_player2 = strong_parity_solver(G_A, workspace)
 
         # depending on which player we are considering, assign regions and strategies to the proper variables
         # W'_j is noted W_j, sigma'_j is noted sig_j; the same aplies for jbar
@@ -70,12 +74,12 @@ def strong_parity_solver(g):
                 strat2.update(sig_j)
         else:
             # compute attractor B and strategy nu
-            (B, nu), (discard1, discard2) = reachability.reachability_solver(g, W_jbar, opponent)
+            (B, nu), (discard1, discard2) = reachability.reachability_solver(g, W_jbar, opponent, workspace)
             # The subgame G\B is composed of the nodes not in the attractor, so of the opposite player's winning region
             G_B = g.subgame(discard1)
 
             # recursively solve subgame G\B, solution comes as (W_0, sigma_0), (W_1, sigma_1)
-            sol_player1_, sol_player2_ = strong_parity_solver(G_B)
+            sol_player1_, sol_player2_ = strong_parity_solver(G_B, workspace)
 
             # depending on which player we are considering, assign regions and strategies to the proper variables
             # W''_j is noted W__j, sigma''_j is noted sig__j; the same aplies for jbar
@@ -111,12 +115,14 @@ def strong_parity_solver(g):
 
     return (W1, strat1), (W2, strat2)
 
-def strong_parity_solver_no_strategies(g):
+def strong_parity_solver_no_strategies(g, workspace=None):
     """
     Strong parity games solver. This is an implementation of the recursive algorithm used to solve parity games.
     This implementation does not compute the winning strategies (for comparison purpose with other algorithms
     which don't)
     :param g: the game to solve.
+    :param workspace: the AttractorWorkspace shared by the recursive calls (built from g if None) or
+    reachability.NO_WORKSPACE if the nodes of g are stored in dictionaries.
     :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
     """
     W1 = []  # Winning region of player 0
@@ -127,6 +133,9 @@ def strong_parity_solver_no_strategies(g):
         return W1, W2
 
     else:
+        if workspace is None:
+            # scratch buffers reused by every attractor computation (NO_WORKSPACE if nodes are stored in dictionaries)
+            workspace = reachability.workspace_for(g)
         i = ops.max_priority(g)  # get max priority occurring in g
 
         # determining which player we are considering, if i is even : player 0 and else player 1
@@ -140,13 +149,13 @@ def strong_parity_solver_no_strategies(g):
         U = ops.i_priority_node(g, i)  # target set for the attractor : nodes of priority i
 
         # getting the attractor A and discarding the region for the opponent
-        A, discard1 = reachability.attractor(g,U,j)
+        A, discard1 = reachability.attractor(g, U, j, workspace)
 
         # The subgame G\A is composed of the nodes not in the attractor, thus the nodes of the opposite player's region
         G_A = g.subgame(discard1)
 
         # Recursively solving the subgame G\A, solution comes as (W_0, W_1)
-        sol_player1, sol_player2 = strong_parity_solver_no_strategies(G_A)
+        sol_player1, sol_player2 = strong_parity_solver_no_strategies(G_A, workspace)
 
         # depending on which player we are considering, assign regions to the proper variables
         # W'_j is noted W_j, sigma'_j is noted sig_j; the same aplies for jbar
@@ -168,12 +177,12 @@ def strong_parity_solver_no_strategies(g):
                 W2.extend(W_j)
         else:
             # compute attractor B
-            B, discard1 = reachability.attractor(g, W_jbar, opponent)
+            B, discard1 = reachability.attractor(g, W_jbar, opponent, workspace)
             # The subgame G\B is composed of the nodes not in the attractor, so of the opposite player's winning region
             G_B = g.subgame(discard1)
 
             # recursively solve subgame G\B, solution comes as (W_0, W_1)
-            sol_player1_, sol_player2_ = strong_parity_solver_no_strategies(G_B)
+            sol_player1_, sol_player2_ = strong_parity_solver_no_strategies(G_B, workspace)
 
             # depending on which player we are considering, assign regions to the proper variables
             # W''_j is noted W__j, sigma''_j is noted sig__j; the same aplies for jbar
@@ -199,13 +208,15 @@ def strong_parity_solver_no_strategies(g):
 
     return W1, W2
 
-def strong_parity_solver_non_removed(g, removed):
+def strong_parity_solver_non_removed(g, removed, mask=None):
     """
     Strong parity games solver. This algorithm is an implementation of the recursive algorithm used to solve parity
     games. It uses a list of non-removed nodes as a way to track sub-games. The attractor computation also uses this
     technique. The value at position i in the list is true if node i is removed from the original game arena.
+    The list is modified during the recursion but restored before returning.
     :param removed: the removed nodes.
     :param g: the game to solve.
+    :param mask: the RemovedMask shared by the recursive calls (built from g and removed if None).
     :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
     """
 
@@ -214,14 +225,16 @@ def strong_parity_solver_non_removed(g, removed):
     strat1 = defaultdict(lambda: -1)  # Winning strategy of player 0
     strat2 = defaultdict(lambda: -1)  # Winning strategy of player 1
 
+    if mask is None:
+        mask = reachability.RemovedMask(g, removed)
+
     # if the game is empty, return the empty regions and strategies
-    # removed is a bitarray, count(42) counts the occurrences of True
-    # if every element in the list is true, every node is removed and the game is empty
-    if removed.count(42) == len(g.nodes):
+    # the mask counts the nodes which are not removed
+    if mask.nbr_live == 0:
         return (W1, strat1), (W2, strat2)
 
     else:
-        i = ops.max_priority_non_removed(g, removed)  # get max priority occurring in g, considering the removed nodes
+        i = mask.max_priority()  # get max priority occurring in g, considering the removed nodes
         # determining which player we are considering, if i is even : player 0 and else player 1
         if i % 2 == 0:
             j = 0
@@ -231,19 +244,19 @@ def strong_parity_solver_non_removed(g, removed):
         opponent = ops.opponent(j)  # getting the opponent of the player
 
         # target set for the attractor : nodes of priority i, considering the removed nodes
-        U = ops.i_priority_node_non_removed(g, i, removed)
+        U = mask.nodes_with_priority(i)
 
-        # getting the attractor A and the attractor strategy tau and discarding the region and strategy for the opponent
-        # using the attractor function which considers the non removed nodes
-        (A, tau1), (discard1, discard2) = reachability.reachability_solver_non_removed(g, U, j, removed)
+        # getting the attractor A and the attractor strategy tau using the attractor function which considers the non
+        # removed nodes, the region and strategy of the opponent are not needed
+        A, tau1 = reachability.attractor_non_removed(g, U, j, mask)
 
         # The subgame G\A is composed of the nodes not in the attractor, thus the nodes of the opposite player's region
-        # Copy the bitarray and remove the nodes of the attractor by setting their value to True in the list
-        copy_removed1 = bitarray(removed)
-        for nodes in A:
-            copy_removed1[nodes] = True
+        # The nodes of the attractor are removed from the mask and put back after the recursive call
+        mark = mask.mark()
+        mask.remove(A)
         # Recursively solving the subgame G\A, solution comes as (W_0, sigma_0), (W_1, sigma_1)
-        sol_player1, sol_player2 = strong_parity_solver_non_removed(g, copy_removed1)
+        sol_player1, sol_player2 = strong_parity_solver_non_removed(g, removed, mask)
+        mask.restore(mark)
 
         # depending on which player we are considering, assign regions and strategies to the proper variables
         # W'_j is noted W_j, sigma'_j is noted sig_j; the same aplies for jbar
@@ -269,14 +282,14 @@ def strong_parity_solver_non_removed(g, removed):
                 strat2.update(sig_j)
         else:
             # compute attractor B and strategy nu
-            (B, nu), (discard1, discard2) = reachability.reachability_solver_non_removed(g, W_jbar, opponent, removed)
+            B, nu = reachability.attractor_non_removed(g, W_jbar, opponent, mask)
             # The subgame G\B is composed of the nodes not in the attractor, so of the opposite player's winning region
-            copy_removed2 = bitarray(removed)
-            for nodes in B:
-                copy_removed2[nodes] = True
+            mark = mask.mark()
+            mask.remove(B)
 
             # recursively solve subgame G\B, solution comes as (W_0, sigma_0), (W_1, sigma_1)
-            sol_player1_, sol_player2_ = strong_parity_solver_non_removed(g, copy_removed2)
+            sol_player1_, sol_player2_ = strong_parity_solver_non_removed(g, removed, mask)
+            mask.restore(mark)
 
             # depending on which player we are considering, assign regions and strategies to the proper variables
             # W''_j is noted W__j, sigma''_j is noted sig__j; the same aplies for jbar
@@ -313,47 +326,212 @@ def strong_parity_solver_non_removed(g, removed):
     return (W1, strat1), (W2, strat2)
 
 
+def strong_parity_solver_local(g, v0):
+    """
+    Decides the winner of the initial node v0 only. The part of the game reachable from v0 is a trap for both players,
+    the winner of v0 in that part is therefore its winner in g. Only that part is explored and solved, g can be a
+    LazyGraph.
+    :param g: the game graph.
+    :param v0: the initial node.
+    :return: the winner of v0 and its winning region and strategy in the part reachable from v0, in the following
+    format : winner, (W, sigma).
+    """
+    h, ids = ops.reachable_subgame(g, v0)
+    return ops.local_solution(strong_parity_solver(h), ids)
+
+
+def strong_parity_solver_scc(g):
+    """
+    Strong parity games solver processing the strongly connected components of g in reverse topological order. The
+    winner of a play only depends on the priorities visited infinitely often : once the components below a component
+    are solved, its exits lead to nodes whose winner is known and behave as sinks won by that player. A trivial
+    component (a single node without self-loop) is won by its owner if one of its successors is, by the opponent
+    otherwise. Other components need a fixpoint : each of them is solved by the recursive algorithm on a game made of
+    its nodes, its own edges and a sink for each player, the exits being redirected to the sink of the winner of their
+    target. Büchi games, i.e. parity games with priorities 1 and 2, are solved component by component in that way.
+    :param g: the game to solve.
+    :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
+    """
+    W = ([], [])  # winning regions of players 0 and 1
+    sigma = (defaultdict(lambda: -1), defaultdict(lambda: -1))  # winning strategies of players 0 and 1
+    winner = {}  # winner of the nodes of the components already solved
+
+    for component in ops.strongly_connected_components(g):
+        node = component[0]
+        successors = g.get_successors(node)
+        if len(component) == 1 and node not in successors:
+            player = g.get_node_player(node)
+            # the owner selects its first successor which it wins, if any
+            for successor in successors:
+                if winner[successor] == player:
+                    sigma[player][node] = successor
+                    break
+            else:
+                player = ops.opponent(player)
+            winner[node] = player
+            W[player].append(node)
+        else:
+            _solve_component(g, component, winner, W, sigma)
+
+    return (W[0], sigma[0]), (W[1], sigma[1])
+
+
+def _solve_component(g, component, winner, W, sigma):
+    """
+    Solves a non-trivial strongly connected component, given the winners of the nodes below it. The nodes of the
+    component are numbered from 0 to n - 1 in a new game, in which nodes n and n + 1 are sinks (self-loops) of
+    priorities 0 and 1 won by players 0 and 1. An edge leaving the component goes to the sink of the winner of its
+    target. A node whose strategy selects a sink moves to its first successor below the component won by its owner.
+    :param g: the game graph.
+    :param component: the nodes of the component.
+    :param winner: the winners of the nodes, the winners of the nodes of the component are added.
+    :param W: the winning regions of players 0 and 1, the nodes of the component are added.
+    :param sigma: the strategies of players 0 and 1, updated with the strategies of the nodes of the component.
+    """
+    n = len(component)
+    index = dict((node, i) for i, node in enumerate(component))
+    sinks = (n, n + 1)
+    sources = []
+    targets = []
+    for i, node in enumerate(component):
+        for successor in g.get_successors(node):
+            sources.append(i)
+            targets.append(index[successor] if successor in index else sinks[winner[successor]])
+    sources.extend(sinks)
+    targets.extend(sinks)
+    players = [g.get_node_player(node) for node in component] + [0, 0]
+    priorities = [g.get_node_priority(node) for node in component] + [0, 1]
+    h = Graph.from_edges(sources, targets, players, priorities, deduplicate=True)
+
+    for player, (region, strategy) in enumerate(strong_parity_solver(h)):
+        for i in region:
+            if i >= n:
+                continue
+            node = component[i]
+            winner[node] = player
+            W[player].append(node)
+            if players[i] == player:
+                target = strategy[i]
+                if target < n:
+                    sigma[player][node] = component[target]
+                else:
+                    for successor in g.get_successors(node):
+                        if successor not in index and winner[successor] == player:
+                            sigma[player][node] = successor
+                            break
+
+
+def strong_parity_solver_bits(g):
+    """
+    Strong parity games solver. This algorithm is an implementation of the recursive algorithm used to solve parity
+    games in which sub-games, targets and winning regions are bitarrays over the dense indices of the nodes (see
+    solvers.bitreachability). Unions, complements and emptiness tests are then word-parallel operations.
+    :param g: the game to solve.
+    :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
+    """
+    arena = bitreachability.BitArena(g)
+    (W1, sig1), (W2, sig2) = _strong_parity_solver_bits(arena, arena.empty())
+
+    # regions and strategies use dense indices, they are translated back to node ids
+    ids = arena.ids
+    strat1 = defaultdict(lambda: -1)
+    strat2 = defaultdict(lambda: -1)
+    for node, successor in sig1.iteritems():
+        strat1[ids[node]] = ids[successor]
+    for node, successor in sig2.iteritems():
+        strat2[ids[node]] = ids[successor]
+    return (arena.nodes(W1), strat1), (arena.nodes(W2), strat2)
+
+
+def _strong_parity_solver_bits(arena, removed):
+    """
+    Recursive part of strong_parity_solver_bits, solves the sub-game of the nodes which are not removed.
+    :param arena: the BitArena of the game.
+    :param removed: the set of removed nodes.
+    :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1) where regions are bitarrays and
+    strategies are dictionaries over dense indices.
+    """
+    live = ~removed
+
+    # if the game is empty, return the empty regions and strategies
+    if not live.any():
+        return (arena.empty(), {}), (arena.empty(), {})
+
+    i = arena.max_priority(live)  # get max priority occurring in the sub-game
+    j = i % 2  # if i is even : player 0 and else player 1
+    opponent = ops.opponent(j)
+
+    # getting the attractor A and the attractor strategy tau of the nodes of priority i
+    A, tau = arena.attractor(arena.priorities[i] & live, j, removed)
+
+    # Recursively solving the subgame G\A
+    solution = _strong_parity_solver_bits(arena, removed | A)
+    (W_j, sig_j), (W_jbar, sig_jbar) = solution if j == 0 else solution[::-1]
+
+    if not W_jbar.any():
+        # player j wins everywhere, his strategy is tau in A and sig_j elsewhere
+        W_j |= A
+        sig_j.update(tau)
+        W_jbar = arena.empty()
+        sig_jbar = {}
+    else:
+        # compute attractor B and strategy nu
+        B, nu = arena.attractor(W_jbar, opponent, removed)
+
+        # recursively solve subgame G\B
+        solution = _strong_parity_solver_bits(arena, removed | B)
+        (W__j, sig__j), (W__jbar, sig__jbar) = solution if j == 0 else solution[::-1]
+
+        # nu is defined on W_jbar and must be replaced on W_jbar by the strategy sig_jbar
+        nu.update(sig__jbar)
+        nu.update(sig_jbar)
+        W_j, sig_j = W__j, sig__j
+        W_jbar, sig_jbar = W__jbar | B, nu
+
+    if j == 0:
+        return (W_j, sig_j), (W_jbar, sig_jbar)
+    return (W_jbar, sig_jbar), (W_j, sig_j)
+
+
 def strong_parity_antichain_based(graph, start_index):
     """
     Implementation of the antichain-based algorithm for parity games.
     Performs a check on the numbering used in the game graph before transforming it into a C graph
     Performs a call to a C function which implements the backward fixpoint algorithm to solve safety games
-    using antichains.
+    using antichains. The C graph is destroyed once the game is solved.
     :param graph: the python game arena of the parity game we want to solve.
     :param start_index: the start index for the numbering of nodes in the game.
     :return: the solution of the parity game with game arena graph
     """
-    if (start_index == 1):
-        g, nbr_nodes = transform_graph_into_c(graph)
-        return symbolic_strong_parity_solver(g, nbr_nodes,1)
+    if start_index in (0, 1):
+        with CGraph.from_graph(graph, start_index) as g:
+            return g.solve()
 
-    elif (start_index == 0):
-        g, nbr_nodes = transform_graph_into_c_spec(graph)
-        return symbolic_strong_parity_solver(g, nbr_nodes,0)
+
+def strong_parity_antichain_from_file(path, start_index):
+    """
+    Antichain-based algorithm for parity games, the game arena is read from a file in PGSolver format directly into
+    the C graph structure, without creating a python game graph.
+    :param path: path to the file containing the game arena.
+    :param start_index: the start index for the numbering of nodes in the game.
+    :return: the solution of the parity game in the file.
+    """
+    with CGraph.from_file(path, start_index) as g:
+        return g.solve()
 
 
 def symbolic_strong_parity_solver(graph, nbr_nodes,increment):
     """
     Solves the parity game with game arena graph. Requires the number of nodes in the game and an increment.
     This increment is used when nodes are re-indexed so their numbering starts with 0.
+    The C graph is not destroyed, see CGraph in tools.operations for a handle which owns it.
     :param nbr_nodes: number of nodes in the graph.
     :param graph: the game arena of the parity game in C format.
     :return: the winning regions W0 and W1 in the parity game.
     """
-    W0 = []
-    W1 = []
-
-    res = winning_region_c(graph) # call to the C function which implements the backward fixpoint algorithm
     # The safety game obtained by reduction is solved symbolically using antichains.
     # This algorithm yields the winning regions in the parity game it takes as parameter.
-
-    # winning regions returns an array of integers, 1 if node is won by player 0 and 0 if won by player 1
-    for i in range(nbr_nodes):
-        if res[i] == 1:
-            W0.append(i+increment)
-        elif res[i] == 0:
-                W1.append(i+increment)
-    return W0, W1
+    return ops.c_winning_regions(graph, nbr_nodes, increment)
 
 
 def up(node, priority, max_counter):
@@ -433,10 +611,9 @@ def reduction_to_safety_parity_solver(graph):
     :return: the winning regions in the parity game
     """
     # First we find out the number of counters necessary
-    maximum = -1
-    for node in graph.get_nodes():
-        if (graph.get_node_priority(node) > maximum):
-            maximum = graph.get_node_priority(node)
+    maximum = graph.get_max_priority()
+    if maximum is None:  # empty game
+        maximum = -1
     if maximum%2 == 0:
         maxOdd = maximum-1
     else:
@@ -1,4 +1,5 @@
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import izip
 
 from solvers import reachability as rs
 from tools import operations as ops
@@ -12,6 +13,8 @@ def weak_parity_solver(g):
     """
 
     h = g  # the game we work on
+    # scratch buffers reused by every attractor computation (NO_WORKSPACE if nodes are stored in dictionaries)
+    workspace = rs.workspace_for(g)
     i = ops.max_priority(h)  # Maximum priority occurring in g
 
     W0 = []  # winning region for player 0
@@ -24,7 +27,7 @@ def weak_parity_solver(g):
         current_player = k % 2  # get current player
 
         # calling the reachability solver on the game h with target set "nodes of priority k" and for the current player
-        (Ak, eta), (Bk, nu) = rs.reachability_solver(h, ops.i_priority_node(h, k), current_player)
+        (Ak, eta), (Bk, nu) = rs.reachability_solver(h, ops.i_priority_node(h, k), current_player, workspace)
 
         # depending on the current player, we add the nodes of Ak in a winning region and update strategies
         if current_player == 0:
@@ -40,3 +43,186 @@ def weak_parity_solver(g):
         h = h.subgame(Bk)  # updates the current game (only keeping nodes in Bk)
 
     return (W0, sigma0), (W1, sigma1)
+
+
+def weak_parity_solver_local(g, v0):
+    """
+    Decides the winner of the initial node v0 only. Only the part of the game reachable from v0, which is a trap for
+    both players, is explored and solved. g can be a LazyGraph.
+    :param g: the game graph.
+    :param v0: the initial node.
+    :return: the winner of v0 and its winning region and strategy in the part reachable from v0, in the following
+    format : winner, (W, sigma).
+    """
+    h, ids = ops.reachable_subgame(g, v0)
+    return ops.local_solution(weak_parity_solver(h), ids)
+
+
+def weak_parity_solver_single_pass(g):
+    """
+    Weak parity games solver computing the same sequence of attractors as weak_parity_solver in a single pass (see
+    reachability.layered_attractors). Only the priorities occurring in g are considered and the sub-games are never
+    built : nodes are removed from the game by marking the attractor to which they belong and every node keeps a
+    single counter of its successors which are not removed yet, shared by all attractors. Each edge is thus processed
+    a constant number of times, the whole algorithm runs in O(n + m) whatever the range of the priorities.
+    :param g: the game to solve.
+    :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
+    """
+    priorities = sorted(g.get_priorities(), reverse=True)  # priorities occurring in g, in decreasing order
+    W = ([], [])  # winning regions of players 0 and 1
+    sigma = (defaultdict(lambda: -1), defaultdict(lambda: -1))  # winning strategies of players 0 and 1
+    if not priorities:
+        return (W[0], sigma[0]), (W[1], sigma[1])
+
+    layers, _ = rs.layered_attractors(g, [(ops.i_priority_node(g, k), k % 2) for k in priorities])
+    removed_at = {}  # priority whose attractor contains the node
+    for k, (Ak, eta) in izip(priorities, layers):
+        W[k % 2].extend(Ak)
+        sigma[k % 2].update(eta)
+        for node in Ak:
+            removed_at[node] = k
+
+    # weak_parity_solver updates the strategy of a node in Bk, at every iteration k for which the node belongs to the
+    # opponent of the current player, with its last successor in Bk. For a node in Ak which belongs to the opponent,
+    # the last of those updates is made at iteration k + 2 (if k + 2 does not exceed the maximum priority, the
+    # iteration takes place even if no node has that priority), with its last successor in Bk+2.
+    i = priorities[0]
+    for k, (Ak, eta) in izip(priorities, layers):
+        if k + 2 > i:
+            continue
+        opponent = ops.opponent(k % 2)
+        for node in Ak:
+            if g.get_node_player(node) == opponent:
+                for successor in g.get_successors(node):
+                    if removed_at[successor] <= k + 1:
+                        sigma[opponent][node] = successor
+
+    return (W[0], sigma[0]), (W[1], sigma[1])
+
+
+def weak_parity_solver_scc(g):
+    """
+    Weak parity games solver processing the strongly connected components of g in reverse topological order. The
+    iteration of weak_parity_solver at which a node is removed (its layer, a priority) only depends on the layers of
+    its successors, it can thus be computed once the layers of the components below have been. In a component, the
+    sequence of attractors is computed on the edges of the component only, its exits (edges towards a component below)
+    are fixed : an exit of layer k counts as a successor attracted at iteration k. A trivial component (a single node
+    without self-loop) needs no attractor : its node is removed at the first iteration (the largest priority) at which
+    it is a target, at which one of its successors is attracted by its owner or at which its last successor is removed.
+    Regions are those of weak_parity_solver and strategies are built in the same way, but since attractors are not
+    computed in the same order, the successors chosen by the strategies may differ.
+    :param g: the game to solve.
+    :return: the solution in the following format : (W_0, sigma_0), (W_1, sigma_1).
+    """
+    W = ([], [])  # winning regions of players 0 and 1
+    sigma = (defaultdict(lambda: -1), defaultdict(lambda: -1))  # winning strategies of players 0 and 1
+    layer = {}  # iteration of weak_parity_solver at which a node is removed
+    i = ops.max_priority(g)
+    get_successors = g.get_successors
+    get_player = g.get_node_player
+
+    for component in ops.strongly_connected_components(g):
+        node = component[0]
+        successors = get_successors(node)
+        if len(component) == 1 and node not in successors:
+            player = get_player(node)
+            priority = g.get_node_priority(node)
+            layers = [layer[successor] for successor in successors]
+            k = max(priority, min(layers)) if layers else priority
+            for successor_layer in layers:
+                if successor_layer > k and successor_layer % 2 == player:
+                    k = successor_layer
+            layer[node] = k
+            if player == k % 2:
+                # a target selects its first successor which is not removed before iteration k, other nodes a
+                # successor removed at iteration k
+                for successor, successor_layer in izip(successors, layers):
+                    if successor_layer <= k if k == priority else successor_layer == k:
+                        sigma[player][node] = successor
+                        break
+            elif k + 2 <= i:
+                # strategy of a node of the opponent of the winner of its region, see weak_parity_solver_single_pass
+                for successor, successor_layer in izip(successors, layers):
+                    if successor_layer <= k + 1:
+                        sigma[player][node] = successor
+            W[k % 2].append(node)
+            continue
+
+        _component_layers(g, component, layer, sigma)
+        for node in component:
+            k = layer[node]
+            W[k % 2].append(node)
+            player = get_player(node)
+            if player != k % 2 and k + 2 <= i:
+                for successor in get_successors(node):
+                    if layer[successor] <= k + 1:
+                        sigma[player][node] = successor
+
+    return (W[0], sigma[0]), (W[1], sigma[1])
+
+
+def _component_layers(g, component, layer, sigma):
+    """
+    Computes the layers of the nodes of a non-trivial strongly connected component, given the layers of the nodes
+    below it. The attractors of weak_parity_solver are computed on the edges of the component, for the priorities of
+    its nodes and the layers of its exits, in decreasing order. Each node of the component keeps a single counter of
+    its successors which are not removed yet, as in reachability.layered_attractors.
+    :param g: the game graph.
+    :param component: the nodes of the component.
+    :param layer: the layers of the nodes, the layers of the nodes of the component are added.
+    :param sigma: the strategies of players 0 and 1, updated with the strategies of the nodes attracted by their owner.
+    """
+    inside = set(component)
+    targets = defaultdict(list)  # nodes of the component, by priority
+    exits = defaultdict(list)  # edges leaving the component, by layer of their target
+    live = {}  # number of successors not yet removed
+    for node in component:
+        targets[g.get_node_priority(node)].append(node)
+        successors = g.get_successors(node)
+        live[node] = len(successors)
+        for successor in successors:
+            if successor not in inside:
+                exits[layer[successor]].append((node, successor))
+
+    for k in sorted(set(targets) | set(exits), reverse=True):
+        j = k % 2  # current player
+        queue = deque()
+
+        for node in targets.get(k, ()):
+            if node not in layer:
+                layer[node] = k
+                queue.append(node)
+                # if node belongs to j, select its first successor which is not removed before iteration k
+                if g.get_node_player(node) == j:
+                    for successor in g.get_successors(node):
+                        if layer.get(successor, k) <= k:
+                            sigma[j][node] = successor
+                            break
+
+        # exits of layer k are removed at iteration k, their predecessors in the component are updated
+        for node, successor in exits.get(k, ()):
+            if node not in layer:
+                if g.get_node_player(node) == j:
+                    layer[node] = k
+                    queue.append(node)
+                    sigma[j][node] = successor
+                else:
+                    live[node] -= 1
+                    if live[node] == 0:
+                        layer[node] = k
+                        queue.append(node)
+
+        # the attractor is computed on the edges of the component
+        while queue:
+            s = queue.popleft()
+            for sbis in g.get_predecessors(s):
+                if sbis in inside and sbis not in layer:
+                    if g.get_node_player(sbis) == j:
+                        layer[sbis] = k
+                        queue.append(sbis)
+                        sigma[j][sbis] = s
+                    else:
+                        live[sbis] -= 1
+                        if live[sbis] == 0:
+                            layer[sbis] = k
+                            queue.append(sbis)
@@ -0,0 +1,361 @@
+import bz2
+import gzip
+import os
+import tempfile
+from StringIO import StringIO
+
+from graph import Graph, CSRGraph
+from tools import file_handler as io
+from solvers import reachability as rs
+from solvers import weakparity as wp
+from solvers import strongparity as sp
+from solvers import generalizedparity as gp
+from tools import operations as ops
+
+"""
+Test module for the game graph representations.
+Games are solved using different representations of their arena and we verify that the solutions are identical.
+"""
+
+"""
+Compact representation
+"""
+
+def csr_accessors():
+    """
+    Checks that the compact representation of a game exposes the same nodes, descriptors and edges as the original.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    csr = CSRGraph.from_graph(g)
+    same = ops.are_lists_equal(g.get_nodes(), csr.get_nodes()) and len(csr.nodes) == len(g.nodes)
+    for node in g.get_nodes():
+        same = same and g.nodes[node] == csr.nodes[node] and \
+               list(g.get_successors(node)) == list(csr.get_successors(node)) and \
+               list(g.get_predecessors(node)) == list(csr.get_predecessors(node))
+    return same
+
+
+def csr_reachability():
+    """
+    Solves the reachability game from figure 3.2 using the compact representation.
+    """
+    g = io.load_from_file("assets/reachability/figure32.txt")
+    return rs.reachability_solver(CSRGraph.from_graph(g), [1], 0) == rs.reachability_solver(g, [1], 0)
+
+
+def csr_weak_parity():
+    """
+    Solves the weak parity game from figure 4.1 using the compact representation.
+    """
+    g = io.load_from_file("assets/weak parity/figure41.txt")
+    return wp.weak_parity_solver(CSRGraph.from_graph(g)) == wp.weak_parity_solver(g)
+
+
+def csr_strong_parity():
+    """
+    Solves the strong parity game from figure 5.6 using the compact representation.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    return sp.strong_parity_solver(CSRGraph.from_graph(g)) == sp.strong_parity_solver(g)
+
+
+def csr_generalized_parity():
+    """
+    Solves a generalized parity game using the compact representation.
+    """
+    g = io.load_generalized_from_file("assets/generalized parity/simple_example3.txt")
+    (a, c) = gp.generalized_parity_solver(CSRGraph.from_graph(g))
+    return ops.are_lists_equal(a, [1, 2, 3, 5, 6]) and ops.are_lists_equal(c, [4])
+
+
+def from_edges():
+    """
+    Builds a game from flat arrays (with a duplicated edge) and checks that both representations contain the same arena.
+    """
+    sources, targets = [1, 1, 2, 3, 3, 1], [2, 3, 3, 1, 3, 2]
+    g = Graph.from_edges(sources, targets, [0, 1, 0], [2, 1, 0], [1, 2, 3], deduplicate=True)
+    csr = CSRGraph.from_edges(sources, targets, [0, 1, 0], [2, 1, 0], [1, 2, 3], deduplicate=True)
+    correct = g.nodes[2] == csr.nodes[2] == (1, 1)
+    for node in [1, 2, 3]:
+        correct = correct and list(csr.get_successors(node)) == g.get_successors(node) and \
+                  list(csr.get_predecessors(node)) == g.get_predecessors(node)
+    return correct and g.get_successors(1) == [2, 3] and g.get_predecessors(3) == [1, 2, 3]
+
+
+"""
+Sub-games
+"""
+
+def subgame_view():
+    """
+    Checks that sub-games only contain the edges between their nodes and share the arena of the original game.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    sub = g.subgame([1, 2, 4, 5]).subgame([1, 2, 4])
+    return sub.graph is g and ops.are_lists_equal(sub.get_nodes(), [1, 2, 4]) and sub.get_successors(2) == [2] and \
+           sub.get_predecessors(1) == [4] and sub.get_out_degree(4) == 1 and sub.get_successors(5) == []
+
+
+"""
+Priority index
+"""
+
+def priority_index():
+    """
+    Checks that the priority buckets and maximum priority are maintained when nodes are added, changed and removed.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    correct = g.get_max_priority() == 5 and ops.are_lists_equal(ops.i_priority_node(g, 4), [2, 4])
+    g.remove_node(6)
+    g.add_node(2, (0, 1))
+    correct = correct and ops.max_priority(g) == 4 and ops.are_lists_equal(ops.i_priority_node(g, 4), [4]) and \
+              ops.are_lists_equal(ops.i_priority_node(g, 1), [2, 5])
+    g.remove_node(4)
+    sub = g.subgame([1, 2, 5])
+    return correct and ops.max_priority(g) == 3 and ops.max_priority(sub) == 3 and \
+           ops.are_lists_equal(ops.i_priority_node(sub, 1), [2, 5])
+
+
+"""
+Edition of the arena
+"""
+
+def edge_and_node_removal():
+    """
+    Checks that removing edges and nodes keeps the successors and predecessors lists consistent.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    g.remove_successor(5, 1)
+    g.remove_predecessor(1, 5)
+    g.remove_node(2)
+    correct = ops.are_lists_equal(g.get_successors(5), [5, 6]) and ops.are_lists_equal(g.get_predecessors(1), [4])
+    for node in g.get_nodes():
+        for succ in g.get_successors(node):
+            correct = correct and succ in g.nodes and node in g.get_predecessors(succ)
+        for pred in g.get_predecessors(node):
+            correct = correct and pred in g.nodes and node in g.get_successors(pred)
+    return correct and g.get_successors(6) == [] and g.get_predecessors(3) == []
+
+
+def frozen_graph():
+    """
+    Checks that a frozen game cannot be modified, that its hash only depends on its content and that it is solved like
+    the game it was created from.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    frozen = g.freeze()
+    try:
+        frozen.add_successor(1, 2)
+        return False
+    except TypeError:
+        pass
+    same = io.load_from_file("assets/strong parity/figure56.txt").freeze()
+    g.remove_successor(5, 1)
+    g.remove_predecessor(1, 5)
+    different = g.freeze()
+    correct = frozen.content_hash() == same.content_hash() and hash(frozen) == hash(same) and frozen == same
+    correct = correct and frozen.content_hash() != different.content_hash() and frozen != different
+    # the same game whose ids are longs has the same hash and is equal
+    relabelled = Graph()
+    for node, descriptor in same.get_nodes_descriptors().iteritems():
+        relabelled.add_node(long(node), descriptor)
+        for successor in same.get_successors(node):
+            relabelled.add_successor(long(node), long(successor))
+            relabelled.add_predecessor(long(successor), long(node))
+    relabelled = relabelled.freeze()
+    correct = correct and relabelled.content_hash() == frozen.content_hash() and relabelled == frozen
+    (W1, sigma1), (W2, sigma2) = sp.strong_parity_solver(frozen)
+    (W1_g, sigma1_g), (W2_g, sigma2_g) = sp.strong_parity_solver(io.load_from_file("assets/strong parity/figure56.txt"))
+    return correct and ops.are_lists_equal(W1, W1_g) and ops.are_lists_equal(W2, W2_g)
+
+
+def pgsolver_parser():
+    """
+    Checks that the parser accepts records spanning several lines, extra whitespace and names containing semicolons,
+    and that records are split correctly whatever the size of the chunks read.
+    """
+    text = 'parity 5;\nstart 1;\n1 3 1\n 4 "a;b";2  4 0 2,3\t"2";\n3 5 1 1, 4;4 6 0 4 ;5 2 1 1,2'
+    expected = sum(io._pgsolver_records(StringIO(text)), [])
+    for chunk_size in range(1, len(text)):
+        if sum(io._pgsolver_records(StringIO(text), chunk_size=chunk_size), []) != expected:
+            return False
+
+    path = tempfile.mktemp(suffix=".txt")
+    with open(path, 'w') as f:
+        f.write(text)
+    progress = []
+    g = io.load_from_file(path, progress=lambda read, total: progress.append((read, total)))
+    csr = io.load_from_file(path, graph_type=CSRGraph)
+    os.remove(path)
+    correct = progress == [(len(text), len(text))] and ops.are_lists_equal(g.get_nodes(), [1, 2, 3, 4, 5])
+    for node in g.get_nodes():
+        correct = correct and g.nodes[node] == csr.nodes[node] and g.get_successors(node) == list(csr.get_successors(node))
+    return correct and g.get_successors(3) == [1, 4] and g.nodes[3] == (1, 5)
+
+
+def binary_format():
+    """
+    Checks that a game saved in binary format is loaded, memory-mapped, with the same nodes and edges and is solved in
+    the same way.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    path = tempfile.mktemp(suffix=".bin")
+    io.save_binary(g, path)
+    loaded = io.load_game(path)
+    correct = isinstance(loaded, CSRGraph) and ops.are_lists_equal(loaded.get_nodes(), g.get_nodes())
+    for node in g.get_nodes():
+        correct = correct and loaded.nodes[node] == g.nodes[node] and \
+                  list(loaded.get_successors(node)) == g.get_successors(node) and \
+                  ops.are_lists_equal(list(loaded.get_predecessors(node)), g.get_predecessors(node))
+    (W1, sigma1), (W2, sigma2) = sp.strong_parity_solver(loaded)
+    (W1_g, sigma1_g), (W2_g, sigma2_g) = sp.strong_parity_solver(g)
+    del loaded
+    os.remove(path)
+    return correct and ops.are_lists_equal(W1, W1_g) and ops.are_lists_equal(W2, W2_g)
+
+
+def compressed_files():
+    """
+    Checks that compressed files are decompressed while they are loaded and that the writers compress their output
+    according to the extension of the path.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    with open("assets/strong parity/figure56.txt") as f:
+        text = f.read()
+    correct = True
+    for extension, open_file in [(".gz", gzip.open), (".bz2", bz2.BZ2File)]:
+        path = tempfile.mktemp(suffix=extension)
+        with open_file(path, 'w') as f:
+            f.write(text)
+        loaded = io.load_from_file(path)
+        for node in g.get_nodes():
+            correct = correct and loaded.nodes[node] == g.nodes[node] and \
+                      loaded.get_successors(node) == g.get_successors(node)
+        io.write_graph_to_file(g, path)
+        with open_file(path) as f:
+            correct = correct and f.read().startswith("digraph G {")
+        os.remove(path)
+    return correct and ops.are_lists_equal(loaded.get_nodes(), g.get_nodes())
+
+
+def parallel_loading():
+    """
+    Checks that a file loaded by several processes gives the same graph as when it is loaded sequentially.
+    """
+    path = tempfile.mktemp(suffix=".txt")
+    n = 40000
+    with open(path, 'w') as f:
+        f.write("parity " + str(n - 1) + ";\n")
+        for node in range(n):
+            succs = [(node * 7 + i * 13) % n for i in range(4)]
+            f.write("%d %d %d %s \"%d\";\n" % (node, node % 9, node % 2, ",".join(map(str, succs)), node))
+    correct = _same_parallel_loading(path)
+
+    # names of the first nodes end a line with a semicolon, a range splits one of them and the file is loaded
+    # sequentially instead
+    with open(path, 'w') as f:
+        f.write("parity " + str(n - 1) + ";\n")
+        for node in range(n):
+            succs = [(node * 7 + i * 13) % n for i in range(4)]
+            name = "%d;\n%d" % (node, node) if node < n / 4 else str(node)
+            f.write("%d %d %d %s \"%s\";\n" % (node, node % 9, node % 2, ",".join(map(str, succs)), name))
+    return correct and _same_parallel_loading(path)
+
+
+def _same_parallel_loading(path):
+    """
+    Loads a file sequentially and with several processes, then removes it.
+    :param path: path to the file.
+    :return: true if both graphs are the same.
+    """
+    sequential = io.load_from_file(path)
+    parallel = io.load_from_file(path, processes=3)
+    os.remove(path)
+    correct = sequential.get_nodes() == parallel.get_nodes()
+    for node in sequential.get_nodes():
+        correct = correct and sequential.nodes[node] == parallel.nodes[node] and \
+                  sequential.get_successors(node) == parallel.get_successors(node) and \
+                  sequential.get_predecessors(node) == parallel.get_predecessors(node)
+    return correct
+
+
+def solution_writer():
+    """
+    Checks the solution files written in PGSolver, compact and dot formats : every node is written once with its
+    winner and the successor chosen by the strategy of the winner, every edge is written once in dot format.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    (W_0, sigma_0), (W_1, sigma_1) = sp.strong_parity_solver(g)
+    path = tempfile.mktemp()
+    correct = True
+    for fmt in ["pgsolver", "compact", "dot"]:
+        io.write_solution(g, W_0, W_1, path, sigma_0, sigma_1, fmt=fmt)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        if fmt == "pgsolver":
+            correct = correct and lines[0] == "paritysol " + str(max(g.get_nodes())) + ";"
+            lines = [line.rstrip(";") for line in lines[1:]]
+        if fmt == "dot":
+            edges = [line for line in lines if "->" in line]
+            correct = correct and len(edges) == sum(len(g.get_successors(node)) for node in g.get_nodes())
+            continue
+        written = {}
+        for line in lines:
+            tokens = map(int, line.split())
+            written[tokens[0]] = tokens[1:]
+        correct = correct and ops.are_lists_equal(written.keys(), g.get_nodes())
+        for node in g.get_nodes():
+            winner, sigma = (0, sigma_0) if node in W_0 else (1, sigma_1)
+            expected = [winner, sigma[node]] if g.get_node_player(node) == winner else [winner]
+            correct = correct and written[node] == expected
+    os.remove(path)
+    return correct
+
+
+def dot_excerpts():
+    """
+    Checks that the neighbourhood export writes at most budget nodes and only edges between them, and that the summary
+    export accounts for every edge of the game.
+    """
+    g = io.load_from_file("assets/strong parity/figure56.txt")
+    (W_0, sigma_0), (W_1, sigma_1) = sp.strong_parity_solver(g)
+    path = tempfile.mktemp(suffix=".dot")
+    io.write_dot_neighbourhood(g, W_0, W_1, path, [5], 3, sigma_0, sigma_1)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    nodes = [int(line.split("[")[0]) for line in lines if "label" in line]
+    edges = [map(int, line.split("[")[0].rstrip(";").split(" -> ")) for line in lines if "->" in line]
+    correct = ops.are_lists_equal(nodes, [5, 1, 2]) and all(u in nodes and v in nodes for u, v in edges)
+    correct = correct and len(edges) == 4
+
+    io.write_dot_summary(g, W_0, W_1, path)
+    with open(path) as f:
+        text = f.read()
+    os.remove(path)
+    # both regions form a single component, with 4 and 2 inner edges and 2 + 3 edges between them
+    return correct and "4 nodes, 4 edges" in text and "2 nodes, 2 edges" in text and '[label="2"]' in text and \
+           '[label="3"]' in text
+
+
+def strongly_connected_components():
+    """
+    Checks the strongly connected components and their order on a small game.
+    """
+    g = Graph.from_edges([1, 2, 2, 3, 4, 5], [2, 1, 3, 4, 3, 5], [0] * 5, [0] * 5, [1, 2, 3, 4, 5])
+    components = ops.strongly_connected_components(g)
+    position = dict((node, i) for i, component in enumerate(components) for node in component)
+    correct = len(components) == 3 and position[1] == position[2] and position[3] == position[4]
+    return correct and position[3] < position[1] and position[5] != position[1]
+
+
+def launch_tests():
+    """
+    Launches all tests.
+    :return: true if all tests succeeded.
+    """
+    return csr_accessors() and csr_reachability() and csr_weak_parity() and csr_strong_parity() and \
+           csr_generalized_parity() and subgame_view() and \
+           priority_index() and edge_and_node_removal() and from_edges() and frozen_graph() and \
+           pgsolver_parser() and binary_format() and compressed_files() and \
+           parallel_loading() and solution_writer() and dot_excerpts() and \
+           strongly_connected_components()
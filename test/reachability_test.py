@@ -1,5 +1,10 @@
+from bitarray import bitarray
+
+from graph import Graph, LazyGraph
 from tools import file_handler as io
 from solvers import reachability as rs
+from solvers import strongparity as sp
+from solvers import sparsereachability as srs
 
 """
 Test module for reachability games.
@@ -25,9 +30,156 @@ def example_1():
     return W1 == [8, 7, 4] and sig1 == {8: 3, 7: 8} and W0 == [1, 2, 3, 5, 6] and sig0 == {1: 5, 3: 3, 6: 5}
 
 
+def shared_workspace():
+    """
+    Solves the game from figure 3.2 and one of its subgames several times with the same workspace.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    workspace = rs.AttractorWorkspace(fig32_graph)
+    for i in range(2):
+        (W0, sig0), (W1, sig1) = rs.reachability_solver(fig32_graph, [1], 0, workspace)
+        if not (W0 == [1, 2, 3, 5] and sig0 == {1: 1, 2: 1, 5: 2} and W1 == [4, 6] and sig1 == {4: 6, 6: 4}):
+            return False
+        A, complement = rs.attractor(fig32_graph.subgame([1, 2, 3, 4, 6]), [4], 1, workspace)
+        if not (sorted(A) == [4, 6] and sorted(complement) == [1, 2, 3]):
+            return False
+    # the workspace is left clean after each call
+    return not any(workspace.regions)
+
+
+def sparse_and_string_ids():
+    """
+    Solves the reachability game from figure 3.2 with string node ids, then a strong parity game with sparse ids. Such
+    nodes cannot index the buffers of a workspace, dictionaries are used instead.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    names = dict((node, "v" + str(node)) for node in fig32_graph.get_nodes())
+    sources = [names[node] for node in fig32_graph.get_nodes() for succ in fig32_graph.get_successors(node)]
+    targets = [names[succ] for node in fig32_graph.get_nodes() for succ in fig32_graph.get_successors(node)]
+    named = Graph.from_edges(sources, targets, [fig32_graph.get_node_player(node) for node in names],
+                             [fig32_graph.get_node_priority(node) for node in names], [names[node] for node in names])
+    (W0, sig0), (W1, sig1) = rs.reachability_solver(named, ["v1"], 0)
+    correct = sorted(W0) == ["v1", "v2", "v3", "v5"] and sig0 == {"v1": "v1", "v2": "v1", "v5": "v2"} and \
+              sorted(W1) == ["v4", "v6"] and sig1 == {"v4": "v6", "v6": "v4"}
+
+    correct = correct and rs.workspace_for(named) is rs.NO_WORKSPACE
+    sparse = Graph.from_edges([1, 10 ** 9], [10 ** 9, 1], [0, 1], [1, 2], [1, 10 ** 9])
+    correct = correct and rs.workspace_for(sparse) is rs.NO_WORKSPACE
+    (W0, sig0), (W1, sig1) = sp.strong_parity_solver(sparse)
+    return correct and sorted(W0) == [1, 10 ** 9] and W1 == [] and sig0 == {1: 10 ** 9}
+
+
+def incremental_attractor():
+    """
+    Extends attractors in the game from figure 3.2 and compares them with the attractor of the union of the targets.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    att = rs.Attractor(fig32_graph, 0, [6])
+    first = sorted(att.nodes)
+    added = att.extend([3])
+    A, complement = rs.attractor(fig32_graph, [6, 3], 0)
+    return first == [5, 6] and added == [3] and sorted(att.nodes) == sorted(A) and \
+           sorted(att.complement()) == sorted(complement) == [1, 2, 4] and 3 in att and len(att) == 3
+
+
+def layered_attractors():
+    """
+    Computes a sequence of attractors in the game from figure 3.2, each one in the game without the previous ones.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    layers, leftover = rs.layered_attractors(fig32_graph, [([6], 0), ([1, 6], 0), ([4], 1)])
+    (A0, strat0), (A1, strat1), (A2, strat2) = layers
+    # in the game without 5 and 6, the only successor of 4 is 2 and 4 is attracted by player 0 in the second layer
+    return A0 == [6, 5] and strat0 == {5: 6} and A1 == [1, 2, 3, 4] and strat1 == {1: 1, 2: 1} and \
+           A2 == [] and strat2 == {} and leftover == []
+
+
+def removed_mask():
+    """
+    Removes an attractor from the game from figure 3.2 using a mask, then restores it.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    removed = bitarray([False] * 7)
+    mask = rs.RemovedMask(fig32_graph, removed)
+    live_out = dict(mask.live_out)
+    A, strat = rs.attractor_non_removed(fig32_graph, [6], 0, mask)
+    mark = mask.mark()
+    mask.remove(A)
+    # without 5 and 6, node 4 only has successor 2 left
+    (W0, sig0), (W1, sig1) = rs.reachability_solver_non_removed(fig32_graph, [1], 0, removed, mask)
+    removed_ok = removed == bitarray([False, False, False, False, False, True, True]) and mask.live_out[4] == 1 and \
+                 mask.nbr_live == 4
+    mask.restore(mark)
+    return A == [6, 5] and strat == {5: 6} and W0 == [1, 2, 3, 4] and sig0 == {1: 1, 2: 1} and W1 == [] and \
+           removed_ok and not removed.any() and mask.live_out == live_out and mask.nbr_live == 6
+
+
+def local_solving():
+    """
+    Decides the winner of single nodes of the game from figure 3.2, then of nodes of games explored on demand. In the
+    infinite one, nodes are integers and players move from n to n + 1 or n + 2 until they reach 10 or more.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    (W0, sig0), (W1, sig1) = rs.reachability_solver(fig32_graph, [1], 0)
+    correct = True
+    for node in fig32_graph.get_nodes():
+        winner, (W, sig) = rs.local_reachability_solver(fig32_graph, node, [1], 0)
+        region = W0 if winner == 0 else W1
+        correct = correct and node in region and node in W and set(W) <= set(region) and \
+                  all(sig[v] in region for v in sig)
+
+    # cyclic game explored on demand, compared to the same game built with every edge
+    cyclic = LazyGraph(lambda n: [(n + 1) % 12, (n + 2) % 12], lambda n: (n % 3 % 2, 0))
+    winner, (W, sig) = rs.local_reachability_solver(cyclic, 0, [10], 0)
+    g = Graph.from_edges(range(12) * 2, [(n + 1) % 12 for n in range(12)] + [(n + 2) % 12 for n in range(12)],
+                         [n % 3 % 2 for n in range(12)], [0] * 12)
+    (W0, sig0), (W1, sig1) = rs.reachability_solver(g, [10], 0)
+    correct = correct and winner == (0 if 0 in W0 else 1) and set(W) <= set(W0 if winner == 0 else W1)
+
+    infinite = LazyGraph(lambda n: [n + 1, n + 2], lambda n: (n % 2, 0))
+    winner, (W, sig) = rs.local_reachability_solver(infinite, 0, lambda n: n >= 10, 0)
+    return correct and winner == 0 and 0 in W and max(infinite.get_nodes()) <= 12
+
+
+def watched_nodes():
+    """
+    Computes attractors of the game from figure 3.2 which stop once watched nodes are decided.
+    """
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    workspace = rs.AttractorWorkspace(fig32_graph)
+    # 2 is attracted right after 1, before 3 and 5
+    (W0, sig0), (W1, sig1) = rs.reachability_solver(fig32_graph, [1], 0, workspace, [2, 5], rs.ANY_WATCHED)
+    correct = W0 == [1, 2] and sig0 == {1: 1, 2: 1} and W1 is None and sig1 is None
+    (W0, sig0), (W1, sig1) = rs.reachability_solver(fig32_graph, [1], 0, workspace, [2, 5], rs.ALL_WATCHED)
+    correct = correct and W0 == [1, 2, 3, 5] and W1 is None
+    # 4 is never attracted, the whole attractor is computed
+    (W0, sig0), (W1, sig1) = rs.reachability_solver(fig32_graph, [1], 0, workspace, [2, 4], rs.ALL_WATCHED)
+    correct = correct and W0 == [1, 2, 3, 5] and W1 == [4, 6]
+    for w in (workspace, None):
+        correct = correct and rs.attractor(fig32_graph, [1], 0, w, [3], rs.ANY_WATCHED) == ([1, 2, 3], None) and \
+                  rs.attractor(fig32_graph, [1], 0, w, [6]) == ([1, 2, 3, 5], [4, 6])
+    return correct and not any(workspace.regions)
+
+
+def vectorised_attractor():
+    """
+    Solves the examples with the level-synchronous attractor (only when numpy is available).
+    """
+    if srs.np is None:
+        return True
+    fig32_graph = io.load_from_file("assets/reachability/figure32.txt")
+    (W0, sig0), (W1, sig1) = srs.reachability_solver(fig32_graph, [1], 0)
+    fig51_graph = io.load_from_file("assets/reachability/fig51.txt")
+    (W1_, sig1_), (W0_, sig0_) = srs.reachability_solver(fig51_graph, [8], 1)
+    return W0 == [1, 2, 3, 5] and sig0 == {1: 1, 2: 1, 5: 2} and W1 == [4, 6] and sig1 == {4: 6, 6: 4} and \
+           W1_ == [8, 7, 4] and sig1_ == {8: 3, 7: 8} and W0_ == [1, 2, 3, 5, 6] and sig0_ == {1: 5, 3: 3, 6: 5}
+
+
 def launch_tests():
     """
     Launches all tests.
     :return: true if all tests succeeded.
     """
-    return figure32() and example_1()
+    return figure32() and example_1() and shared_workspace() and sparse_and_string_ids() and incremental_attractor() and \
+           layered_attractors() and removed_mask() and local_solving() and watched_nodes() and \
+           vectorised_attractor()
@@ -1,9 +1,13 @@
+import random
+
 from bitarray import bitarray
 
+from graph import Graph, LazyGraph
 from tools import file_handler as io
 from solvers import strongparity as sp
 from solvers import generalizedparity as gp
 from tools import operations as ops
+from tools import generators as gen
 """
 Test module for strong parity games.
 Some examples are solved by our algorithm and we verify the solution. 
@@ -166,6 +170,143 @@ def worstcase2_removed_optimization():
     (a, b), (c, d) = sp.strong_parity_solver_non_removed(g, removed)
     return a == [] and b == {} and c == [6, 8, 9, 7, 5, 4, 0, 2, 1, 3] and d == {0: 4, 2: 4, 4: 5, 6: 7, 8: 6}
 
+"""
+Recursive algorithm on bitarrays
+"""
+
+def figure56_bits():
+    """
+    Solves the strong parity game from figure 5.6.
+    """
+    fig56_graph = io.load_from_file("assets/strong parity/figure56.txt")
+    (a, b), (c, d) = sp.strong_parity_solver_bits(fig56_graph)
+    return a == [1, 2, 4, 6] and b == {2: 2, 4: 1} and c == [3, 5] and d == {5: 5}
+
+
+def example_3_bits():
+    """
+    Solves a simple example.
+    """
+    g = io.load_from_file("assets/strong parity/example_3.txt")
+    (a, b), (c, d) = sp.strong_parity_solver_bits(g)
+    return a == [1, 2, 3, 4] and b == {1: 2, 2: 4, 4: 4} and c == [5, 6, 7] and d == {5: 6, 6: 6, 7: 6}
+
+
+def worstcase2_bits():
+    """
+    Solves a worst case graph G_n for n = 2.
+    """
+    g = io.load_from_file("assets/strong parity/worstcase_2.txt")
+    (a, b), (c, d) = sp.strong_parity_solver_bits(g)
+    return a == [] and b == {} and c == range(10) and d == {0: 4, 2: 4, 4: 5, 6: 7, 8: 6}
+
+"""
+Local solving
+"""
+
+def example_3_local():
+    """
+    Decides the winner of each node of a simple example, the game being explored on demand.
+    """
+    g = io.load_from_file("assets/strong parity/example_3.txt")
+    correct = True
+    for node in sorted(g.get_nodes()):
+        lazy = LazyGraph(g.get_successors, lambda v: g.nodes[v])
+        winner, (W, sigma) = sp.strong_parity_solver_local(lazy, node)
+        region = [1, 2, 3, 4] if winner == 0 else [5, 6, 7]
+        correct = correct and node in region and set(W) <= set(region) and all(sigma[v] in W for v in sigma)
+    # only the nodes reachable from 7 are explored
+    return correct and ops.are_lists_equal(lazy.get_nodes(), [4, 5, 6, 7])
+
+"""
+Component by component
+"""
+
+def _is_winning(g, region, strategy, player):
+    """
+    Checks that a strategy of a player is winning from every node of a region in a parity game : in the graph of the
+    plays consistent with the strategy from the region, no cycle may have a largest priority of the parity of the
+    opponent, i.e. no node of such a priority may reach itself through nodes of smaller or equal priorities.
+    :param g: the game.
+    :param region: the winning region of the player.
+    :param strategy: the strategy of the player.
+    :param player: the player.
+    :return: true if the strategy is winning from every node of the region.
+    """
+    edges = {}
+    stack = list(region)
+    while stack:
+        node = stack.pop()
+        if node not in edges:
+            if g.get_node_player(node) == player:
+                if strategy.get(node, -1) not in g.get_successors(node):
+                    return False
+                edges[node] = [strategy[node]]
+            else:
+                edges[node] = g.get_successors(node)
+            stack.extend(edges[node])
+    for node in edges:
+        priority = g.get_node_priority(node)
+        if priority % 2 != player:
+            seen = set()
+            stack = list(edges[node])
+            while stack:
+                current = stack.pop()
+                if current == node:
+                    return False
+                if current not in seen and g.get_node_priority(current) <= priority:
+                    seen.add(current)
+                    stack.extend(edges[current])
+    return True
+
+
+def _scc_solution(g, W0, W1):
+    """
+    Solves a game component by component, checks the regions and that the strategies are winning.
+    """
+    (a, b), (c, d) = sp.strong_parity_solver_scc(g)
+    return ops.are_lists_equal(a, W0) and ops.are_lists_equal(c, W1) and _is_winning(g, a, b, 0) and \
+           _is_winning(g, c, d, 1)
+
+
+def figure56_scc():
+    """
+    Solves the strong parity game from figure 5.6 component by component.
+    """
+    return _scc_solution(io.load_from_file("assets/strong parity/figure56.txt"), [2, 4, 1, 6], [5, 3])
+
+
+def example_3_scc():
+    """
+    Solves a simple example component by component.
+    """
+    return _scc_solution(io.load_from_file("assets/strong parity/example_3.txt"), [2, 1, 3, 4], [6, 7, 5])
+
+
+def worstcase2_scc():
+    """
+    Solves a worst case graph G_n for n = 2 component by component.
+    """
+    return _scc_solution(io.load_from_file("assets/strong parity/worstcase_2.txt"), [], range(10))
+
+
+def random_games_scc():
+    """
+    Solves random parity and Buchi games (priorities 1 and 2) component by component and compares the regions with
+    those of the recursive algorithm.
+    """
+    random.seed(56)
+    for n in range(6, 36):
+        g = gen.random(n, n // 3 + 1, 1, 3)
+        buchi = gen.random(n, 1, 1, 3)
+        for node in buchi.get_nodes():
+            buchi.add_node(node, (buchi.get_node_player(node), buchi.get_node_priority(node) + 1))
+        for game in (g, buchi):
+            (a, b), (c, d) = sp.strong_parity_solver(game)
+            if not _scc_solution(game, a, c):
+                return False
+    return True
+
 "Antichain-based algorithm"
 
 def figure56_antichain_algorithm():
@@ -238,6 +379,39 @@ def worstcase2_antichain_algorithm():
     (a, c) = sp.strong_parity_antichain_based(g,0)
     return ops.are_lists_equal(a , [] ) and ops.are_lists_equal(c, [6, 8, 9, 7, 5, 4, 0, 2, 1, 3])
 
+def empty_game_reduction_to_safety():
+    """
+    Solves a game without any node.
+    """
+    (a, c) = sp.reduction_to_safety_parity_solver(Graph())
+    return a == [] and c == []
+
+
+def figure56_antichain_from_file():
+    """
+    Solves the strong parity game from figure 5.6, loaded directly into the C graph structure.
+    """
+    (a, c) = sp.strong_parity_antichain_from_file("assets/strong parity/figure56.txt", 1)
+    return ops.are_lists_equal(a,[2, 4, 1, 6])  and ops.are_lists_equal(c,[5, 3])
+
+
+def worstcase2_antichain_from_file():
+    """
+    Solves a worst case graph G_n for n = 2, loaded directly into the C graph structure.
+    """
+    (a, c) = sp.strong_parity_antichain_from_file("assets/strong parity/worstcase_2.txt", 0)
+    return ops.are_lists_equal(a , [] ) and ops.are_lists_equal(c, [6, 8, 9, 7, 5, 4, 0, 2, 1, 3])
+
+def example_3_antichain_handle():
+    """
+    Solves a simple example several times with the same C graph, then checks the handle is closed by the with block.
+    """
+    g = io.load_from_file("assets/strong parity/example_3.txt")
+    with ops.CGraph.from_graph(g, 1) as c_graph:
+        solutions = [c_graph.solve() for i in range(3)]
+    return c_graph.closed and all(ops.are_lists_equal(a, [2, 1, 3, 4]) and ops.are_lists_equal(c, [6, 7, 5])
+                                  for (a, c) in solutions)
+
 """
 Reduction to safety algorithm
 """
@@ -323,13 +497,19 @@ def launch_tests():
                       example_2_removed_optimization() and example_3_removed_optimization() and \
                       example_4_removed_optimization() and example_5_removed_optimization() and \
                       worstcase1_removed_optimization() and worstcase2_removed_optimization()
+    bits = figure56_bits() and example_3_bits() and worstcase2_bits()
+    local = example_3_local()
+    scc = figure56_scc() and example_3_scc() and worstcase2_scc() and random_games_scc()
     reduction_to_safety = figure56_reduction_to_safety() and example_1_reduction_to_safety() and \
                       example_2_reduction_to_safety() and example_3_reduction_to_safety() and \
                       example_4_reduction_to_safety() and example_5_reduction_to_safety() and \
-                      worstcase1_reduction_to_safety() and worstcase2_reduction_to_safety()
+                      worstcase1_reduction_to_safety() and worstcase2_reduction_to_safety() and \
+                      empty_game_reduction_to_safety()
     antichain_based = figure56_antichain_algorithm() and example_1_antichain_algorithm() and \
                       example_2_antichain_algorithm() and example_3_antichain_algorithm() and \
                       example_4_antichain_algorithm() and example_5_antichain_algorithm() and \
-                      worstcase1_antichain_algorithm() and worstcase2_antichain_algorithm()
+                      worstcase1_antichain_algorithm() and worstcase2_antichain_algorithm() and \
+                      figure56_antichain_from_file() and worstcase2_antichain_from_file() and \
+                      example_3_antichain_handle()
 
-    return recursive and removed_optimization and reduction_to_safety and antichain_based
\ No newline at end of file
+    return recursive and removed_optimization and bits and local and scc and reduction_to_safety and antichain_based
\ No newline at end of file
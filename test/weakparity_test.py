@@ -1,5 +1,9 @@
+import random
+
 from tools import file_handler as io
+from tools import generators as gen
 from solvers import weakparity as wp
+from tools import operations as ops
 
 """
 Test module for weak parity games.
@@ -22,9 +26,122 @@ def example_1():
     return a == [3, 6, 2] and b == {1: 5, 3: 3, 6: 1} and c == [8, 7, 4, 5, 1] and d == {8: 3, 5: 1, 7: 8}
 
 
+def figure41_single_pass():
+    """
+    Solves the weak parity game from figure 4.1 in a single pass.
+    """
+    g = io.load_from_file("assets/weak parity/figure41.txt")
+    (a, b), (c, d) = wp.weak_parity_solver_single_pass(g)
+    return a == [3] and b == {1: 2, 5: 5} and c == [4, 5, 1, 2] and d == {4: 4, 2: 1, 3: 3}
+
+
+def example_1_single_pass():
+    g = io.load_from_file("assets/weak parity/example_1.txt")
+    (a, b), (c, d) = wp.weak_parity_solver_single_pass(g)
+    return a == [3, 6, 2] and b == {1: 5, 3: 3, 6: 1} and c == [8, 7, 4, 5, 1] and d == {8: 3, 5: 1, 7: 8}
+
+
+def random_games_single_pass():
+    """
+    Solves random weak parity games in a single pass and compares the regions and strategies with those of
+    weak_parity_solver.
+    """
+    random.seed(41)
+    for n in range(6, 36):
+        g = gen.random(n, n // 3 + 1, 1, 3)
+        (a, b), (c, d) = wp.weak_parity_solver(g)
+        (a_, b_), (c_, d_) = wp.weak_parity_solver_single_pass(g)
+        if not (ops.are_lists_equal(a, a_) and ops.are_lists_equal(c, c_) and b == b_ and d == d_):
+            return False
+    return True
+
+
+def _is_winning(g, region, strategy, player):
+    """
+    Checks that a strategy of a player is winning from every node of a region in a weak parity game : every play
+    consistent with the strategy from a node of the region, i.e. every path in which the nodes of the player follow the
+    strategy, must visit an even (resp. odd) largest priority for player 0 (resp. 1). Nodes of the player without a
+    strategy (a play may leave the region once a winning priority is visited) may move to any successor. The states
+    (node, largest priority visited so far) reachable from the region are explored, the largest priority of a play is
+    the one of the states it visits infinitely often, the strategy is thus winning if no such state with a losing
+    priority is on a cycle.
+    :param g: the game.
+    :param region: the winning region of the player.
+    :param strategy: the strategy of the player.
+    :param player: the player.
+    :return: true if the strategy is winning from every node of the region.
+    """
+    def moves(state):
+        node, priority = state
+        if g.get_node_player(node) == player and node in strategy:
+            if strategy[node] not in g.get_successors(node):
+                return None
+            successors = [strategy[node]]
+        else:
+            successors = g.get_successors(node)
+        return [(succ, max(priority, g.get_node_priority(succ))) for succ in successors]
+
+    edges = {}
+    stack = [(node, g.get_node_priority(node)) for node in region]
+    while stack:
+        state = stack.pop()
+        if state not in edges:
+            edges[state] = moves(state)
+            if edges[state] is None:
+                return False
+            stack.extend(edges[state])
+    for state in edges:
+        if state[1] % 2 != player:
+            # a losing state must not be reachable from itself
+            seen = set()
+            stack = list(edges[state])
+            while stack:
+                current = stack.pop()
+                if current == state:
+                    return False
+                if current not in seen:
+                    seen.add(current)
+                    stack.extend(edges[current])
+    return True
+
+
+def figure41_scc():
+    """
+    Solves the weak parity game from figure 4.1 component by component.
+    """
+    g = io.load_from_file("assets/weak parity/figure41.txt")
+    (a, b), (c, d) = wp.weak_parity_solver_scc(g)
+    return ops.are_lists_equal(a, [3]) and ops.are_lists_equal(c, [4, 5, 1, 2]) and _is_winning(g, a, b, 0) and \
+           _is_winning(g, c, d, 1)
+
+
+def example_1_scc():
+    g = io.load_from_file("assets/weak parity/example_1.txt")
+    (a, b), (c, d) = wp.weak_parity_solver_scc(g)
+    return ops.are_lists_equal(a, [3, 6, 2]) and ops.are_lists_equal(c, [8, 7, 4, 5, 1]) and \
+           _is_winning(g, a, b, 0) and _is_winning(g, c, d, 1)
+
+
+def random_games_scc():
+    """
+    Solves random weak parity games component by component, compares the regions with those of weak_parity_solver and
+    checks that the strategies are winning.
+    """
+    random.seed(42)
+    for n in range(6, 36):
+        g = gen.random(n, n // 3 + 1, 1, 3)
+        (a, b), (c, d) = wp.weak_parity_solver(g)
+        (a_, b_), (c_, d_) = wp.weak_parity_solver_scc(g)
+        if not (ops.are_lists_equal(a, a_) and ops.are_lists_equal(c, c_) and _is_winning(g, a_, b_, 0) and
+                _is_winning(g, c_, d_, 1)):
+            return False
+    return True
+
+
 def launch_tests():
     """
     Launches all tests.
     :return: true if all tests succeeded.
     """
-    return figure41() and example_1()
+    return figure41() and example_1() and figure41_single_pass() and example_1_single_pass() and \
+           random_games_single_pass() and figure41_scc() and example_1_scc() and random_games_scc()
@@ -1,61 +1,765 @@
-from graph import Graph
+import bz2
+import ctypes
+import gzip
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import defaultdict, deque
+from itertools import chain, izip, repeat
+
+from graph import Graph, CSRGraph
+from tools import operations as ops
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma  # backport of the lzma module for Python 2
+    except ImportError:
+        lzma = None
 
 """
 This module handles file reading (to load graph) and writing (to write the solution).
 """
 
-def load_from_file(path):
+CHUNK_SIZE = 1 << 20  # number of bytes read at once when loading a file
+_RANGE_END = re.compile(";\r?\n")  # end of a line ending a record, where a file is split for parallel loading
+
+
+# compression formats supported for reading and writing files : (name, magic bytes, extensions)
+_COMPRESSIONS = [("gzip", "\x1f\x8b", (".gz",)), ("bz2", "BZh", (".bz2",)), ("xz", "\xfd7zXZ\x00", (".xz",))]
+
+
+def _lzma():
     """
-    Loads a game graph from a file specified by the path.
-    The file must be in PGSolver format.
+    :return: the lzma module, an ImportError is raised if it is not available.
+    """
+    if lzma is None:
+        raise ImportError("the lzma module (backports.lzma on Python 2) is required for .xz files")
+    return lzma
+
+
+def _decompressor(compression):
+    """
+    :param compression: the name of a compression format.
+    :return: a new incremental decompressor for that format.
+    """
+    if compression == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if compression == "bz2":
+        return bz2.BZ2Decompressor()
+    return _lzma().LZMADecompressor()
+
+
+class _DecompressedFile(object):
+    """
+    Read-only file object decompressing a compressed file as it is read. Only the data decompressed from the last
+    chunk read and the state of the decompressor are kept in memory. Concatenated compressed streams (as produced by
+    "cat a.gz b.gz") are read one after the other.
+    """
+
+    def __init__(self, raw, compression):
+        """
+        :param raw: the compressed file, opened for reading in binary mode.
+        :param compression: the name of its compression format.
+        """
+        self.raw = raw
+        self.compression = compression
+        self.decompressor = _decompressor(compression)
+
+    def read(self, size):
+        """
+        Reads the next size bytes of the compressed file.
+        :param size: the number of compressed bytes to read.
+        :return: the data decompressed from those bytes, which is empty only at the end of the file.
+        """
+        data = ""
+        while not data:
+            compressed = self.raw.read(size)
+            if not compressed:
+                break
+            data = self._decompress(compressed)
+        return data
+
+    def _decompress(self, compressed):
+        pieces = []
+        while compressed:
+            try:
+                pieces.append(self.decompressor.decompress(compressed))
+                compressed = self.decompressor.unused_data
+            except EOFError:
+                # the previous stream ended exactly at the end of the previous chunk
+                pass
+            if compressed:
+                # data after the end of a stream is the start of the next one
+                self.decompressor = _decompressor(self.compression)
+        return "".join(pieces)
+
+
+def _open_input(raw):
+    """
+    Detects the compression of a file from its magic bytes.
+    :param raw: the file, opened for reading in binary mode.
+    :return: a file object giving the decompressed content of the file (raw itself if it is not compressed).
+    """
+    head = raw.read(6)
+    raw.seek(0)
+    for name, magic, extensions in _COMPRESSIONS:
+        if head.startswith(magic):
+            return _DecompressedFile(raw, name)
+    return raw
+
+
+def _open_output(path):
+    """
+    Opens a file for writing, the content is compressed according to the extension of the path (.gz, .bz2 or .xz).
+    :param path: the path to the file.
+    :return: the file object.
+    """
+    if path.endswith(_COMPRESSIONS[0][2]):
+        return gzip.open(path, 'wb')
+    if path.endswith(_COMPRESSIONS[1][2]):
+        return bz2.BZ2File(path, 'w')
+    if path.endswith(_COMPRESSIONS[2][2]):
+        return _lzma().LZMAFile(path, 'w')
+    return open(path, 'w')
+
+
+def _pgsolver_records(f, progress=None, chunk_size=CHUNK_SIZE):
+    """
+    Reads a file in PGSolver format by chunks of chunk_size bytes and yields, for each chunk, the list of the records
+    (the text found between two semicolons) completed in this chunk, each record being split into tokens. Records may
+    span several lines and tokens may be separated by any whitespace. Node names, which are quoted and may contain
+    semicolons, are dropped. Only the end of a chunk which does not form a complete record is kept in memory when
+    reading the next chunk.
+    :param f: the file, opened for reading.
+    :param progress: if not None, called without argument after each chunk.
+    :param chunk_size: the number of bytes read at once.
+    """
+    pending = ""  # incomplete record at the end of the previous chunk
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        buf = pending + chunk
+        open_name = ""
+        if '"' in buf:
+            # pieces at odd positions are inside quotes, they are the names and are dropped
+            pieces = buf.split('"')
+            if len(pieces) % 2 == 0:
+                # the last name is not closed in this chunk, it is completed by the next one
+                open_name = '"' + pieces.pop()
+            buf = " ".join(pieces[0::2])
+        records = buf.split(";")
+        pending = records.pop() + open_name
+        records = [tokens for tokens in (record.split() for record in records) if tokens]
+        if records:
+            yield records
+        if progress is not None:
+            progress()
+
+    # last record, in case it is not terminated by a semicolon
+    tokens = pending.split('"')[0].split()
+    if tokens:
+        yield [tokens]
+
+
+def _parse_pgsolver(f, generalized, progress=None):
+    """
+    Parses the records of a file in PGSolver format. Nodes are stored in arrays which are allocated once using the
+    largest node id given by the header "parity N;" if it is present, edges are stored in two arrays of ids. Records
+    are converted a chunk at a time.
+    :param f: the file, opened for reading.
+    :param generalized: if True, the priorities are comma-separated lists (generalized parity).
+    :param progress: if not None, called without argument after each chunk.
+    :return: the arrays nodes, players, priorities, sources and targets, in the order of the file.
+    """
+    nodes, players = array('i'), array('b')
+    priorities = [] if generalized else array('i')
+    sources, targets = array('i'), array('i')
+    count = 0  # number of nodes read
+    for records in _pgsolver_records(f, progress):
+        while records and records[0][0] in ("parity", "start"):
+            if records[0][0] == "parity":
+                # header, N is the largest node id
+                size = int(records[0][1]) + 1
+                nodes, players = array('i', [0]) * size, array('b', [0]) * size
+                priorities = [None] * size if generalized else array('i', [0]) * size
+            records = records[1:]
+
+        ids = [int(tokens[0]) for tokens in records]
+        if generalized:
+            chunk_priorities = [tuple(map(int, tokens[1].split(","))) for tokens in records]
+        else:
+            chunk_priorities = array('i', map(int, [tokens[1] for tokens in records]))
+        chunk_players = array('b', [0 if tokens[2] == "0" else 1 for tokens in records])
+        # successors are normally a single token, but spaces after the commas are accepted
+        succs = [tokens[3] if len(tokens) == 4 else ",".join(s for s in ",".join(tokens[3:]).split(",") if s)
+                 for tokens in records]
+
+        # slice assignment overwrites the preallocated entries and extends the arrays past them
+        end = count + len(ids)
+        nodes[count:end] = array('i', ids)
+        players[count:end] = chunk_players
+        priorities[count:end] = chunk_priorities
+        count = end
+
+        targets.extend(array('i', map(int, ",".join(succs).split(","))))
+        for node, succ in izip(ids, succs):
+            sources.extend(repeat(node, succ.count(",") + 1))
+
+    # the header only gives an upper bound on the number of nodes
+    del nodes[count:], players[count:], priorities[count:]
+    return nodes, players, priorities, sources, targets
+
+
+class _FileRange(object):
+    """
+    Read-only file object giving the bytes of a file up to a given position. The number of quotes read is counted to
+    check that the range does not end inside a node name.
+    """
+
+    def __init__(self, f, end):
+        """
+        :param f: the file, opened for reading in binary mode and positioned at the start of the range.
+        :param end: the position of the end of the range.
+        """
+        self.f = f
+        self.end = end
+        self.quotes = 0
+
+    def read(self, size):
+        data = self.f.read(max(0, min(size, self.end - self.f.tell())))
+        self.quotes += data.count('"')
+        return data
+
+
+def _parse_range(task):
+    """
+    Parses a byte range of a file in PGSolver format, used by the processes of the parallel loader.
+    :param task: a tuple (path, start, end, generalized).
+    :return: the arrays returned by _parse_pgsolver for the records of the range, None if the range could not be
+    parsed on its own (it starts or ends inside a name, or contains an error reported by the sequential loader).
+    """
+    path, start, end, generalized = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        content = _FileRange(f, end)
+        try:
+            arrays = _parse_pgsolver(content, generalized)
+        except (ValueError, IndexError):
+            return None
+    if content.quotes % 2 != 0:
+        return None
+    return arrays
+
+
+def _split_ranges(path, size, parts):
+    """
+    Splits a file in PGSolver format into byte ranges of about the same size. Ranges end with a line ending with a
+    semicolon, so that no record is split.
     :param path: path to the file.
-    :return: a Graph g corresponding to the game graph in the file.
+    :param size: the size of the file in bytes.
+    :param parts: the number of ranges.
+    :return: the list of the (start, end) positions of the ranges.
+    """
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            position = max(bounds[-1], size * i / parts)
+            f.seek(position)
+            # the record ends are searched block by block, the block keeps the last byte of the previous one
+            previous = ""
+            while position < size:
+                block = previous + f.read(1 << 16)
+                match = _RANGE_END.search(block)
+                if match is not None:
+                    position += match.end() - len(previous)
+                    break
+                position += len(block) - len(previous)
+                previous = block[-2:]
+            bounds.append(min(position, size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _load_pgsolver(path, generalized, progress, graph_type, processes=1):
+    """
+    Loads a game graph from a file in PGSolver format. Files compressed with gzip, bzip2 or xz are decompressed while
+    they are read. If several processes are used, the file is split into byte ranges which are parsed in parallel, the
+    arrays of the ranges being concatenated in order so that the graph is the same as the one loaded sequentially.
+    Compressed files, and files in which a range cannot be parsed on its own (names containing a semicolon at the end
+    of a line), are loaded sequentially.
+    :param path: path to the file.
+    :param generalized: if True, the priorities are comma-separated lists (generalized parity).
+    :param progress: if not None, called as progress(bytes_read, total_bytes) while the file is read (bytes of the
+    file on disk for a compressed file).
+    :param graph_type: the class of the returned graph (Graph or CSRGraph).
+    :param processes: the number of processes parsing the file, None for one per core.
+    :return: a graph of type graph_type corresponding to the game graph in the file.
     """
-    with open(path, 'r') as f:
-        g = Graph()
-        next(f)
-        for line in f:
-            split_line = line.split(" ")
-            node = int(split_line[0])
-            priority = int(split_line[1])
+    total = os.path.getsize(path)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
 
-            if split_line[2] == "0":
-                g.add_node(node, (0, priority))
-            else:
-                g.add_node(node, (1, priority))
+    arrays = None
+    if processes > 1 and total > CHUNK_SIZE:
+        with open(path, 'rb') as raw:
+            compressed = _open_input(raw) is not raw
+        if not compressed:
+            arrays = _parse_parallel(path, total, generalized, progress, processes)
+
+    if arrays is None:
+        with open(path, 'rb') as raw:
+            report = None if progress is None else lambda: progress(raw.tell(), total)
+            arrays = _parse_pgsolver(_open_input(raw), generalized, report)
 
-            for succ in split_line[3].split(","):
-                g.add_successor(node, int(succ))
-                g.add_predecessor(int(succ), node)
+    nodes, players, priorities, sources, targets = arrays
+    return graph_type.from_edges(sources, targets, players, priorities, nodes)
 
-    return g
 
-def load_generalized_from_file(path):
+def _parse_parallel(path, total, generalized, progress, processes):
+    """
+    Parses the byte ranges of a file in PGSolver format in a pool of processes and concatenates their arrays in order.
+    :return: the arrays nodes, players, priorities, sources and targets, None if a range could not be parsed.
+    """
+    # more ranges than processes, so that a slow range does not delay the whole loading
+    ranges = _split_ranges(path, total, 4 * processes)
+    merged = None
+    failed = False
+    pool = multiprocessing.Pool(processes)
+    try:
+        tasks = [(path, start, end, generalized) for start, end in ranges]
+        # every result is consumed, even after a range failed : terminating the pool while tasks are still running can
+        # leave its task handler blocked on a lock held by a killed worker
+        for (start, end), arrays in izip(ranges, pool.imap(_parse_range, tasks)):
+            if arrays is None:
+                failed = True
+            if failed:
+                continue
+            if merged is None:
+                merged = arrays
+            else:
+                for merged_array, array_part in izip(merged, arrays):
+                    merged_array.extend(array_part)
+            if progress is not None:
+                progress(end, total)
+    except BaseException:
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+    return None if failed else merged
+
+
+def load_from_file(path, progress=None, graph_type=Graph, processes=1):
+    """
+    Loads a game graph from a file specified by the path.
+    The file must be in PGSolver format, it may be compressed with gzip, bzip2 or xz.
+    :param path: path to the file.
+    :param progress: if not None, called as progress(bytes_read, total_bytes) while the file is read.
+    :param graph_type: the class of the returned graph (Graph or CSRGraph).
+    :param processes: the number of processes parsing the file in parallel, None for one per core.
+    :return: a Graph g corresponding to the game graph in the file.
+    """
+    return _load_pgsolver(path, False, progress, graph_type, processes)
+
+def load_generalized_from_file(path, progress=None, graph_type=Graph, processes=1):
     """
     Loads a generalized parity game graph from a file specified by the path.
-    The file must be in PGSolver format for generalized parity.
+    The file must be in PGSolver format for generalized parity, it may be compressed with gzip, bzip2 or xz.
     :param path: path to the file.
+    :param progress: if not None, called as progress(bytes_read, total_bytes) while the file is read.
+    :param graph_type: the class of the returned graph (Graph or CSRGraph).
+    :param processes: the number of processes parsing the file in parallel, None for one per core.
     :return: a Graph g corresponding to the game graph in the file.
     """
-    with open(path, 'r') as f:
-        g = Graph()
-        next(f)
-        for line in f:
-            split_line = line.split(" ")
-            node = int(split_line[0])
-            priorities = []
-            for prio in split_line[1].split(","):
-                priorities += [int(prio)]
-            if split_line[2] == "0":
-                g.add_node(node, tuple([0]+priorities))
+    return _load_pgsolver(path, True, progress, graph_type, processes)
+
+# Binary format : a header followed by flat arrays, each one starting at a multiple of 8 bytes. The header contains
+# the magic string, a byte order mark, the number of nodes n, the number of edges m, the number k of priority
+# functions, flags and the first node id. The arrays are the node ids (int32[n], absent when the ids are consecutive),
+# the players (int8[n]), the priorities (int32[n] for each priority function), then the successor offsets
+# (int64[n+1]) and targets (int32[m]) and the predecessor offsets (int64[n+1]) and targets (int32[m]).
+BINARY_MAGIC = "GAMEBIN1"
+_BINARY_HEADER = struct.Struct("=8sIQQIIq")
+_BINARY_BYTE_ORDER = 0x01020304
+_CONSECUTIVE_IDS = 1  # flag set when the node ids are start, start+1, ..., start+n-1
+
+
+def _binary_sections(n, m, k, flags):
+    """
+    :return: the list of (name, ctypes type, length) of the arrays stored in a binary file, in order.
+    """
+    sections = [] if flags & _CONSECUTIVE_IDS else [("ids", ctypes.c_int32, n)]
+    sections.append(("players", ctypes.c_int8, n))
+    sections.extend(("priorities", ctypes.c_int32, n) for _ in range(k))
+    sections.extend([("succ_offsets", ctypes.c_int64, n + 1), ("succ_targets", ctypes.c_int32, m),
+                     ("pred_offsets", ctypes.c_int64, n + 1), ("pred_targets", ctypes.c_int32, m)])
+    return sections
+
+
+def save_binary(g, path):
+    """
+    Saves a game graph to a file specified by the path in binary format, to be loaded by load_binary.
+    :param g: a game graph (Graph or CSRGraph), node ids must be integers.
+    :param path: the path to the file.
+    """
+    if not isinstance(g, CSRGraph):
+        g = CSRGraph.from_graph(g)
+    n, m, k = len(g.ids), len(g.succ_targets), len(g.priorities)
+    flags = _CONSECUTIVE_IDS if g.index_of is None else 0
+    start = g.start if g.index_of is None else 0
+    arrays = {"ids": [g.ids], "players": [g.players], "priorities": list(g.priorities),
+              "succ_offsets": [g.succ_offsets], "succ_targets": [g.succ_targets],
+              "pred_offsets": [g.pred_offsets], "pred_targets": [g.pred_targets]}
+
+    with open(path, 'wb') as f:
+        f.write(_BINARY_HEADER.pack(BINARY_MAGIC, _BINARY_BYTE_ORDER, n, m, k, flags, start))
+        for name, ctype, length in _binary_sections(n, m, k, flags):
+            f.write("\0" * (-f.tell() % 8))
+            data = (ctype * length)()
+            data[:] = arrays[name].pop(0)
+            f.write(buffer(data))
+
+
+def load_binary(path):
+    """
+    Loads a game graph from a file in binary format written by save_binary. The file is memory-mapped and the arrays
+    of the returned graph point directly into the mapping : loading takes a time independent of the size of the
+    arena, pages are only read from the disk when they are accessed and are shared between the processes which load
+    the same file.
+    :param path: the path to the file.
+    :return: a CSRGraph corresponding to the game graph in the file.
+    """
+    with open(path, 'rb') as f:
+        # copy-on-write mapping, it is writable as required by ctypes but the file is never modified
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, byte_order, n, m, k, flags, start = _BINARY_HEADER.unpack_from(mapping, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError(path + " is not a binary game file")
+    if byte_order != _BINARY_BYTE_ORDER:
+        raise ValueError(path + " was written on a machine with a different byte order")
+
+    arrays = {"ids": [], "players": [], "priorities": [], "succ_offsets": [], "succ_targets": [],
+              "pred_offsets": [], "pred_targets": []}
+    offset = _BINARY_HEADER.size
+    for name, ctype, length in _binary_sections(n, m, k, flags):
+        offset += -offset % 8
+        # the ctypes array keeps a reference to the mapping, which is closed when the graph is garbage collected
+        arrays[name].append((ctype * length).from_buffer(mapping, offset))
+        offset += ctypes.sizeof(ctype) * length
+
+    if flags & _CONSECUTIVE_IDS:
+        ids = xrange(start, start + n)
+    else:
+        ids = arrays["ids"][0]
+        start = None
+    return CSRGraph(ids, arrays["players"][0], arrays["priorities"], arrays["succ_offsets"][0],
+                    arrays["succ_targets"][0], arrays["pred_offsets"][0], arrays["pred_targets"][0], start)
+
+
+def detect_format(path):
+    """
+    Detects the format of a file from its first bytes.
+    :param path: path to the file.
+    :return: "binary" for the binary format, the name of the compression format ("gzip", "bz2" or "xz") for a
+    compressed file and "pgsolver" otherwise.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(BINARY_MAGIC))
+    if head == BINARY_MAGIC:
+        return "binary"
+    for name, magic, extensions in _COMPRESSIONS:
+        if head.startswith(magic):
+            return name
+    return "pgsolver"
+
+
+def load_game(path, generalized=False, progress=None, graph_type=Graph, processes=1):
+    """
+    Loads a game graph from a file, detecting whether it is in binary format or in PGSolver format.
+    :param path: path to the file.
+    :param generalized: if True, a file in PGSolver format is read as a generalized parity game.
+    :param progress: if not None, called as progress(bytes_read, total_bytes) while a PGSolver file is read.
+    :param graph_type: the class of the graph returned for a PGSolver file (Graph or CSRGraph). A binary file always
+    gives a CSRGraph.
+    :param processes: the number of processes parsing a PGSolver file in parallel, None for one per core.
+    :return: the game graph in the file.
+    """
+    if detect_format(path) == "binary":
+        return load_binary(path)
+    if generalized:
+        return load_generalized_from_file(path, progress, graph_type, processes)
+    return load_from_file(path, progress, graph_type, processes)
+
+
+def print_progress(read, total):
+    """
+    Progress callback for the loading functions, prints the percentage of the file which has been read.
+    :param read: the number of bytes read.
+    :param total: the size of the file in bytes.
+    """
+    sys.stderr.write("\rLoading arena : %3d%%" % (100 * read / max(total, 1)))
+    if read >= total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def _write_buffered(f, pieces, block=4096):
+    """
+    Writes strings to a file by blocks, so that only block strings are held in memory at once.
+    :param f: the file, opened for writing.
+    :param pieces: an iterable of strings.
+    :param block: the number of strings joined and written at once.
+    """
+    buf = []
+    for piece in pieces:
+        buf.append(piece)
+        if len(buf) == block:
+            f.write("".join(buf))
+            buf = []
+    f.write("".join(buf))
+
+
+def _solution_nodes(W_0, W_1, sigma_0, sigma_1):
+    """
+    Enumerates the nodes of a solution.
+    :return: the tuples (node, winner, strategy of the winner, strategy of the loser), strategies being None if they
+    are not provided.
+    """
+    for node in W_0:
+        yield node, 0, sigma_0, sigma_1
+    for node in W_1:
+        yield node, 1, sigma_1, sigma_0
+
+
+def _strategy_successor(g, node, winner, sigma):
+    """
+    :return: the successor chosen by the winning strategy sigma in a node of its player, None if there is none.
+    """
+    if sigma is None or g.get_node_player(node) != winner:
+        return None
+    succ = sigma.get(node, -1)  # strategies are dictionaries with default value -1, get() does not add the node
+    return None if succ == -1 else succ
+
+
+_DOT_HEADER = "digraph G {\nsplines=true;\nsep=\"+10,10\";\noverlap=scale;\nnodesep=0.6;\n"
+_DOT_COLORS = ["blue3", "forestgreen"]  # colors of the regions and strategies of players 0 and 1
+
+
+def _dot_node(g, node, winner, sigma_own, sigma_other, kept=None):
+    """
+    Generates the lines of a node of a solution in dot format, followed by the lines of its outgoing edges.
+    :param g: the game graph.
+    :param node: the node.
+    :param winner: the player winning from the node.
+    :param sigma_own: strategy of the winner (None if it is not computed).
+    :param sigma_other: strategy of the loser (None if it is not computed).
+    :param kept: if not None, only the edges towards nodes in kept are written and the node is dashed if some of its
+    successors are not in kept.
+    """
+    descriptor = g.nodes[node]
+    # the label contains the priority, or the list of priorities for a generalized parity game
+    priority = descriptor[1] if len(descriptor) == 2 else tuple(descriptor[1:])
+    successors = g.get_successors(node)
+    if kept is not None:
+        degree = len(successors)
+        successors = [succ for succ in successors if succ in kept]
+    style = ",style=dashed" if kept is not None and len(successors) != degree else ""
+    yield str(node) + "[label=\"v" + str(node) + " " + str(priority) + "\"" + \
+          (",shape=circle" if descriptor[0] == 0 else ",shape=square") + ",color=" + _DOT_COLORS[winner] + style + \
+          "];\n"
+
+    own = sigma_own.get(node, -1) if sigma_own is not None else -1
+    other = sigma_other.get(node, -1) if sigma_other is not None else -1
+    for succ in successors:
+        if succ == own:
+            yield str(node) + " -> " + str(succ) + "[color=" + _DOT_COLORS[winner] + "];\n"
+        elif succ == other:
+            yield str(node) + " -> " + str(succ) + "[color=" + _DOT_COLORS[1 - winner] + "];\n"
+        else:
+            yield str(node) + " -> " + str(succ) + ";\n"
+
+
+def _dot_solution(g, W_0, W_1, sigma_0, sigma_1):
+    """
+    Generates the lines of a solution in dot format.
+    """
+    yield _DOT_HEADER
+    for node, winner, sigma_own, sigma_other in _solution_nodes(W_0, W_1, sigma_0, sigma_1):
+        for line in _dot_node(g, node, winner, sigma_own, sigma_other):
+            yield line
+    yield "}"
+
+
+def _pgsolver_solution(g, W_0, W_1, sigma_0, sigma_1):
+    """
+    Generates the lines of a solution in PGSolver format : the header "paritysol N;" where N is the largest node id,
+    then one record "node winner [successor];" per node, the successor being given for the nodes of the winner.
+    """
+    yield "paritysol " + str(max(g.get_nodes() or [0])) + ";\n"
+    for line in _compact_solution(g, W_0, W_1, sigma_0, sigma_1):
+        yield line[:-1] + ";\n"
+
+
+def _compact_solution(g, W_0, W_1, sigma_0, sigma_1):
+    """
+    Generates the lines of a solution in compact format : one line "node winner [successor]" per node, the successor
+    being given for the nodes of the winner.
+    """
+    for node, winner, sigma_own, sigma_other in _solution_nodes(W_0, W_1, sigma_0, sigma_1):
+        succ = _strategy_successor(g, node, winner, sigma_own)
+        if succ is None:
+            yield str(node) + " " + str(winner) + "\n"
+        else:
+            yield str(node) + " " + str(winner) + " " + str(succ) + "\n"
+
+
+_SOLUTION_FORMATS = {"dot": _dot_solution, "pgsolver": _pgsolver_solution, "compact": _compact_solution}
+
+
+def write_solution(g, W_0, W_1, path, sigma_0=None, sigma_1=None, fmt="dot"):
+    """
+    Writes the solution of a game to a file specified by the path, in a single pass over the winning regions. The
+    output is generated line by line and written by blocks, it is never held in memory.
+    In dot format, winning region and strategy of player 0 (1) is in blue (green) and nodes belonging to player 0 (1)
+    are circles (squares). In pgsolver format, the solution is written as "paritysol N;" followed by one record
+    "node winner [successor];" per node. The compact format contains one line "node winner [successor]" per node.
+    :param g: the game graph.
+    :param W_0: winning region of player 0.
+    :param W_1: winning region of player 1.
+    :param path: the path to the file in which we write the solution (compressed if it ends with .gz, .bz2 or .xz).
+    :param sigma_0: winning strategy of player 0 (None if it is not computed).
+    :param sigma_1: winning strategy of player 1 (None if it is not computed).
+    :param fmt: the format of the file, "dot", "pgsolver" or "compact".
+    """
+    lines = _SOLUTION_FORMATS[fmt](g, W_0, W_1, sigma_0, sigma_1)
+    with _open_output(path) as f:
+        _write_buffered(f, lines)
+
+def write_dot_neighbourhood(g, W_0, W_1, path, around, budget=500, sigma_0=None, sigma_1=None):
+    """
+    Writes the part of the solution of a game around some nodes in dot format, for games too large to be drawn. Nodes
+    are selected by a breadth-first search from the given nodes following edges in both directions, until budget nodes
+    are selected. Only the edges between selected nodes are written, the nodes having other successors are dashed. The
+    time taken depends on the budget and the degrees of the selected nodes, not on the size of the game.
+    Colors and shapes are the ones of write_solution.
+    :param g: the game graph.
+    :param W_0: winning region of player 0 (a set avoids a conversion).
+    :param W_1: winning region of player 1.
+    :param path: the path to the file in which we write the solution (compressed if it ends with .gz, .bz2 or .xz).
+    :param around: the nodes around which the game is drawn.
+    :param budget: the maximum number of nodes written.
+    :param sigma_0: winning strategy of player 0 (None if it is not computed).
+    :param sigma_1: winning strategy of player 1 (None if it is not computed).
+    """
+    if not isinstance(W_0, (set, frozenset, dict)):
+        W_0 = set(W_0)
+    kept = set()
+    selected = []  # selected nodes, in breadth-first order
+    queue = deque()
+    for node in around:
+        if len(selected) < budget and node not in kept:
+            kept.add(node)
+            selected.append(node)
+            queue.append(node)
+    while queue and len(selected) < budget:
+        node = queue.popleft()
+        for neighbour in chain(g.get_successors(node), g.get_predecessors(node)):
+            if neighbour not in kept:
+                kept.add(neighbour)
+                selected.append(neighbour)
+                queue.append(neighbour)
+                if len(selected) == budget:
+                    break
+
+    def lines():
+        yield _DOT_HEADER
+        for node in selected:
+            if node in W_0:
+                node_lines = _dot_node(g, node, 0, sigma_0, sigma_1, kept)
             else:
-                g.add_node(node, tuple([1]+priorities))
+                node_lines = _dot_node(g, node, 1, sigma_1, sigma_0, kept)
+            for line in node_lines:
+                yield line
+        yield "}"
 
-            for succ in split_line[3].split(","):
-                g.add_successor(node, int(succ))
-                g.add_predecessor(int(succ), node)
+    with _open_output(path) as f:
+        _write_buffered(f, lines())
 
-    return g
+def write_dot_summary(g, W_0, W_1, path, budget=500):
+    """
+    Writes a summary of the solution of a game in dot format, for games too large to be drawn. The nodes of each
+    strongly connected component of the game which belong to the same winning region are collapsed into a single box
+    labelled with their number, the number of edges between them and the range of their priorities. Edges between
+    boxes are labelled with the number of edges of the game they represent. If there are more than budget boxes, the
+    smallest ones are merged into one box per winning region.
+    :param g: the game graph.
+    :param W_0: winning region of player 0.
+    :param W_1: winning region of player 1.
+    :param path: the path to the file in which we write the solution (compressed if it ends with .gz, .bz2 or .xz).
+    :param budget: the maximum number of boxes written.
+    """
+    winner = dict.fromkeys(W_0, 0)
+    winner.update(dict.fromkeys(W_1, 1))
+
+    # groups of nodes, identified by (winner, component index), with their sizes and priority ranges
+    group = {}
+    sizes = defaultdict(int)
+    priorities = {}
+    for index, component in enumerate(ops.strongly_connected_components(g)):
+        for node in component:
+            key = (winner[node], index)
+            group[node] = key
+            sizes[key] += 1
+            priority = g.get_node_priority(node)
+            low, high = priorities.get(key, (priority, priority))
+            priorities[key] = (min(low, priority), max(high, priority))
+
+    # when there are too many groups, the smallest ones are merged into one group per winning region
+    if len(sizes) > budget:
+        kept = set(sorted(sizes, key=lambda key: -sizes[key])[:max(budget - 2, 0)])
+        for node, key in group.iteritems():
+            if key not in kept:
+                group[node] = (key[0], "rest")
+        merged_sizes = defaultdict(int)
+        merged_priorities = {}
+        for key, size in sizes.iteritems():
+            new_key = key if key in kept else (key[0], "rest")
+            merged_sizes[new_key] += size
+            low, high = priorities[key]
+            merged_low, merged_high = merged_priorities.get(new_key, (low, high))
+            merged_priorities[new_key] = (min(low, merged_low), max(high, merged_high))
+        sizes, priorities = merged_sizes, merged_priorities
+
+    # edges between and inside groups
+    edges = defaultdict(int)
+    for node in g.get_nodes():
+        key = group[node]
+        for succ in g.get_successors(node):
+            edges[(key, group[succ])] += 1
+
+    names = dict((key, "g" + str(i)) for i, key in enumerate(sorted(sizes, key=str)))
+
+    def lines():
+        yield _DOT_HEADER
+        for key in sorted(sizes, key=str):
+            description = "other components" if key[1] == "rest" else "component " + str(key[1])
+            yield names[key] + "[label=\"W" + str(key[0]) + " " + description + "\\n" + str(sizes[key]) + \
+                  " nodes, " + str(edges.get((key, key), 0)) + " edges\\npriorities " + str(priorities[key][0]) + \
+                  " to " + str(priorities[key][1]) + "\",shape=box,color=" + _DOT_COLORS[key[0]] + "];\n"
+        for (source, target), count in sorted(edges.iteritems(), key=str):
+            if source != target:
+                yield names[source] + " -> " + names[target] + "[label=\"" + str(count) + "\"];\n"
+        yield "}"
+
+    with _open_output(path) as f:
+        _write_buffered(f, lines())
 
 def write_solution_to_file(g, solution, player, path):
     """
@@ -65,7 +769,7 @@ def write_solution_to_file(g, solution, player, path):
     :param g: the game Graph.
     :param solution: if player is 0, expected solution format is (W_0, sigma_0),(W_1, sigma_1). If player is 1, invert.
     :param player: the player to which the first tuple in the solution belongs.
-    :param path: the path to the file in which we write the solution.
+    :param path: the path to the file in which we write the solution (compressed if it ends with .gz, .bz2 or .xz).
     """
 
     if player == 0:
@@ -73,60 +777,7 @@ def write_solution_to_file(g, solution, player, path):
     else :
         (W_1, sigma_1), (W_0, sigma_0) = solution
 
-    with open(path, 'w') as f:
-        f.write("digraph G {\n")
-        f.write("splines=true;\nsep=\"+10,10\";\noverlap=scale;\nnodesep=0.6;\n")
-        for node in W_0:
-            to_write = str(node) + "[label=\"v" + str(node) + " " + str(g.get_node_priority(node)) + "\""
-            if g.get_node_player(node) == 0:
-                to_write += ",shape=circle"
-            elif g.get_node_player(node) == 1:
-                to_write += ",shape=square"
-            else:
-                pass
-                # error
-
-            to_write += ",color=blue3"
-            to_write += "];\n"
-            f.write(to_write)
-
-            for succ in g.successors[node]:
-                to_write += str(node) + " -> " + str(succ)
-
-                if succ == sigma_0[node]:
-                    to_write += '[color=blue3];\n'
-                elif succ == sigma_1[node]:
-                    to_write += '[color=forestgreen];\n'
-                else:
-                    to_write += ";\n"
-            f.write(to_write)
-
-        for node in W_1:
-            to_write = str(node) + "[label=\"v" + str(node) + " " + str(g.get_node_priority(node)) + "\""
-            if g.get_node_player(node) == 0:
-                to_write += ",shape=circle"
-            elif g.get_node_player(node) == 1:
-                to_write += ",shape=square"
-            else:
-                pass
-                # error
-
-            to_write += ",color=forestgreen"
-            to_write += "];\n"
-            f.write(to_write)
-
-            for succ in g.successors[node]:
-                to_write += str(node) + " -> " + str(succ)
-
-                if succ == sigma_1[node]:
-                    to_write += '[color=forestgreen];\n'
-                elif succ == sigma_0[node]:
-                    to_write += '[color=blue3];\n'
-                else:
-                    to_write += ";\n"
-            f.write(to_write)
-
-        f.write('}')
+    write_solution(g, W_0, W_1, path, sigma_0, sigma_1)
 
 def write_solution_to_file_no_strategies(g, W1, W2, path):
     """
@@ -136,51 +787,10 @@ def write_solution_to_file_no_strategies(g, W1, W2, path):
     :param g: the game Graph.
     :param W1: winning region of player 0 (1).
     :param W2: winning region of player 1 (2).
-    :param path: the path to the file in which we write the solution.
+    :param path: the path to the file in which we write the solution (compressed if it ends with .gz, .bz2 or .xz).
     """
 
-    with open(path, 'w') as f:
-        f.write("digraph G {\n")
-        f.write("splines=true;\nsep=\"+10,10\";\noverlap=scale;\nnodesep=0.6;\n")
-        for node in W1:
-            to_write = str(node) + "[label=\"v" + str(node) + " " + str(g.get_node_priority(node)) + "\""
-            if g.get_node_player(node) == 0:
-                to_write += ",shape=circle"
-            elif g.get_node_player(node) == 1:
-                to_write += ",shape=square"
-            else:
-                pass
-                # error
-
-            to_write += ",color=blue3"
-            to_write += "];\n"
-            f.write(to_write)
-
-            for succ in g.successors[node]:
-                to_write += str(node) + " -> " + str(succ)
-                to_write += ";\n"
-            f.write(to_write)
-
-        for node in W2:
-            to_write = str(node) + "[label=\"v" + str(node) + " " + str(g.get_node_priority(node)) + "\""
-            if g.get_node_player(node) == 0:
-                to_write += ",shape=circle"
-            elif g.get_node_player(node) == 1:
-                to_write += ",shape=square"
-            else:
-                pass
-                # error
-
-            to_write += ",color=forestgreen"
-            to_write += "];\n"
-            f.write(to_write)
-
-            for succ in g.successors[node]:
-                to_write += str(node) + " -> " + str(succ)
-                to_write += ";\n"
-            f.write(to_write)
-
-        f.write('}')
+    write_solution(g, W1, W2, path)
 
 def write_generalized_solution_to_file(g, W1, W2, path):
     """
@@ -190,60 +800,19 @@ def write_generalized_solution_to_file(g, W1, W2, path):
     :param g: the game Graph.
     :param W1: winning region of player 0 (1).
     :param W2: winning region of player 1 (2).
-    :param path: the path to the file in which we write the solution.
+    :param path: the path to the file in which we write the solution (compressed if it ends with .gz, .bz2 or .xz).
     """
 
-    with open(path, 'w') as f:
-        f.write("digraph G {\n")
-        f.write("splines=true;\nsep=\"+10,10\";\noverlap=scale;\nnodesep=0.6;\n")
-        for node in W1:
-            to_write = str(node) + "[label=\"v" + str(node) + " " + str(g.nodes[node][1:]) + "\""
-            if g.get_node_player(node) == 0:
-                to_write += ",shape=circle"
-            elif g.get_node_player(node) == 1:
-                to_write += ",shape=square"
-            else:
-                pass
-                # error
-
-            to_write += ",color=blue3"
-            to_write += "];\n"
-            f.write(to_write)
-
-            for succ in g.successors[node]:
-                to_write += str(node) + " -> " + str(succ)
-                to_write += '[color=black];\n'
-            f.write(to_write)
-
-        for node in W2:
-            to_write = str(node) + "[label=\"v" + str(node) + " " + str(g.nodes[node][1:]) + "\""
-            if g.get_node_player(node) == 0:
-                to_write += ",shape=circle"
-            elif g.get_node_player(node) == 1:
-                to_write += ",shape=square"
-            else:
-                pass
-                # error
-
-            to_write += ",color=forestgreen"
-            to_write += "];\n"
-            f.write(to_write)
-
-            for succ in g.successors[node]:
-                to_write += str(node) + " -> " + str(succ)
-                to_write += '[color=black];\n'
-            f.write(to_write)
-
-        f.write('}')
+    write_solution(g, W1, W2, path)
 
 def write_graph_to_file(g, path):
     """
     Writes a game graph to a file specified by the path in dot format.
     :param g: a game Graph.
-    :param path: the file to which we write the graph.
+    :param path: the file to which we write the graph (compressed if it ends with .gz, .bz2 or .xz).
     """
 
-    with open(path, 'w') as f:
+    with _open_output(path) as f:
         f.write("digraph G {\n")
         for node in g.get_nodes():
             to_write = str(node) + "[label=\"" + str(node) + " " + str(g.get_node_priority(node)) + "\""
@@ -257,7 +826,7 @@ def write_graph_to_file(g, path):
 
             to_write += "];\n"
 
-            for succ in g.successors[node]:
+            for succ in g.get_successors(node):
                 to_write += str(node) + " -> " + str(succ) + ";\n"
 
             f.write(to_write)
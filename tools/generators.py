@@ -1,7 +1,5 @@
 from random import randint, sample, choice
 
-import copy
-
 from graph import Graph
 
 """
@@ -17,15 +15,11 @@ def complete_graph(n):
     :param n: number of nodes.
     :return: a Graph object representing the complete graph.
     """
-    g = Graph()  # creates empty graph
-
     # creates n nodes belonging to player 1 with all nodes as successors and predecessors
-    for i in range(1, n + 1):
-        g.add_node(i, (1, 0))
-        g.successors[i] = range(1, n + 1)
-        g.predecessors[i] = range(1, n + 1)
+    sources = [i for i in range(1, n + 1) for j in range(1, n + 1)]
+    targets = range(1, n + 1) * n
 
-    return g
+    return Graph.from_edges(sources, targets, [1] * n, [0] * n, range(1, n + 1))
 
 
 def complete_graph_weakparity(n):
@@ -37,14 +31,10 @@ def complete_graph_weakparity(n):
     :param n: number of nodes.
     :return: a Graph object representing the complete graph.
     """
-    g = Graph()  # create empty graph
+    sources = [i for i in range(1, n + 1) for j in range(1, n + 1)]
+    targets = range(1, n + 1) * n
 
-    for i in range(1, n + 1):
-        g.add_node(i, (0, 0))
-        g.successors[i] = range(1, n + 1)
-        g.predecessors[i] = range(1, n + 1)
-    g.nodes[1] = (0, 2)
-    return g
+    return Graph.from_edges(sources, targets, [0] * n, [2] + [0] * (n - 1), range(1, n + 1))
 
 
 def weak_parity_worst_case(n):
@@ -56,15 +46,11 @@ def weak_parity_worst_case(n):
     :param n: number of nodes.
     :return: a Graph object representing the complete graph.
     """
-    g = Graph()  # create empty graph
-
     # create n nodes belonging to player 1
-    for i in range(1, n + 1):
-        g.add_node(i, (1, 2 * i))
-        g.successors[i] = range(1, n + 1)
-        g.predecessors[i] = range(1, n + 1)
+    sources = [i for i in range(1, n + 1) for j in range(1, n + 1)]
+    targets = range(1, n + 1) * n
 
-    return g
+    return Graph.from_edges(sources, targets, [1] * n, [2 * i for i in range(1, n + 1)], range(1, n + 1))
 
 
 def reachability_worst_case(n):
@@ -76,21 +62,17 @@ def reachability_worst_case(n):
     :param n: number of nodes.
     :return: a Graph object of the described form.
     """
-    g = Graph()
-    # create n-1 nodes numbered from n to 2
+    sources = []
+    targets = []
+    # node k (numbered n to 2) has successors numbered k-1 to 1
     for k in range(n, 1, -1):
-        g.add_node(k, (1, 0))
-        # add successors to node k (numbered k-1 to 1)
-        g.successors[k] = range(k - 1, 0, -1)
-        g.predecessors[k] = range(k + 1, n + 1)
-        g.add_predecessor(1, k)
-    # same for node 1 which has all nodes as successors
-    g.add_node(1, (1, 0))
-    for i in range(n, 0, -1):
-        g.add_successor(1, i)
-        g.add_predecessor(i, 1)
+        sources.extend([k] * (k - 1))
+        targets.extend(range(k - 1, 0, -1))
+    # node 1 has all nodes as successors
+    sources.extend([1] * n)
+    targets.extend(range(n, 0, -1))
 
-    return g
+    return Graph.from_edges(sources, targets, [1] * n, [0] * n, range(n, 0, -1))
 
 
 def strong_parity_worst_case(n):
@@ -101,7 +83,8 @@ def strong_parity_worst_case(n):
     :param n: the number for the generation of the graph (yields n*5 nodes).
     :return: a worst case graph for the recursive algorithm.
     """
-    g = Graph()
+    nodes, players, priorities = [], [], []
+    sources, targets = [], []
     # We use a list to store each of the 5 types of nodes. Each node has a unique integer value, but for increased
     # readability and understandability, we work with the nodes using their list and the position they are in their list
     # For a and b, first element is a placeholder so indexes start at 1
@@ -114,61 +97,71 @@ def strong_parity_worst_case(n):
     # creating nodes, their integer value is from 1 to 5*n
     # we adapted the code (modulos and parities for c,d,e) because we count from 1 to n in the loop
     for i in range(1, n + 1):
-        g.add_node(i, (1 - (i % 2), 1 - (i % 2)))
+        nodes.append(i)
+        players.append(1 - (i % 2))
+        priorities.append(1 - (i % 2))
         a.append(i)
-        g.add_node(n + i, (i % 2, 1 - (i % 2)))
+        nodes.append(n + i)
+        players.append(i % 2)
+        priorities.append(1 - (i % 2))
         b.append(n + i)
-        g.add_node((2 * n) + i, ((i % 2), (3 * (i - 1)) + 5))
+        nodes.append((2 * n) + i)
+        players.append((i % 2))
+        priorities.append((3 * (i - 1)) + 5)
         c.append((2 * n) + i)
-        g.add_node((3 * n) + i, (1 - (i % 2), (3 * (i - 1)) + 4))
+        nodes.append((3 * n) + i)
+        players.append(1 - (i % 2))
+        priorities.append((3 * (i - 1)) + 4)
         d.append((3 * n) + i)
-        g.add_node((4 * n) + i, (i % 2, (3 * (i - 1)) + 3))
+        nodes.append((4 * n) + i)
+        players.append(i % 2)
+        priorities.append((3 * (i - 1)) + 3)
         e.append((4 * n) + i)
 
     # adding a and b successors
     for i in range(1, n + 1):
-        g.add_successor(a[i], b[i])
-        g.add_predecessor(b[i], a[i])
+        sources.append(a[i])
+        targets.append(b[i])
 
-        g.add_successor(a[i], d[i - 1])
-        g.add_predecessor(d[i - 1], a[i])
+        sources.append(a[i])
+        targets.append(d[i - 1])
 
-        g.add_successor(b[i], a[i])
-        g.add_predecessor(a[i], b[i])
+        sources.append(b[i])
+        targets.append(a[i])
 
         if i >= 0 and i < len(c):
-            g.add_successor(b[i], c[i])
-            g.add_predecessor(c[i], b[i])
+            sources.append(b[i])
+            targets.append(c[i])
 
     # adding c,d,e successors
     for i in range(0, n):
         # c
-        g.add_successor(c[i], b[i + 1])
-        g.add_predecessor(b[i + 1], c[i])
+        sources.append(c[i])
+        targets.append(b[i + 1])
 
-        g.add_successor(c[i], d[i])
-        g.add_predecessor(d[i], c[i])
+        sources.append(c[i])
+        targets.append(d[i])
 
         # d
-        g.add_successor(d[i], e[i])
-        g.add_predecessor(e[i], d[i])
+        sources.append(d[i])
+        targets.append(e[i])
 
         if i - 1 >= 0 and i - 1 < len(d):
-            g.add_successor(d[i], d[i - 1])
-            g.add_predecessor(d[i - 1], d[i])
+            sources.append(d[i])
+            targets.append(d[i - 1])
 
         if i + 1 >= 0 and i + 1 < len(d):
-            g.add_successor(d[i], d[i + 1])
-            g.add_predecessor(d[i + 1], d[i])
+            sources.append(d[i])
+            targets.append(d[i + 1])
 
         # e
-        g.add_successor(e[i], b[i + 1])
-        g.add_predecessor(b[i + 1], e[i])
+        sources.append(e[i])
+        targets.append(b[i + 1])
 
-        g.add_successor(e[i], d[i])
-        g.add_predecessor(d[i], e[i])
+        sources.append(e[i])
+        targets.append(d[i])
 
-    return g
+    return Graph.from_edges(sources, targets, players, priorities, nodes)
 
 
 def random(n, p, i, o):
@@ -269,15 +262,14 @@ def ladder(n):
     :param n: parameter of the ladder (2n nodes).
     :return: a ladder game graph.
     """
-    g = Graph()
-    for node in range(0, 2*n):
-        g.add_node(node, (node%2, node%2))
+    sources = []
+    targets = []
     for v in range(0, 2 * n):
         for w in range(0, 2 * n):
             if (v+1)%(2*n) == w%(2*n) or (v+2)%(2*n) == w%(2*n):
-                g.add_successor(v, w)
-                g.add_predecessor(w, v)
-    return g
+                sources.append(v)
+                targets.append(w)
+    return Graph.from_edges(sources, targets, [node%2 for node in range(0, 2*n)], [node%2 for node in range(0, 2*n)])
 
 def multiple_priorities(g,n):
     """
@@ -287,11 +279,11 @@ def multiple_priorities(g,n):
     :param n: the number of priority functions required in the generalized game.
     :return: a generalized parity game graph.
     """
-    new = copy.deepcopy(g)
-    for node in new.get_nodes():
-        prev = new.nodes[node] # tuple (player, priority)
-        new.nodes[node] = tuple([prev[0]]+n*[prev[1]])
-    return new
+    descriptors = {}
+    for node in g.get_nodes():
+        prev = g.nodes[node] # tuple (player, priority)
+        descriptors[node] = tuple([prev[0]]+n*[prev[1]])
+    return g.with_descriptors(descriptors)
 
 def opposite_priorities(g):
     """
@@ -301,8 +293,8 @@ def opposite_priorities(g):
     :param g: a parity game graph.
     :return: a generalized parity game graph.
     """
-    new = copy.deepcopy(g)
-    for node in new.get_nodes():
-        prev = new.nodes[node] # tuple (player, priority)
-        new.nodes[node] = tuple([prev[0]]+[prev[1]]+[prev[1]+1])
-    return new
\ No newline at end of file
+    descriptors = {}
+    for node in g.get_nodes():
+        prev = g.nodes[node] # tuple (player, priority)
+        descriptors[node] = tuple([prev[0]]+[prev[1]]+[prev[1]+1])
+    return g.with_descriptors(descriptors)
\ No newline at end of file
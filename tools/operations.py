@@ -3,8 +3,11 @@ This module contains general-purpose functions used in several of our algorithms
 """
 import ctypes
 import collections
+from array import array
 
-from antichains.library_linker import createGraph_c, addEdge_c, displayGraph_c
+from antichains.library_linker import createGraphFromArrays_c, loadGraphFromFile_c, destroyGraph_c, winning_region_c, \
+    free_winning_regions_c
+from graph import Graph, reachable
 
 
 def opponent(j):
@@ -26,9 +29,8 @@ def i_priority_node(g, i):
     :param i: the requested priority.
     :return: a list of nodes of priority i in g.
     """
-    nodes = g.nodes  # Nodes from g
-    # get all node indexes in node tuple (index, (node_player, node_priority)) when node_priority is i
-    return [k for k, v in nodes.iteritems() if v[1] == i]
+    # nodes are indexed by priority in the game graph, only the bucket of priority i is considered
+    return g.get_nodes_with_priority(i)
 
 
 def i_priority_node_function_j(g, i, j):
@@ -38,9 +40,7 @@ def i_priority_node_function_j(g, i, j):
     :param j: the priority function.
     :return: all nodes of priority i in game graph g according to priority function j.
     """
-    nodes = g.nodes  # Nodes from g
-    # get all node indexes in node tuple (index, (node_player, node_priority)) when node_priority is i
-    return [k for k, v in nodes.iteritems() if v[j] == i]
+    return g.get_nodes_with_priority(i, j)
 
 
 def max_priority(g):
@@ -49,9 +49,7 @@ def max_priority(g):
     :param g: a game graph.
     :return: the maximum priority in g.
     """
-    nodes = g.nodes  # Nodes from g
-    # get maximum node tuple (index, (node_player, node_priority)) according to its priority, then select its priority
-    return max(nodes.iteritems(), key=lambda (k, v): v[1])[1][1]
+    return g.get_max_priority()
 
 
 def i_priority_node_non_removed(g, i, removed):
@@ -62,9 +60,7 @@ def i_priority_node_non_removed(g, i, removed):
     :param i: the requested priority.
     :return: a list of nodes of priority i in g except for the removed nodes.
     """
-    nodes = {k: v for k, v in g.nodes.iteritems() if not removed[k]}
-    # get all node indexes in node tuple (index, (node_player, node_priority)) when node_priority is i
-    return [k for k, v in nodes.iteritems() if v[1] == i]
+    return [k for k in g.get_nodes_with_priority(i) if not removed[k]]
 
 
 def max_priority_non_removed(g, removed):
@@ -74,9 +70,11 @@ def max_priority_non_removed(g, removed):
     :param g: a game graph.
     :return: the maximum priority in g except for the removed nodes.
     """
-    nodes = {k: v for k, v in g.nodes.iteritems() if not removed[k]}
-    # get maximum node tuple (index, (node_player, node_priority)) according to its priority, then select its priority
-    return max(nodes.iteritems(), key=lambda (k, v): v[1])[1][1]
+    # priorities are considered in decreasing order until one of them has a node which is not removed
+    for priority in sorted(g.get_priorities(), reverse=True):
+        for k in g.get_nodes_with_priority(priority):
+            if not removed[k]:
+                return priority
 
 
 def update_strategy(strat1, strat2):
@@ -91,6 +89,102 @@ def update_strategy(strat1, strat2):
     return new_strat
 
 
+def strongly_connected_components(g):
+    """
+    Computes the strongly connected components of a game graph using Tarjan's algorithm. The depth-first search is
+    iterative (an explicit stack of successor iterators replaces the recursion), long paths do not exceed the recursion
+    limit.
+    :param g: a game graph.
+    :return: the list of the strongly connected components (lists of nodes) in reverse topological order : no edge goes
+    from a component to a component which comes after it in the list.
+    """
+    index = {}  # discovery order of the nodes
+    low = {}  # smallest discovery order reachable from the subtree of a node through the nodes on the stack
+    stack = []  # nodes whose component is not complete yet
+    on_stack = set()
+    components = []
+    counter = 0
+    for root in g.get_nodes():
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(g.get_successors(root)))]  # depth-first search stack
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    # tree edge, the search continues from succ and resumes the iterator of node afterwards
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(g.get_successors(succ))))
+                    break
+                elif succ in on_stack and index[succ] < low[node]:
+                    low[node] = index[succ]
+            else:
+                # every successor of node has been explored
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    # node is the root of a component, made of the nodes above it on the stack
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def reachable_subgame(g, node):
+    """
+    Builds the part of a game graph which is reachable from a node. Only that part is explored, which makes it suitable
+    for a LazyGraph. Nodes are renamed 0 to n-1 so that the result can be solved by the array-based solvers whatever
+    the original node ids are.
+    :param g: a game graph.
+    :param node: the initial node.
+    :return: the reachable sub-game (a Graph) and the list of original ids, node i of the sub-game being ids[i]. The
+    initial node is renamed 0.
+    """
+    ids = reachable(g, node)
+    index = dict((v, i) for i, v in enumerate(ids))
+    descriptors = g.get_nodes_descriptors()
+    sources = array('i')
+    targets = array('i')
+    for i, v in enumerate(ids):
+        for successor in g.get_successors(v):
+            sources.append(i)
+            targets.append(index[successor])
+    players = [descriptors[v][0] for v in ids]
+    priorities = [tuple(descriptors[v][1:]) for v in ids]
+    return Graph.from_edges(sources, targets, players, priorities), ids
+
+
+def local_solution(solution, ids):
+    """
+    Translates the solution of a reachable sub-game built by reachable_subgame into the winner of its initial node.
+    :param solution: the solution of the sub-game in the following format : (W_0, sigma_0), (W_1, sigma_1).
+    :param ids: the original ids of the nodes of the sub-game.
+    :return: the winner of the initial node and its winning region and strategy in the explored part, in the
+    following format : winner, (W, sigma), with the original node ids.
+    """
+    (W0, sigma0), (W1, sigma1) = solution
+    winner, W, sigma = (0, W0, sigma0) if 0 in W0 else (1, W1, sigma1)
+    strategy = collections.defaultdict(lambda: -1)
+    for node in W:
+        successor = sigma.get(node, -1)
+        if successor != -1:
+            strategy[ids[node]] = ids[successor]
+    return winner, ([ids[node] for node in W], strategy)
+
+
 def print_solution(solution, player):
     """
     Formats the solution of a game and prints it in the command line.
@@ -130,26 +224,8 @@ def transform_graph_into_c(g):
     :param g: a game graph.
     :return: a game graph in c format and the number of nodes in that graph.
     """
-    # nbr of nodes in the graph is needed by the c structure
-    nbr_nodes = len(g.get_nodes())
-    # the c structure needs players (0 for player 0 and 1 for player 1) and priorities as arrays
-    priorities = [0]*nbr_nodes
-    players = [0]*nbr_nodes
-
-    # need to create every node before creating the edges. /!\ nodes are numbered from 0 to nbr_nodes-1 in the C struct
-    for node in g.get_nodes():
-        priorities[node-1] = g.nodes[node][1]
-        players[node-1] = g.nodes[node][0]
-
-    # creating the c graph
-    dir_graph = createGraph_c(nbr_nodes,(ctypes.c_int * len(priorities))(*priorities),(ctypes.c_int * len(players))(*players))
-
-    # adding every edge
-    for node in g.get_nodes():
-        for succ in g.get_successors(node):
-            addEdge_c(dir_graph, node-1, succ-1)
-
-    return dir_graph, nbr_nodes
+    # /!\ nodes are numbered from 0 to nbr_nodes-1 in the C struct
+    return _transform_graph_into_c(g, 1)
 
 def transform_graph_into_c_spec(g):
     """
@@ -158,27 +234,140 @@ def transform_graph_into_c_spec(g):
     :param g: a game graph.
     :return: a game graph in c format and the number of nodes in that graph.
     """
+    # here nodes are already numbered from 0
+    return _transform_graph_into_c(g, 0)
+
+def _transform_graph_into_c(g, start):
+    """
+    Transforms a game graph (Graph or CSRGraph) to a graph structure in c using a single call to the c library. The
+    successors lists are given as contiguous arrays (offsets and targets) which are passed to c without being copied.
+    :param g: a game graph whose nodes are numbered from start to start+n-1.
+    :param start: the id of the first node, node start+i is node i in the C struct.
+    :return: a game graph in c format and the number of nodes in that graph.
+    """
     # nbr of nodes in the graph is needed by the c structure
     nbr_nodes = len(g.get_nodes())
-    # the c structure needs players (0 for player 0 and 1 for player 1) and priorities
-    priorities = [0]*nbr_nodes
-    players = [0]*nbr_nodes
+    # the c structure needs players (0 for player 0 and 1 for player 1) and priorities as arrays
+    priorities = array('i', [0]) * nbr_nodes
+    players = array('i', [0]) * nbr_nodes
+    offsets = array('i', [0]) * (nbr_nodes + 1)
+    targets = array('i')
 
-    # need to create every node before creating the edges.
-    # here nodes are already numbered from 0
-    for node in g.get_nodes():
-        priorities[node] = g.nodes[node][1]
-        players[node] = g.nodes[node][0]
+    for i in xrange(nbr_nodes):
+        node = start + i
+        priorities[i] = g.get_node_priority(node)
+        players[i] = g.get_node_player(node)
+        targets.extend([succ - start for succ in g.get_successors(node)])
+        offsets[i + 1] = len(targets)
+
+    # creating the c graph and its edges, ctypes arrays share the memory of the python arrays
+    dir_graph = createGraphFromArrays_c(nbr_nodes, _c_int_array(priorities), _c_int_array(players),
+                                        _c_int_array(offsets), _c_int_array(targets))
+    return dir_graph, nbr_nodes
 
-    # creating the c graph
-    dir_graph = createGraph_c(nbr_nodes,(ctypes.c_int * len(priorities))(*priorities),(ctypes.c_int * len(players))(*players))
+def _c_int_array(values):
+    """
+    :param values: an array of type 'i'.
+    :return: a ctypes array of int sharing the memory of values.
+    """
+    if len(values) == 0:
+        return (ctypes.c_int * 1)()
+    return (ctypes.c_int * len(values)).from_buffer(values)
 
-    # adding every edge
-    for node in g.get_nodes():
-        for succ in g.get_successors(node):
-            addEdge_c(dir_graph, node, succ)
+def c_winning_regions(c_graph, nbr_nodes, increment):
+    """
+    Calls the C implementation of the backward fixpoint algorithm on a C game graph and releases the array it returns.
+    :param c_graph: the game arena of the parity game in C format.
+    :param nbr_nodes: number of nodes in the graph.
+    :param increment: the id of the first node, node i in the C struct is node i+increment.
+    :return: the winning regions W0 and W1 in the parity game.
+    """
+    W0 = []
+    W1 = []
+    res = winning_region_c(c_graph)
+    try:
+        # winning regions returns an array of integers, 1 if node is won by player 0 and 0 if won by player 1
+        for i in xrange(nbr_nodes):
+            if res[i] == 1:
+                W0.append(i + increment)
+            else:
+                W1.append(i + increment)
+    finally:
+        free_winning_regions_c(res)
+    return W0, W1
 
-    return dir_graph, nbr_nodes
+class CGraph(object):
+    """
+    Handle owning a game graph in C format. The C graph is built once and can be solved any number of times, its memory
+    is released by close(), when leaving a with block or, as a last resort, when the handle is garbage collected.
+    """
+
+    def __init__(self, c_graph, nbr_nodes, start):
+        """
+        :param c_graph: a pointer to a C graph, the handle becomes responsible for destroying it.
+        :param nbr_nodes: number of nodes in the graph.
+        :param start: the id of the first node, node start+i is node i in the C struct.
+        """
+        self.c_graph = c_graph
+        self.nbr_nodes = nbr_nodes
+        self.start = start
+
+    @classmethod
+    def from_graph(cls, g, start=1):
+        """
+        Transforms a game graph whose nodes are numbered from start to start+n-1 into a C graph.
+        :param g: a game graph (Graph or CSRGraph).
+        :param start: the id of the first node.
+        :return: a handle on the C graph.
+        """
+        c_graph, nbr_nodes = _transform_graph_into_c(g, start)
+        return cls(c_graph, nbr_nodes, start)
+
+    @classmethod
+    def from_file(cls, path, start=1):
+        """
+        Loads a game in PGSolver format directly into a C graph.
+        :param path: path to the file containing the game arena.
+        :param start: the id of the first node in the file.
+        :return: a handle on the C graph.
+        """
+        c_graph = loadGraphFromFile_c(path, start)
+        if not c_graph:
+            raise IOError("could not load the parity game in " + path)
+        return cls(c_graph, c_graph.contents.num_vertices, start)
+
+    @property
+    def closed(self):
+        return self.c_graph is None
+
+    def solve(self):
+        """
+        Solves the parity game using the antichain-based algorithm. The C graph is left untouched and can be solved again.
+        :return: the winning regions W0 and W1 in the parity game.
+        """
+        if self.c_graph is None:
+            raise ValueError("solve on a closed C graph")
+        return c_winning_regions(self.c_graph, self.nbr_nodes, self.start)
+
+    def close(self):
+        """
+        Destroys the C graph, calling it more than once has no effect.
+        """
+        if self.c_graph is not None:
+            c_graph = self.c_graph
+            self.c_graph = None
+            destroyGraph_c(c_graph)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        # the module globals can already be gone when the interpreter shuts down
+        if destroyGraph_c is not None:
+            self.close()
 
 def are_lists_equal(list1, list2):
     """
@@ -1,17 +1,15 @@
 """
 This module contains functions used to optimize the run time of several of our algorithms.
 """
-import copy
-
 
 def compress_priorities(g):
     """
     :param g: a game arena
     :return: the game arena g in which the priorities have been compressed.
     """
-    g_copy = copy.deepcopy(g)
-    nodes = g_copy.get_nodes_descriptors()  # Nodes from g
+    nodes = g.get_nodes_descriptors()  # Nodes from g
     priorities = sorted(nodes.iteritems(), key=lambda x:x[1][1]) # sorts nodes per priority
+    compressed = {}  # new descriptors of the nodes
     current = priorities[0][1][1]
     if current % 2 == 0:
         start = 0
@@ -20,10 +18,11 @@ def compress_priorities(g):
     val = start
     for elem in priorities:
         if(elem[1][1] % 2 == start):
-            g_copy.nodes[elem[0]] = tuple([elem[1][0], val])
+            compressed[elem[0]] = tuple([elem[1][0], val])
         else:
             val += 1
             start = ((start + 1) %2)
-            g_copy.nodes[elem[0]] = tuple([elem[1][0], val])
+            compressed[elem[0]] = tuple([elem[1][0], val])
 
-    return g_copy
\ No newline at end of file
+    # the arena is shared if g is immutable (FrozenGraph, CSRGraph), copied otherwise
+    return g.with_descriptors(compressed)